@@ -0,0 +1,280 @@
+"""
+Teste de carga do caminho de upsert, sem tocar no projeto de produção.
+
+Gera de 100 mil a 1 milhão de linhas sintéticas no esquema de cada
+importador e as empurra pelo script de verdade (import_csv_*.py, ou o
+POST direto de pulse/carteiras.py) contra o bench/supabase_local.py, que
+confere as chaves de conflito e recusa corpos acima de --limite-mb com 413.
+Cada combinação de alvo, tamanho, lote e em voo roda num servidor novo,
+em outro processo, para a CPU dele não disputar o GIL com o importador.
+
+Por execução:
+
+    linhas/s    linhas do CSV por segundo de parede do importador
+    posts       POSTs recebidos, incluindo os divididos por 413
+    413         lotes recusados pelo tamanho (o importador divide ao meio)
+    erros       outras recusas (409, 500 por chave repetida no lote...)
+    pico_mb     pico de memória do importador
+    ok          saiu com 0 e a tabela tem exatamente as chaves distintas
+
+--duplicadas reenvia chaves já geradas (com outro interesse), sempre de
+um lote anterior: o upsert tem de atualizar em vez de duplicar. O POST
+direto manda tudo num corpo só, que passa de --limite-mb bem antes de
+100 mil linhas; suba o limite para medir a vazão dele.
+
+    python bench/carga.py --linhas 100000
+    python bench/carga.py --alvos amazonia --linhas 1000000 --lote 500,1000,5000 --em-voo 2,4,8
+    python bench/carga.py --alvos serras-direto --linhas 100000 --limite-mb 64
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from urllib.request import urlopen
+
+AQUI = os.path.dirname(os.path.abspath(__file__))
+RAIZ = os.path.dirname(AQUI)
+sys.path.insert(0, RAIZ)
+
+from pulse.importador import CONCORRENTES_VALIDOS, ESQUEMAS  # noqa: E402
+from pulse.uf import ORDEM_UF, formatar_vetor, ler_vetor  # noqa: E402
+
+# alvo: (script do importador ou None para o POST direto, esquema, carteira do POST direto)
+ALVOS = {
+    "amazonia": ("import_csv_amazonia.py", "amazonia", None),
+    "concorrentes": ("import_csv_concorrentes.py", "concorrentes", None),
+    "serras": ("import_csv_serras.py", "serras", None),
+    "serras-concorrentes": ("import_csv_serras_concorrentes.py", "serras-concorrentes", None),
+    "serras-direto": (None, "serras", "serras-ancora"),
+}
+
+DATA_BASE = date(1900, 1, 1)
+DESTINOS = 500
+ORIGENS = ["SP", "RJ", "MG", "PR", "RS", "SC", "BA", "DF", "GO", "PA"]
+
+# ==============================
+# DADOS SINTÉTICOS
+# ==============================
+
+def _chave(indice, destinos):
+    """Chave distinta número indice: destinos em ciclo, um dia por volta."""
+    return destinos[indice % len(destinos)], (DATA_BASE + timedelta(days=indice // len(destinos))).isoformat()
+
+def _linha(colunas, destino, data, sorteio):
+    valores = {"data_coleta": data, "destino_id": destino, "interesse": sorteio.randint(0, 100)}
+    for i, uf in enumerate(sorteio.sample(ORIGENS, 3), start=1):
+        valores[f"origem_{i}"] = uf
+        valores[f"origem_{i}_pct"] = sorteio.randint(0, 100)
+    valores["origens_vetor"] = formatar_vetor(sorteio.choices(range(101), k=len(ORDEM_UF)))
+    return [valores[c] for c in colunas]
+
+def gerar_csv(caminho, nome_esquema, linhas, duplicadas=0.0, distancia=1000, semente=42):
+    """
+    Grava o CSV em streaming e devolve quantas chaves distintas ele tem.
+    Uma duplicada repete uma chave de pelo menos `distancia` linhas atrás,
+    para nunca cair no mesmo lote (o Postgres recusa o lote com 21000).
+    """
+    esquema = ESQUEMAS[nome_esquema]
+    colunas = list(esquema.colunas)
+    destinos = (sorted(CONCORRENTES_VALIDOS) if nome_esquema == "concorrentes"
+                else [f"destino_{i:04d}" for i in range(DESTINOS)])
+    sorteio = random.Random(semente)
+    distintas = 0
+    repetidas = {}  # chave repetida -> linha da última repetição
+    with open(caminho, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.writer(f)
+        escritor.writerow(colunas)
+        for linha in range(linhas):
+            indice = None
+            if distintas > distancia and sorteio.random() < duplicadas:
+                indice = sorteio.randrange(distintas - distancia)
+                if linha - repetidas.get(indice, -distancia) < distancia:
+                    indice = None
+            if indice is None:
+                indice = distintas
+                distintas += 1
+            else:
+                repetidas[indice] = linha
+            destino, data = _chave(indice, destinos)
+            escritor.writerow(_linha(colunas, destino, data, sorteio))
+    return distintas
+
+# ==============================
+# EXECUÇÃO
+# ==============================
+
+def _porta_livre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _json(url):
+    with urlopen(url, timeout=30) as r:
+        return json.load(r)
+
+def subir_servidor(limite_mb, latencia):
+    porta = _porta_livre()
+    processo = subprocess.Popen(
+        [sys.executable, os.path.join(AQUI, "supabase_local.py"), "--porta", str(porta),
+         "--limite-mb", str(limite_mb), "--latencia", str(latencia)],
+        stdout=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{porta}"
+    for _ in range(100):
+        try:
+            _json(f"{url}/_stats")
+            return processo, url
+        except OSError:
+            time.sleep(0.05)
+    processo.kill()
+    raise RuntimeError("supabase_local não respondeu")
+
+def rodar(alvo, caminho_csv, distintas, lote, em_voo, diretorio, limite_mb, latencia):
+    script, nome_esquema, carteira = ALVOS[alvo]
+    tabela = ESQUEMAS[nome_esquema].tabela
+    servidor, url = subir_servidor(limite_mb, latencia)
+    metricas = os.path.join(diretorio, ".metricas.json")
+    ambiente = dict(os.environ)
+    ambiente.update({
+        "PYTHONPATH": RAIZ + os.pathsep + ambiente.get("PYTHONPATH", ""),
+        "SUPABASE_URL": url,
+        "SUPABASE_KEY": "local",
+        "SUPABASE_SERVICE_ROLE_KEY": "local",
+        "CSV_PATH": caminho_csv,
+        "PULSE_IMPORT_LOTE": str(lote),
+        "PULSE_IMPORT_EM_VOO": str(em_voo),
+        "PULSE_MANIFESTO_ARQUIVO": os.path.join(diretorio, "manifesto.json"),
+        "PULSE_TELEMETRIA": "0",
+        "REQUIRE_TODAY": "0",
+    })
+    if script:
+        comando = [os.path.join(RAIZ, script)]
+    else:
+        comando = [os.path.abspath(__file__), "--direto", carteira, caminho_csv]
+    try:
+        if os.path.exists(ambiente["PULSE_MANIFESTO_ARQUIVO"]):
+            os.remove(ambiente["PULSE_MANIFESTO_ARQUIVO"])
+        inicio = time.monotonic()
+        processo = subprocess.run(
+            [sys.executable, os.path.join(AQUI, "instrumentar.py"), metricas] + comando,
+            cwd=diretorio, env=ambiente, capture_output=True, text=True,
+        )
+        tempo = time.monotonic() - inicio
+        stats = _json(f"{url}/_stats")
+        gravadas = _json(f"{url}/_tabelas").get(tabela, 0)
+    finally:
+        servidor.terminate()
+        servidor.wait()
+
+    resultado = {
+        "alvo": alvo, "lote": lote if script else None, "em_voo": em_voo if script else None,
+        "tempo": round(tempo, 2), "codigo": processo.returncode,
+        "posts": stats.get(f"POST {tabela}", 0),
+        "recebidas": stats.get(f"linhas {tabela}", 0),
+        "413": stats.get(f"erro 413 {tabela}", 0),
+        "erros": sum(n for k, n in stats.items() if k.startswith("erro ") and not k.startswith("erro 413")),
+        "gravadas": gravadas, "distintas": distintas,
+    }
+    try:
+        with open(metricas, encoding="utf-8") as f:
+            resultado.update(json.load(f))
+    except (OSError, ValueError):
+        pass
+    resultado["ok"] = processo.returncode == 0 and gravadas == distintas
+    return resultado, processo
+
+def _direto(nome_carteira, caminho_csv):
+    """Roda dentro do instrumentar: o POST único de pulse/carteiras.py com o CSV inteiro."""
+    from pulse.carteiras import CAMPOS_LINHA, carregar_carteiras, inserir_supabase
+
+    carteira = next(c for c in carregar_carteiras() if c.nome == nome_carteira)
+    with open(caminho_csv, newline="", encoding="utf-8") as f:
+        # Como o coletor monta: origens_vetor é lista, não o texto do CSV
+        linhas = [[ler_vetor(row[c]) if c == "origens_vetor" else row[c] for c in CAMPOS_LINHA]
+                  for row in csv.DictReader(f)]
+    inserir_supabase(carteira, linhas)
+
+# ==============================
+# RELATÓRIO
+# ==============================
+
+def imprimir(resultados):
+    print(f"\n{'alvo':<22}{'linhas':>9}{'lote':>7}{'voo':>5}{'tempo s':>9}{'linhas/s':>10}"
+          f"{'posts':>7}{'413':>6}{'erros':>7}{'pico MB':>9}  ok")
+    for r in resultados:
+        taxa = r["linhas"] / r["tempo"] if r["tempo"] else 0
+        print(f"{r['alvo']:<22}{r['linhas']:>9}{r['lote'] or '-':>7}{r['em_voo'] or '-':>5}"
+              f"{r['tempo']:>9.2f}{taxa:>10.0f}{r['posts']:>7}{r['413']:>6}{r['erros']:>7}"
+              f"{r.get('pico_mb', 0):>9.1f}  {'✅' if r['ok'] else '❌'}")
+
+def _lista(texto, tipo=int):
+    return [tipo(v) for v in texto.split(",") if v.strip()]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga dos importadores contra o Supabase local")
+    parser.add_argument("--alvos", help=f"lista separada por vírgula (padrão: {','.join(ALVOS)})")
+    parser.add_argument("--linhas", default="100000", help="tamanhos do CSV, ex.: 100000,1000000")
+    parser.add_argument("--lote", default="1000", help="PULSE_IMPORT_LOTE, ex.: 500,1000,5000")
+    parser.add_argument("--em-voo", default="4", help="PULSE_IMPORT_EM_VOO, ex.: 2,4,8")
+    parser.add_argument("--duplicadas", type=float, default=0.01, help="fração de chaves repetidas")
+    parser.add_argument("--limite-mb", type=float, default=1.0, help="maior corpo aceito pelo servidor")
+    parser.add_argument("--latencia", type=float, default=0.0, help="segundos por requisição no servidor")
+    parser.add_argument("--salvar", help="grava os resultados neste JSON")
+    parser.add_argument("-v", "--verboso", action="store_true", help="mostra a saída dos importadores")
+    parser.add_argument("--direto", nargs=2, metavar=("CARTEIRA", "CSV"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.direto:
+        _direto(*args.direto)
+        return
+
+    alvos = _lista(args.alvos, str) if args.alvos else list(ALVOS)
+    desconhecidos = set(alvos) - set(ALVOS)
+    if desconhecidos:
+        print(f"❌ Alvos desconhecidos: {', '.join(sorted(desconhecidos))} ({', '.join(ALVOS)})")
+        sys.exit(2)
+    lotes, em_voos = _lista(args.lote), _lista(args.em_voo)
+
+    resultados = []
+    with tempfile.TemporaryDirectory(prefix="pulse-carga-") as diretorio:
+        for alvo in alvos:
+            script, nome_esquema, _ = ALVOS[alvo]
+            for linhas in _lista(args.linhas):
+                caminho_csv = os.path.join(diretorio, f"{alvo}-{linhas}.csv")
+                inicio = time.monotonic()
+                # O POST direto manda o arquivo num corpo só: repetir chave seria sempre 21000
+                duplicadas = args.duplicadas if script else 0.0
+                distintas = gerar_csv(caminho_csv, nome_esquema, linhas, duplicadas, distancia=max(lotes))
+                print(f"📄 {alvo}: {linhas} linhas ({distintas} chaves) geradas em {time.monotonic() - inicio:.1f}s",
+                      flush=True)
+                combinacoes = [(l, v) for l in lotes for v in em_voos] if script else [(None, None)]
+                for lote, em_voo in combinacoes:
+                    resultado, processo = rodar(alvo, caminho_csv, distintas, lote or 0, em_voo or 0,
+                                                diretorio, args.limite_mb, args.latencia)
+                    resultado["linhas"] = linhas
+                    resultados.append(resultado)
+                    print(f"▶️ {alvo} lote={lote or '-'} em_voo={em_voo or '-'}: {resultado['tempo']:.1f}s, "
+                          f"{resultado['gravadas']}/{distintas} chaves gravadas", flush=True)
+                    if args.verboso or not resultado["ok"]:
+                        print(processo.stdout[-4000:])
+                        print(processo.stderr[-4000:], file=sys.stderr)
+                os.remove(caminho_csv)
+    imprimir(resultados)
+
+    if args.salvar:
+        with open(args.salvar, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+        print(f"💾 {args.salvar} gravado")
+    if not all(r["ok"] for r in resultados):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
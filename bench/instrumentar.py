@@ -0,0 +1,55 @@
+"""
+Roda um script do pipeline medindo o que não se vê de fora do processo:
+o tempo passado em time.sleep (somado entre as threads: ritmo do
+limitador, backoff do pytrends e do urllib3) e o pico de memória.
+
+    python bench/instrumentar.py metricas.json coleta_pulse_serras.py
+
+Usado pelo bench/medir.py; o script roda como __main__, com o mesmo
+código de saída.
+"""
+import json
+import resource
+import runpy
+import sys
+import threading
+import time
+
+
+def main():
+    saida, script = sys.argv[1], sys.argv[2]
+    sys.argv = sys.argv[2:]
+
+    dormir = time.sleep
+    lock = threading.Lock()
+    sono = {"segundos": 0.0, "chamadas": 0}
+
+    def sleep(segundos):
+        inicio = time.monotonic()
+        try:
+            dormir(segundos)
+        finally:
+            with lock:
+                sono["segundos"] += time.monotonic() - inicio
+                sono["chamadas"] += 1
+
+    # Antes de importar o script: "from time import sleep" também pega esta
+    time.sleep = sleep
+
+    codigo = 0
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit as e:
+        codigo = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    finally:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss: KB no Linux, bytes no macOS
+        pico_mb = pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+        with open(saida, "w", encoding="utf-8") as f:
+            json.dump({"sono": round(sono["segundos"], 3), "sonos": sono["chamadas"],
+                       "pico_mb": round(pico_mb, 1)}, f)
+    sys.exit(codigo)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Benchmark offline das coletas e importações, sem Google, SerpAPI nem Supabase.
+
+Sobe os três stand-ins locais (bench/trends_local.py, serpapi_local.py e
+supabase_local.py) e roda os scripts do pipeline de ponta a ponta num
+diretório temporário, na ordem dos workflows. Para cada etapa mede:
+
+    tempo       tempo de parede do processo (s)
+    requisicoes requisições recebidas pelos stand-ins
+    sono        tempo em time.sleep: ritmo, backoff, reenvios (s)
+    pico_mb     pico de memória residente (MB)
+
+--salvar grava o resultado; --base compara com um resultado salvo e sai
+com código 1 se alguma métrica piorar mais que --limite (com uma folga
+absoluta por métrica, para o ruído de execuções curtas não reprovar).
+
+    python bench/medir.py --rpm 120 --salvar bench/base.json
+    python bench/medir.py --rpm 120 --base bench/base.json --limite 0.15
+    python bench/medir.py --etapas serras-coleta --latencia-trends 0.3
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+AQUI = os.path.dirname(os.path.abspath(__file__))
+RAIZ = os.path.dirname(AQUI)
+sys.path.insert(0, AQUI)
+
+import serpapi_local  # noqa: E402
+import supabase_local  # noqa: E402
+import trends_local  # noqa: E402
+
+# (nome, script, variáveis extras, tabelas esvaziadas antes) na ordem dos workflows.
+# A coleta do Serras já faz o upsert em pulse_serras; os importadores dela
+# são medidos sobre a tabela vazia, como numa carga inicial.
+ETAPAS = [
+    ("amazonia-coleta", "coleta_automatica_trends.py", {}, ()),
+    ("amazonia-import", "import_csv_amazonia.py", {}, ()),
+    ("concorrentes-import", "import_csv_concorrentes.py", {"REQUIRE_TODAY": "0"}, ()),
+    ("serras-coleta", "coleta_pulse_serras.py", {}, ()),
+    ("serras-import", "import_csv_serras.py", {}, ("pulse_serras",)),
+    ("serras-concorrentes-import", "import_csv_serras_concorrentes.py", {}, ()),
+    ("hotel-coleta", "coleta_hotel_pulse.py", {}, ()),
+]
+
+METRICAS = ("tempo", "requisicoes", "sono", "pico_mb")
+# Piora abaixo disto não conta como regressão, qualquer que seja o limite
+FOLGA = {"tempo": 1.0, "requisicoes": 2, "sono": 1.0, "pico_mb": 10.0}
+
+# ==============================
+# EXECUÇÃO
+# ==============================
+
+def _stats(urls):
+    """Contagem de requisições somada entre os stand-ins."""
+    total = {}
+    for url in urls:
+        with urlopen(f"{url}/_stats", timeout=5) as r:
+            for chave, n in json.load(r).items():
+                total[chave] = total.get(chave, 0) + n
+    return total
+
+def _requisicoes(stats):
+    # "429" e "erro x" já estão contados no endpoint; "linhas x" não é requisição
+    return sum(n for chave, n in stats.items()
+               if chave != "429" and not chave.startswith(("linhas ", "erro ")))
+
+def medir_etapa(script, ambiente, diretorio, urls_stats):
+    antes = _stats(urls_stats)
+    metricas_arquivo = os.path.join(diretorio, ".metricas.json")
+    inicio = time.monotonic()
+    processo = subprocess.run(
+        [sys.executable, os.path.join(AQUI, "instrumentar.py"), metricas_arquivo, os.path.join(RAIZ, script)],
+        cwd=diretorio, env=ambiente, capture_output=True, text=True,
+    )
+    tempo = time.monotonic() - inicio
+    depois = _stats(urls_stats)
+
+    delta = {k: depois.get(k, 0) - antes.get(k, 0) for k in depois if depois.get(k, 0) != antes.get(k, 0)}
+    resultado = {"tempo": round(tempo, 2), "requisicoes": _requisicoes(delta), "codigo": processo.returncode}
+    try:
+        with open(metricas_arquivo, encoding="utf-8") as f:
+            resultado.update(json.load(f))
+    except (OSError, ValueError):
+        pass
+    resultado["detalhe"] = delta
+    resultado["linhas"] = sum(n for k, n in delta.items() if k.startswith("linhas "))
+    return resultado, processo
+
+def executar(etapas, rpm=None, latencias=(0.0, 0.0, 0.0), taxa_429=0.0, verboso=False):
+    trends, url_trends = trends_local.iniciar(taxa_429=taxa_429, latencia=latencias[0])
+    serpapi, url_serpapi = serpapi_local.iniciar(taxa_429=taxa_429, latencia=latencias[1])
+    supabase, url_supabase = supabase_local.iniciar(latencia=latencias[2])
+    urls_stats = [url_trends.rsplit("/", 1)[0], url_serpapi, url_supabase]
+
+    ambiente = dict(os.environ)
+    ambiente.update({
+        "PYTHONPATH": RAIZ + os.pathsep + ambiente.get("PYTHONPATH", ""),
+        "PULSE_TRENDS_URL": url_trends,
+        "SERPAPI_URL": url_serpapi,
+        "SERPAPI_KEY": "local",
+        "SUPABASE_URL": url_supabase,
+        "SUPABASE_KEY": "local",
+        "SUPABASE_SERVICE_ROLE_KEY": "local",
+        "PYTHONUNBUFFERED": "1",
+    })
+    if rpm:
+        # O AIMD sobe até o teto: sem mexer nele a taxa volta a 30/min
+        ambiente["PULSE_TRENDS_RPM"] = ambiente["PULSE_TRENDS_RPM_MAX"] = str(rpm)
+
+    resultados = {}
+    try:
+        with tempfile.TemporaryDirectory(prefix="pulse-bench-") as diretorio:
+            for nome, script, extras, limpar in ETAPAS:
+                if nome not in etapas:
+                    continue
+                for tabela in limpar:
+                    try:
+                        urlopen(Request(f"{url_supabase}/rest/v1/{tabela}", method="DELETE"), timeout=5).close()
+                    except HTTPError:
+                        pass  # tabela ainda não existe
+                print(f"▶️ {nome} ({script})", flush=True)
+                resultado, processo = medir_etapa(script, dict(ambiente, **extras), diretorio, urls_stats)
+                resultados[nome] = resultado
+                if verboso or resultado["codigo"] != 0:
+                    print(processo.stdout[-4000:])
+                    print(processo.stderr[-4000:], file=sys.stderr)
+    finally:
+        for servidor in (trends, serpapi, supabase):
+            servidor.shutdown()
+    return resultados
+
+# ==============================
+# RELATÓRIO
+# ==============================
+
+def imprimir(resultados):
+    print(f"\n{'etapa':<28}{'tempo s':>9}{'req':>7}{'sono s':>9}{'pico MB':>9}{'linhas':>8}  saída")
+    for nome, r in resultados.items():
+        print(f"{nome:<28}{r['tempo']:>9.2f}{r['requisicoes']:>7}{r.get('sono', 0):>9.2f}"
+              f"{r.get('pico_mb', 0):>9.1f}{r['linhas']:>8}  {r['codigo']}")
+    total = sum(r["tempo"] for r in resultados.values())
+    print(f"{'total':<28}{total:>9.2f}")
+
+def regressoes(resultados, base, limite):
+    """[(etapa, métrica, base, novo)] que pioraram além do limite e da folga."""
+    saida = []
+    for nome, r in resultados.items():
+        anterior = base.get(nome)
+        if not anterior:
+            continue
+        for metrica in METRICAS:
+            novo, antigo = r.get(metrica), anterior.get(metrica)
+            if novo is None or antigo is None:
+                continue
+            if novo > antigo * (1 + limite) and novo - antigo > FOLGA[metrica]:
+                saida.append((nome, metrica, antigo, novo))
+    return saida
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark offline do pipeline Pulse")
+    parser.add_argument("--etapas", help="lista separada por vírgula (padrão: todas)")
+    parser.add_argument("--rpm", type=float, help="PULSE_TRENDS_RPM da execução (padrão: o do ambiente)")
+    parser.add_argument("--latencia-trends", type=float, default=0.0)
+    parser.add_argument("--latencia-serpapi", type=float, default=0.0)
+    parser.add_argument("--latencia-supabase", type=float, default=0.0)
+    parser.add_argument("--taxa-429", type=float, default=0.0)
+    parser.add_argument("--salvar", help="grava o resultado neste JSON")
+    parser.add_argument("--base", help="resultado salvo para comparar")
+    parser.add_argument("--limite", type=float, default=0.10, help="piora relativa tolerada (0.10 = 10%%)")
+    parser.add_argument("-v", "--verboso", action="store_true", help="mostra a saída dos scripts")
+    args = parser.parse_args(argv)
+
+    nomes = [etapa[0] for etapa in ETAPAS]
+    etapas = [e.strip() for e in args.etapas.split(",")] if args.etapas else nomes
+    desconhecidas = set(etapas) - set(nomes)
+    if desconhecidas:
+        print(f"❌ Etapas desconhecidas: {', '.join(sorted(desconhecidas))} ({', '.join(nomes)})")
+        sys.exit(2)
+
+    resultados = executar(
+        etapas, rpm=args.rpm, taxa_429=args.taxa_429, verboso=args.verboso,
+        latencias=(args.latencia_trends, args.latencia_serpapi, args.latencia_supabase),
+    )
+    imprimir(resultados)
+
+    if args.salvar:
+        with open(args.salvar, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2, sort_keys=True)
+        print(f"💾 {args.salvar} gravado")
+
+    falhas = [nome for nome, r in resultados.items() if r["codigo"] != 0]
+    if falhas:
+        print(f"❌ Etapas com erro: {', '.join(falhas)}")
+    if args.base:
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f)
+        piores = regressoes(resultados, base, args.limite)
+        for nome, metrica, antigo, novo in piores:
+            print(f"📉 {nome}: {metrica} {antigo} -> {novo}")
+        if piores:
+            sys.exit(1)
+        print(f"✅ Sem regressão acima de {args.limite:.0%} em relação a {args.base}")
+    if falhas:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
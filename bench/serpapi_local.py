@@ -0,0 +1,150 @@
+"""
+Stand-in local da SerpAPI (engine google_hotels) para o coleta_hotel_pulse.py.
+
+Reproduz respostas gravadas: cada JSON em bench/fixtures/serpapi/ (ou no
+diretório de --fixtures) é uma resposta da SerpAPI, casada pela busca
+("search_parameters.q") ou pelo property_token da propriedade. Respostas
+salvas do painel da SerpAPI podem ser copiadas para lá como estão. A
+tarifa varia de forma determinística com a data de check-in, para a curva
+de horizonte não sair plana. /account.json informa créditos; latência e
+uma taxa de 429 podem ser injetadas. GET /_stats conta as requisições.
+
+Uso:
+    python bench/serpapi_local.py --porta 8766 --latencia 1.5
+    SERPAPI_URL=http://127.0.0.1:8766 python coleta_hotel_pulse.py
+"""
+import argparse
+import copy
+import glob
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "serpapi")
+
+
+def carregar_fixtures(diretorio=FIXTURES_DIR):
+    """(por busca, por property_token) a partir dos JSONs gravados."""
+    por_busca, por_token = {}, {}
+    for caminho in sorted(glob.glob(os.path.join(diretorio, "*.json"))):
+        with open(caminho, encoding="utf-8") as f:
+            resposta = json.load(f)
+        busca = resposta.get("search_parameters", {}).get("q")
+        if busca:
+            por_busca[busca.lower()] = resposta
+        for prop in resposta.get("properties", []) or [resposta]:
+            if prop.get("property_token"):
+                por_token[prop["property_token"]] = prop
+    return por_busca, por_token
+
+
+def _fator(*partes):
+    """Entre 0.85 e 1.25, estável por (hotel, check-in)."""
+    semente = int(hashlib.sha256("|".join(partes).encode("utf-8")).hexdigest()[:12], 16)
+    return 0.85 + (semente % 4000) / 10000
+
+
+def _ajustar(prop, check_in):
+    prop = copy.deepcopy(prop)
+    fator = _fator(prop.get("property_token", ""), check_in or "")
+    for alvo in [prop.get("rate_per_night")] + [p.get("rate_per_night") for p in prop.get("prices", [])]:
+        if alvo and alvo.get("extracted_lowest") is not None:
+            alvo["extracted_lowest"] = round(alvo["extracted_lowest"] * fator)
+            alvo["lowest"] = f"R$ {alvo['extracted_lowest']}"
+    return prop
+
+
+class Estado:
+    def __init__(self, fixtures, taxa_429=0.0, latencia=0.0, creditos=5000):
+        self.por_busca, self.por_token = fixtures
+        self.taxa_429 = taxa_429
+        self.latencia = latencia
+        self.creditos = creditos
+        self.contagem = {}
+        self.lock = threading.Lock()
+
+    def contar(self, endpoint):
+        with self.lock:
+            self.contagem[endpoint] = self.contagem.get(endpoint, 0) + 1
+
+
+class Handler(BaseHTTPRequestHandler):
+    estado = None
+
+    def log_message(self, *args):
+        pass
+
+    def _responder(self, status, corpo):
+        dados = json.dumps(corpo, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        estado = self.estado
+        if url.path == "/_stats":
+            with estado.lock:
+                return self._responder(200, estado.contagem)
+        if url.path == "/account.json":
+            estado.contar("account")
+            with estado.lock:
+                return self._responder(200, {"total_searches_left": estado.creditos})
+        if url.path.rstrip("/") not in ("/search", "/search.json"):
+            return self._responder(404, {"error": "not found"})
+
+        estado.contar("search")
+        if estado.latencia:
+            time.sleep(estado.latencia)
+        if estado.taxa_429 and random.random() < estado.taxa_429:
+            estado.contar("429")
+            return self._responder(429, {"error": "Too many requests"})
+        with estado.lock:
+            estado.creditos -= 1
+
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        check_in = params.get("check_in_date")
+        token = params.get("property_token")
+        if token:
+            prop = estado.por_token.get(token)
+            if prop is None:
+                return self._responder(200, {"error": "Google Hotels hasn't returned any results for this query."})
+            return self._responder(200, _ajustar(prop, check_in))
+
+        resposta = estado.por_busca.get(params.get("q", "").lower())
+        if resposta is None:
+            return self._responder(200, {"error": "Google Hotels hasn't returned any results for this query."})
+        resposta = dict(resposta, properties=[_ajustar(p, check_in) for p in resposta.get("properties", [])])
+        self._responder(200, resposta)
+
+
+def iniciar(porta=0, taxa_429=0.0, latencia=0.0, fixtures=FIXTURES_DIR):
+    """Sobe o servidor numa thread; devolve (servidor, url_base)."""
+    handler = type("HandlerSerpapi", (Handler,), {
+        "estado": Estado(carregar_fixtures(fixtures), taxa_429, latencia),
+    })
+    servidor = ThreadingHTTPServer(("127.0.0.1", porta), handler)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stand-in local da SerpAPI (google_hotels)")
+    parser.add_argument("--porta", type=int, default=8766)
+    parser.add_argument("--taxa-429", type=float, default=0.0)
+    parser.add_argument("--latencia", type=float, default=0.0, help="segundos por busca")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="diretório com respostas gravadas")
+    args = parser.parse_args()
+    servidor, url = iniciar(args.porta, args.taxa_429, args.latencia, args.fixtures)
+    print(f"SerpAPI local em {url} (Ctrl+C para sair)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        servidor.shutdown()
@@ -0,0 +1,337 @@
+"""
+Stand-in local do Supabase (PostgREST) para os coletores e importadores.
+
+Guarda as tabelas em memória e implementa o que o pipeline usa de
+/rest/v1/<tabela>:
+
+    POST  upsert com ?on_conflict=a,b e Prefer resolution=merge-duplicates
+          ou ignore-duplicates, return=minimal ou representation (&select=)
+    GET   select=, filtros eq./gte./lte./gt./lt., order=col[.desc], limit=,
+          offset=; Content-Range com o total quando Prefer count=exact
+    DELETE  os mesmos filtros (sem filtro, esvazia a tabela)
+
+É o mesmo protocolo que o postgrest-py do supabase-py fala
+(create_client(...).table(t).upsert(..., on_conflict=...)) e os POSTs
+diretos dos coletores. As tabelas de sql/ e as do pipeline têm as chaves
+de RESTRICOES e respondem como o Postgres por trás do PostgREST:
+
+    on_conflict que não é chave única       400 42P10
+    POST sem resolution com chave existente  409 23505
+    mesma chave duas vezes no lote (merge)   500 21000
+    coluna da chave nula                     400 23502
+    corpo acima de --limite-mb               413
+
+Um lote recusado não grava nada, como na transação do PostgREST.
+
+A view pulse_importacao_marcas é calculada das tabelas importadas, como em
+sql/pulse_importacao_marcas.sql. --semente carrega linhas gravadas de um
+JSON {tabela: [linhas]}. GET /_stats devolve requisições por
+"MÉTODO tabela", linhas recebidas e recusas ("erro 413 tabela");
+GET /_tabelas, as linhas gravadas por tabela.
+
+Uso:
+    python bench/supabase_local.py --porta 8767 --limite-mb 1
+    SUPABASE_URL=http://127.0.0.1:8767 SUPABASE_KEY=local python import_csv_amazonia.py
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+VIEW_MARCAS = "pulse_importacao_marcas"
+# Tabelas da view e se ela separa por "tipo"
+TABELAS_MARCAS = {"pulse_amazonia": False, "concorrentes_nacionais": False, "pulse_serras": True}
+
+# Chaves únicas por tabela; a primeira é a primária (sql/ e os CSVs do pipeline)
+RESTRICOES = {
+    "pulse_amazonia": [("destino_id", "data_coleta")],
+    "concorrentes_nacionais": [("destino_id", "data_coleta")],
+    "pulse_serras": [("destino_id", "data_coleta", "tipo")],
+    "hotel_pulse_tarifas": [("hotel_id", "data_coleta")],
+    "hotel_pulse_curva": [("hotel_id", "data_coleta", "data_estadia")],
+    "pulse_indices": [("carteira", "destino_id", "data_coleta", "periodo")],
+    "pulse_ipcr": [("carteira", "destino_id", "data_coleta", "periodo")],
+    "pulse_origem": [("carteira", "destino_id", "data_coleta")],
+}
+LIMITE_MB = 1.0
+
+OPERADORES = {
+    "eq": lambda a, b: a == b,
+    "gte": lambda a, b: a is not None and a >= b,
+    "lte": lambda a, b: a is not None and a <= b,
+    "gt": lambda a, b: a is not None and a > b,
+    "lt": lambda a, b: a is not None and a < b,
+}
+
+
+class ErroPostgrest(Exception):
+    """Recusa no formato de erro do PostgREST."""
+
+    def __init__(self, status, codigo, mensagem, detalhes=None):
+        super().__init__(mensagem)
+        self.status = status
+        self.corpo = {"code": codigo, "details": detalhes, "hint": None, "message": mensagem}
+
+
+class Tabela:
+    """
+    Linhas de uma tabela, indexadas pela chave do último on_conflict (ou
+    pela primária). Tabelas sem RESTRICOES aceitam qualquer on_conflict.
+    """
+
+    def __init__(self, restricoes=()):
+        self.restricoes = [tuple(r) for r in restricoes]
+        self.chave = None
+        self.linhas = {}
+        self.proximo_id = 0
+
+    def _chave_upsert(self, on_conflict):
+        if not self.restricoes:
+            return on_conflict
+        if not on_conflict:
+            return self.restricoes[0]
+        if not any(set(on_conflict) == set(r) for r in self.restricoes):
+            raise ErroPostgrest(400, "42P10", "there is no unique or exclusion constraint "
+                                "matching the ON CONFLICT specification")
+        return on_conflict
+
+    def _indexar(self, chave):
+        if chave != self.chave:
+            self.linhas = {tuple(l.get(c) for c in chave) if chave else i: l
+                           for i, l in enumerate(self.linhas.values())}
+            self.chave = chave
+
+    def upsert(self, registros, on_conflict=(), resolucao="merge-duplicates"):
+        """
+        resolucao: "merge-duplicates", "ignore-duplicates" ou None (INSERT
+        puro). Valida o lote inteiro antes de gravar a primeira linha.
+        """
+        if any(registro.keys() != registros[0].keys() for registro in registros):
+            raise ErroPostgrest(400, "PGRST102", "All object keys must match")
+        chave = self._chave_upsert(on_conflict)
+        self._indexar(chave)
+        novas = {}
+        for registro in registros:
+            if chave:
+                k = tuple(registro.get(c) for c in chave)
+                for coluna, valor in zip(chave, k):
+                    if valor is None and self.restricoes:
+                        raise ErroPostgrest(400, "23502", f'null value in column "{coluna}" '
+                                            "violates not-null constraint")
+            else:
+                self.proximo_id += 1
+                k = ("_id", self.proximo_id)
+            if k in novas:
+                if resolucao == "ignore-duplicates":
+                    continue
+                if resolucao == "merge-duplicates":
+                    raise ErroPostgrest(500, "21000", "ON CONFLICT DO UPDATE command cannot "
+                                        "affect row a second time")
+            if k in self.linhas:
+                if resolucao == "ignore-duplicates":
+                    continue
+                if resolucao is None and self.restricoes:
+                    raise ErroPostgrest(409, "23505", "duplicate key value violates unique constraint",
+                                        f"Key ({', '.join(chave)})=({', '.join(map(str, k))}) already exists.")
+                novas[k] = dict(self.linhas[k], **registro)
+            else:
+                novas[k] = dict(novas.get(k, {}), **registro)
+        self.linhas.update(novas)
+        return list(novas.values())
+
+
+def _valor(texto):
+    """Filtro do PostgREST -> valor comparável (números como número)."""
+    for tipo in (int, float):
+        try:
+            return tipo(texto)
+        except ValueError:
+            pass
+    return None if texto == "null" else texto
+
+
+def consultar(linhas, params):
+    """Aplica filtros, order, limit e select de uma query string do PostgREST."""
+    for campo, valor in params.items():
+        if campo in ("select", "order", "limit", "offset", "on_conflict"):
+            continue
+        operador, _, alvo = valor.partition(".")
+        if operador in OPERADORES:
+            alvo = _valor(alvo)
+            linhas = [l for l in linhas if OPERADORES[operador](
+                _valor(str(l.get(campo))) if isinstance(alvo, (int, float)) else l.get(campo), alvo)]
+    for parte in reversed([p for p in params.get("order", "").split(",") if p]):
+        campo, _, direcao = parte.partition(".")
+        linhas = sorted(linhas, key=lambda l: (l.get(campo) is None, l.get(campo)),
+                        reverse=direcao.startswith("desc"))
+    inicio = int(params.get("offset", 0))
+    linhas = linhas[inicio:]
+    if "limit" in params:
+        linhas = linhas[:int(params["limit"])]
+    campos = [c.strip() for c in params.get("select", "*").split(",") if c.strip()]
+    if campos and campos != ["*"]:
+        linhas = [{c: l.get(c) for c in campos} for l in linhas]
+    return linhas
+
+
+class Estado:
+    def __init__(self, latencia=0.0, limite_mb=LIMITE_MB):
+        self.latencia = latencia
+        self.limite_bytes = int(limite_mb * 1024 * 1024) if limite_mb else None
+        self.tabelas = {}
+        self.contagem = {}
+        self.lock = threading.Lock()
+
+    def contar(self, chave, n=1):
+        with self.lock:
+            self.contagem[chave] = self.contagem.get(chave, 0) + n
+
+    def tabela(self, nome):
+        if nome not in self.tabelas:
+            self.tabelas[nome] = Tabela(RESTRICOES.get(nome, ()))
+        return self.tabelas[nome]
+
+    def semear(self, caminho):
+        with open(caminho, encoding="utf-8") as f:
+            for nome, linhas in json.load(f).items():
+                self.tabela(nome).upsert(linhas)
+
+    def marcas(self):
+        saida = []
+        for nome, por_tipo in TABELAS_MARCAS.items():
+            grupos = {}
+            for linha in self.tabelas.get(nome, Tabela()).linhas.values():
+                grupos.setdefault(linha.get("tipo") if por_tipo else None, []).append(linha["data_coleta"])
+            for tipo, datas in grupos.items():
+                saida.append({"tabela": nome, "tipo": tipo, "data_min": min(datas),
+                              "data_max": max(datas), "linhas": len(datas)})
+        return saida
+
+
+class Handler(BaseHTTPRequestHandler):
+    estado = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _responder(self, status, corpo=None, cabecalhos=None):
+        dados = b"" if corpo is None else json.dumps(corpo, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(dados)))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _rota(self):
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        prefixo = "/rest/v1/"
+        nome = url.path[len(prefixo):] if url.path.startswith(prefixo) else None
+        if self.estado.latencia:
+            time.sleep(self.estado.latencia)
+        return url.path, nome, params
+
+    def do_GET(self):
+        caminho, nome, params = self._rota()
+        estado = self.estado
+        if caminho == "/_stats":
+            with estado.lock:
+                return self._responder(200, estado.contagem)
+        if caminho == "/_tabelas":
+            with estado.lock:
+                return self._responder(200, {n: len(t.linhas) for n, t in estado.tabelas.items()})
+        if not nome:
+            return self._responder(404, {"message": "not found"})
+        estado.contar(f"GET {nome}")
+        with estado.lock:
+            if nome == VIEW_MARCAS:
+                linhas = estado.marcas()
+            elif nome in estado.tabelas:
+                linhas = list(estado.tabelas[nome].linhas.values())
+            else:
+                return self._responder(404, {"code": "42P01", "message": f'relation "public.{nome}" does not exist'})
+            total = "*"
+            if "count=exact" in self.headers.get("Prefer", ""):
+                total = len(consultar(linhas, {k: v for k, v in params.items()
+                                               if k not in ("limit", "offset", "order", "select")}))
+            linhas = consultar(linhas, params)
+        inicio = int(params.get("offset", 0))
+        faixa = f"{inicio}-{inicio + len(linhas) - 1}" if linhas else "*"
+        self._responder(200, linhas, {"Content-Range": f"{faixa}/{total}"})
+
+    def do_DELETE(self):
+        _, nome, params = self._rota()
+        if not nome:
+            return self._responder(404, {"message": "not found"})
+        estado = self.estado
+        estado.contar(f"DELETE {nome}")
+        with estado.lock:
+            tabela = estado.tabelas.get(nome)
+            if tabela is None:
+                return self._responder(404, {"code": "42P01", "message": f'relation "public.{nome}" does not exist'})
+            removidas = {id(l) for l in consultar(list(tabela.linhas.values()), dict(params, select="*"))}
+            tabela.linhas = {k: l for k, l in tabela.linhas.items() if id(l) not in removidas}
+        self._responder(204)
+
+    def do_POST(self):
+        _, nome, params = self._rota()
+        if not nome:
+            return self._responder(404, {"message": "not found"})
+        estado = self.estado
+        estado.contar(f"POST {nome}")
+        tamanho = int(self.headers.get("Content-Length") or 0)
+        bruto = self.rfile.read(tamanho)
+        if estado.limite_bytes and tamanho > estado.limite_bytes:
+            # Quem recusa é o gateway, antes do PostgREST: corpo sem JSON
+            estado.contar(f"erro 413 {nome}")
+            return self._responder(413, {"message": "Payload Too Large"})
+
+        corpo = json.loads(bruto or b"[]")
+        registros = corpo if isinstance(corpo, list) else [corpo]
+        prefer = self.headers.get("Prefer", "")
+        chave = tuple(c.strip() for c in params.get("on_conflict", "").split(",") if c.strip())
+        resolucao = next((r for r in ("merge-duplicates", "ignore-duplicates")
+                          if f"resolution={r}" in prefer), None)
+
+        estado.contar(f"linhas {nome}", len(registros))
+        try:
+            with estado.lock:
+                gravados = estado.tabela(nome).upsert(registros, chave, resolucao)
+        except ErroPostgrest as e:
+            estado.contar(f"erro {e.status} {nome}")
+            return self._responder(e.status, e.corpo)
+        if "return=representation" in prefer:
+            return self._responder(201, consultar(gravados, {"select": params.get("select", "*")}))
+        self._responder(201)
+
+
+def iniciar(porta=0, latencia=0.0, semente=None, limite_mb=LIMITE_MB):
+    """Sobe o servidor numa thread; devolve (servidor, url_base)."""
+    estado = Estado(latencia, limite_mb)
+    if semente:
+        estado.semear(semente)
+    handler = type("HandlerSupabase", (Handler,), {"estado": estado})
+    servidor = ThreadingHTTPServer(("127.0.0.1", porta), handler)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stand-in local do Supabase (PostgREST)")
+    parser.add_argument("--porta", type=int, default=8767)
+    parser.add_argument("--latencia", type=float, default=0.0, help="segundos por requisição")
+    parser.add_argument("--semente", help="JSON {tabela: [linhas]} carregado na partida")
+    parser.add_argument("--limite-mb", type=float, default=LIMITE_MB,
+                        help="maior corpo de POST aceito (0 = sem limite)")
+    args = parser.parse_args()
+    servidor, url = iniciar(args.porta, args.latencia, args.semente, args.limite_mb)
+    print(f"Supabase local em {url} (Ctrl+C para sair)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        servidor.shutdown()
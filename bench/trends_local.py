@@ -0,0 +1,206 @@
+"""
+Stand-in local do Google Trends para testar os coletores sem tocar no Google.
+
+Implementa só o que o pytrends usa: cookie (/explore/), token
+(/api/explore), série temporal (/api/widgetdata/multiline) e recorte por
+região (/api/widgetdata/comparedgeo). Os valores são determinísticos por
+termo; latência e uma taxa de 429 podem ser injetadas. GET /_stats devolve
+a contagem de requisições por endpoint.
+
+Uso:
+    python bench/trends_local.py --porta 8765 --taxa-429 0.05
+    PULSE_TRENDS_URL=http://127.0.0.1:8765/trends python coleta_pulse_serras.py
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+UFS = [
+    ("BR-AC", "Acre"), ("BR-AL", "Alagoas"), ("BR-AP", "Amapá"), ("BR-AM", "Amazonas"),
+    ("BR-BA", "Bahia"), ("BR-CE", "Ceará"), ("BR-DF", "Distrito Federal"),
+    ("BR-ES", "Espírito Santo"), ("BR-GO", "Goiás"), ("BR-MA", "Maranhão"),
+    ("BR-MT", "Mato Grosso"), ("BR-MS", "Mato Grosso do Sul"), ("BR-MG", "Minas Gerais"),
+    ("BR-PA", "Pará"), ("BR-PB", "Paraíba"), ("BR-PR", "Paraná"), ("BR-PE", "Pernambuco"),
+    ("BR-PI", "Piauí"), ("BR-RJ", "Rio de Janeiro"), ("BR-RN", "Rio Grande do Norte"),
+    ("BR-RS", "Rio Grande do Sul"), ("BR-RO", "Rondônia"), ("BR-RR", "Roraima"),
+    ("BR-SC", "Santa Catarina"), ("BR-SP", "São Paulo"), ("BR-SE", "Sergipe"),
+    ("BR-TO", "Tocantins"),
+]
+
+
+def _semente(*partes):
+    return int(hashlib.sha256("|".join(partes).encode("utf-8")).hexdigest()[:12], 16)
+
+
+def _pontos(timeframe):
+    """Instantes da série: horária para 'now 7-d', diária para intervalos de datas."""
+    agora = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    if timeframe.startswith("now"):
+        return [agora - timedelta(hours=h) for h in range(167, -1, -1)]
+    inicio, fim = timeframe.split()
+    dia = datetime.strptime(inicio, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    ultimo = datetime.strptime(fim, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    pontos = []
+    while dia <= ultimo:
+        pontos.append(dia)
+        dia += timedelta(days=1)
+    return pontos
+
+
+def serie(termo, timeframe):
+    """Série bruta (antes da normalização 0-100) de um termo."""
+    pontos = _pontos(timeframe)
+    nivel = 5 + _semente(termo) % 95
+    brutos = []
+    for t in pontos:
+        # Ruído estável por (termo, instante): janelas sobrepostas concordam
+        rnd = random.Random(_semente(termo, t.isoformat()))
+        brutos.append(max(0.0, nivel * (0.6 + 0.8 * rnd.random())))
+    return pontos, brutos
+
+
+def regioes(termo):
+    rnd = random.Random(_semente(termo, "geo"))
+    return [rnd.random() ** 3 * 100 for _ in UFS]
+
+
+class Estado:
+    def __init__(self, taxa_429=0.0, latencia=0.0):
+        self.taxa_429 = taxa_429
+        self.latencia = latencia
+        self.contagem = {}
+        self.lock = threading.Lock()
+
+    def contar(self, endpoint):
+        with self.lock:
+            self.contagem[endpoint] = self.contagem.get(endpoint, 0) + 1
+
+
+class Handler(BaseHTTPRequestHandler):
+    estado = None
+
+    def log_message(self, *args):
+        pass
+
+    def _responder(self, status, corpo, tipo="application/json; charset=utf-8", cookies=None):
+        dados = corpo.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(dados)))
+        for cookie in cookies or []:
+            self.send_header("Set-Cookie", cookie)
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _limitar(self, endpoint):
+        estado = self.estado
+        estado.contar(endpoint)
+        if estado.latencia:
+            time.sleep(estado.latencia)
+        if estado.taxa_429 and random.random() < estado.taxa_429:
+            estado.contar("429")
+            self._responder(429, "Too Many Requests", tipo="text/html")
+            return True
+        return False
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if not url.path.endswith("/api/explore"):
+            return self._responder(404, "{}")
+        if self._limitar("explore"):
+            return
+        req = json.loads(parse_qs(url.query)["req"][0])
+        itens = req["comparisonItem"]
+        pedido = {
+            "termos": [i["keyword"] for i in itens],
+            "time": itens[0]["time"] if itens else "now 7-d",
+            "geo": itens[0].get("geo", "") if itens else "",
+        }
+        widgets = [
+            {"id": "TIMESERIES", "request": dict(pedido), "token": "local"},
+            {"id": "GEO_MAP", "request": dict(pedido), "token": "local"},
+        ]
+        self._responder(200, ")]}'" + json.dumps({"widgets": widgets}))
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/_stats":
+            with self.estado.lock:
+                return self._responder(200, json.dumps(self.estado.contagem))
+        if url.path.rstrip("/").endswith("/explore"):
+            self.estado.contar("cookie")
+            return self._responder(200, "ok", tipo="text/html", cookies=["NID=local; Path=/"])
+        if url.path.endswith("/api/widgetdata/multiline"):
+            if self._limitar("multiline"):
+                return
+            pedido = json.loads(parse_qs(url.query)["req"][0])
+            return self._responder(200, ")]}'," + json.dumps(self._multiline(pedido)))
+        if url.path.endswith("/api/widgetdata/comparedgeo"):
+            if self._limitar("comparedgeo"):
+                return
+            pedido = json.loads(parse_qs(url.query)["req"][0])
+            return self._responder(200, ")]}'," + json.dumps(self._comparedgeo(pedido)))
+        self._responder(404, "{}")
+
+    @staticmethod
+    def _multiline(pedido):
+        series = [serie(t, pedido["time"]) for t in pedido["termos"]]
+        if not series:
+            return {"default": {"timelineData": []}}
+        # Escala compartilhada: o maior ponto do payload vale 100
+        maximo = max((max(b) for _, b in series if b), default=0) or 1
+        pontos = series[0][0]
+        linhas = []
+        for i, t in enumerate(pontos):
+            valores = [int(round(b[i] / maximo * 100)) for _, b in series]
+            linhas.append({
+                "time": str(int(t.timestamp())),
+                "formattedTime": t.strftime("%d/%m/%Y %H:%M"),
+                "value": valores,
+                "hasData": [v > 0 for v in valores],
+                "isPartial": i == len(pontos) - 1,
+            })
+        return {"default": {"timelineData": linhas}}
+
+    @staticmethod
+    def _comparedgeo(pedido):
+        por_termo = [regioes(t) for t in pedido["termos"]]
+        maximo = max((max(v) for v in por_termo), default=0) or 1
+        dados = []
+        for j, (codigo, nome) in enumerate(UFS):
+            valores = [int(round(v[j] / maximo * 100)) for v in por_termo]
+            dados.append({
+                "geoCode": codigo,
+                "geoName": nome,
+                "value": valores,
+                "hasData": [v > 0 for v in valores],
+            })
+        return {"default": {"geoMapData": dados}}
+
+
+def iniciar(porta=0, taxa_429=0.0, latencia=0.0):
+    """Sobe o servidor numa thread; devolve (servidor, url_base)."""
+    handler = type("HandlerTrends", (Handler,), {"estado": Estado(taxa_429, latencia)})
+    servidor = ThreadingHTTPServer(("127.0.0.1", porta), handler)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_address[1]}/trends"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stand-in local do Google Trends")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--taxa-429", type=float, default=0.0)
+    parser.add_argument("--latencia", type=float, default=0.0, help="segundos por requisição")
+    args = parser.parse_args()
+    servidor, url = iniciar(args.porta, args.taxa_429, args.latencia)
+    print(f"Trends local em {url} (Ctrl+C para sair)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        servidor.shutdown()
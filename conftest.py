@@ -0,0 +1,4 @@
+"""
+Raiz dos testes (python -m pytest): este arquivo põe a raiz do repositório
+no sys.path para que `import pulse` funcione também com `pytest` puro.
+"""
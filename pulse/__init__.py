@@ -0,0 +1,3 @@
+"""
+Pulse — código compartilhado pelos coletores e importadores.
+"""
@@ -0,0 +1,364 @@
+"""
+Backfill histórico do Google Trends.
+
+Os coletores diários só pedem 'now 7-d', então o histórico começa no dia
+em que o workflow foi criado. Aqui um intervalo longo (ex.: 5 anos) é
+dividido em janelas de até JANELA_MAX_DIAS (acima disso o Trends passa a
+devolver pontos semanais), com sobreposição entre janelas vizinhas. Cada
+janela vem normalizada 0-100 por conta própria; a costura encadeia as
+janelas pela razão entre elas nos dias sobrepostos (pelo destino, nas
+cestas). Uma sobreposição sem sinal quebra a corrente: os dias anteriores
+a ela não têm como entrar na mesma escala e são descartados.
+
+Cada dia vira uma linha no esquema da carteira (pulse_amazonia,
+pulse_serras, ...): interesse = média móvel de 7 dias da série costurada;
+origens = recorte por região da janela que cobre o dia. A série costurada
+tem escala própria (a do intervalo todo), não a das coletas diárias: cada
+'now 7-d' é normalizado pela semana dele. Para caber na mesma tabela, a
+série é ancorada nas linhas diárias que já existem no histórico local
+(pulse/historico.py) — o fator é a razão entre as somas nos dias em comum,
+e por isso o --fim deve alcançar dias já coletados. Um destino sem
+ANCORA_MIN_DIAS dias em comum fica de fora. Os valores ancorados podem
+passar de 100 em picos acima do nível das coletas diárias. Com
+--sem-ancora a série sai na escala própria (0-100 no intervalo) e só vai
+para o --csv, nunca para o Supabase ou o histórico.
+
+As linhas entram com ignore-duplicates: o backfill nunca sobrescreve um
+dia já coletado.
+
+Uso:
+    python -m pulse.backfill --carteira para --inicio 2021-01-01
+    python -m pulse.backfill --carteira serras-ancora --destino gramado_rs --csv gramado.csv
+"""
+import argparse
+import csv
+import os
+import sys
+from datetime import date, timedelta
+
+import pandas as pd
+
+from pulse.carteiras import CAMPOS_LINHA, carregar_carteiras, celula_csv
+from pulse.erros import ColetaPendente, ErroPulse, rodar
+from pulse.planejador import top3_vetor
+from pulse.trends import GEO, compactar_vetor, top3_origens, vetor_origens
+
+# ==============================
+# CONFIGURAÇÕES
+# ==============================
+
+# Até ~269 dias o Trends devolve pontos diários
+JANELA_MAX_DIAS = 269
+JANELA_DIAS = int(os.environ.get("PULSE_BACKFILL_JANELA_DIAS", "180"))
+SOBREPOSICAO_DIAS = int(os.environ.get("PULSE_BACKFILL_SOBREPOSICAO_DIAS", "30"))
+MEDIA_MOVEL_DIAS = 7
+# Dias em comum com as coletas diárias para ancorar a escala de um destino
+ANCORA_MIN_DIAS = int(os.environ.get("PULSE_BACKFILL_ANCORA_MIN_DIAS", "7"))
+
+# ==============================
+# JANELAS
+# ==============================
+
+def janelas(inicio, fim, tamanho=JANELA_DIAS, sobreposicao=SOBREPOSICAO_DIAS):
+    """[(inicio, fim)] cobrindo o intervalo, vizinhas com `sobreposicao` dias em comum."""
+    tamanho = min(tamanho, JANELA_MAX_DIAS)
+    if sobreposicao >= tamanho:
+        raise ValueError("A sobreposição precisa ser menor que a janela")
+    saida = []
+    atual = inicio
+    while True:
+        ultimo = min(atual + timedelta(days=tamanho - 1), fim)
+        saida.append((atual, ultimo))
+        if ultimo >= fim:
+            return saida
+        atual = ultimo - timedelta(days=sobreposicao - 1)
+
+def timeframe(janela):
+    return f"{janela[0]:%Y-%m-%d} {janela[1]:%Y-%m-%d}"
+
+# ==============================
+# COSTURA
+# ==============================
+
+def costurar(partes, ancora):
+    """
+    Une DataFrames diários (uma coluna por termo) de janelas consecutivas
+    numa escala só. O fator de cada janela vem da coluna `ancora` nos dias
+    sobrepostos já costurados; sem sinal na âncora, usa todas as colunas.
+    Sem sinal em nenhuma, a costura recomeça na janela (fator None) e o que
+    veio antes é descartado. Devolve (série costurada 0-100, fatores).
+    """
+    resultado = None
+    fatores = []
+    for parte in partes:
+        parte = parte.astype(float)
+        if resultado is None or resultado.empty:
+            resultado = parte
+            fatores.append(1.0)
+            continue
+        if parte.empty:
+            fatores.append(None)
+            continue
+
+        comum = resultado.index.intersection(parte.index)
+        fator = None
+        for colunas in ([ancora], list(parte.columns)):
+            colunas = [c for c in colunas if c in resultado.columns and c in parte.columns]
+            antes = resultado.loc[comum, colunas].to_numpy().sum()
+            depois = parte.loc[comum, colunas].to_numpy().sum()
+            if antes > 0 and depois > 0:
+                fator = antes / depois
+                break
+        if fator is None:
+            # Sem sinal na sobreposição não há razão entre as janelas: em vez de
+            # emendar escalas diferentes, a série recomeça aqui
+            print(f"    ⚠️ sobreposição sem sinal em {parte.index.min():%Y-%m-%d}; "
+                  f"dias até {resultado.index.max():%Y-%m-%d} descartados")
+            resultado = parte
+            fatores.append(None)
+            continue
+        fatores.append(fator)
+
+        novos = parte[parte.index > resultado.index.max()] * fator
+        resultado = pd.concat([resultado, novos])
+
+    if resultado is None:
+        return pd.DataFrame(), fatores
+    maximo = resultado.to_numpy().max() if not resultado.empty else 0
+    if maximo > 0:
+        resultado = resultado * (100.0 / maximo)
+    return resultado, fatores
+
+# ==============================
+# LINHAS
+# ==============================
+
+def origens_da_janela(carteira, destino, regioes):
+    """Top 3 + origens_vetor da janela (intenção da cesta, senão o termo bruto)."""
+    if carteira.modo == "cesta":
+        vetor = vetor_origens(regioes, destino["cesta"])
+        if vetor.any():
+            return top3_vetor(vetor) + (compactar_vetor(vetor),)
+    vetor = compactar_vetor(vetor_origens(regioes, [destino["termo"]]))
+    return top3_origens(regioes, destino["termo"]) + (vetor,)
+
+def interesse_diario(carteira, destino, costurada):
+    """
+    interesse de cada dia na escala da série costurada: média móvel de 7
+    dias, como a janela 'now 7-d', e 0.4 * bruto + 0.6 * intenção nas cestas.
+    """
+    if costurada.empty:
+        return pd.Series(dtype=float)
+    media = costurada.rolling(MEDIA_MOVEL_DIAS, min_periods=MEDIA_MOVEL_DIAS).mean().dropna(how="all")
+    bruto = media[destino["termo"]] if destino["termo"] in media else pd.Series(0.0, index=media.index)
+    if carteira.modo == "cesta" and destino["cesta"]:
+        intencao = media.reindex(columns=destino["cesta"], fill_value=0).sum(axis=1) / len(destino["cesta"])
+        return 0.4 * bruto + 0.6 * intencao
+    return bruto
+
+def fator_ancora(interesse, diarias, minimo=ANCORA_MIN_DIAS):
+    """
+    Fator que leva a série do backfill à escala das coletas diárias (data ->
+    interesse): razão entre as somas nos dias em comum. None se houver menos
+    de `minimo` dias em comum ou nenhum sinal neles.
+    """
+    datas = interesse.index.strftime("%Y-%m-%d")
+    comuns = [(valor, diarias[data]) for data, valor in zip(datas, interesse) if data in diarias]
+    if len(comuns) < minimo:
+        return None
+    backfill = sum(v for v, _ in comuns)
+    coletado = sum(d for _, d in comuns)
+    if backfill <= 0 or coletado <= 0:
+        return None
+    return coletado / backfill
+
+def montar_linhas(destino, interesse, fator, janelas_destino, origens_por_janela, inicio, fim):
+    """Uma linha por dia no formato CAMPOS_LINHA, com o interesse multiplicado pelo fator."""
+    linhas = []
+    for dia, valor in interesse.items():
+        if not (inicio <= dia.date() <= fim):
+            continue
+        # Origens da última janela que começa até o dia
+        indice = max(i for i, janela in enumerate(janelas_destino) if janela[0] <= dia.date())
+        linhas.append([f"{dia:%Y-%m-%d}", destino["id"], int(round(valor * fator))]
+                      + list(origens_por_janela[indice]))
+    return linhas
+
+def ancoras_do_historico(carteiras, inicio, fim):
+    """(carteira, destino_id) -> {data: interesse} das coletas diárias no intervalo."""
+    from pulse.historico import ler
+
+    tabela = ler([c.nome for c in carteiras], ["carteira", "data_coleta", "destino_id", "interesse"],
+                 desde=inicio, ate=fim)
+    saida = {}
+    for linha in tabela.to_pylist():
+        if linha["interesse"] is not None:
+            saida.setdefault((linha["carteira"], linha["destino_id"]), {})[
+                f"{linha['data_coleta']:%Y-%m-%d}"] = linha["interesse"]
+    return saida
+
+# ==============================
+# EXECUÇÃO
+# ==============================
+
+def backfill(carteiras, pool, inicio, fim, destinos=None, com_origens=True, ancoras=None):
+    """
+    Coleta e costura o histórico. Devolve nome da carteira -> linhas.
+    Todas as janelas de todos os destinos vão para o pool de uma vez.
+    ancoras: (carteira, destino_id) -> {data: interesse} das coletas
+    diárias; destinos sem âncora ficam de fora. None = sem ancorar (escala
+    própria 0-100).
+    """
+    # O primeiro dia precisa de MEDIA_MOVEL_DIAS - 1 dias anteriores
+    coleta_inicio = inicio - timedelta(days=MEDIA_MOVEL_DIAS - 1)
+    lista_janelas = janelas(coleta_inicio, fim)
+
+    tarefas = []
+    for carteira in carteiras:
+        for destino in carteira.destinos:
+            if destinos and destino["id"] not in destinos:
+                continue
+            termos = [destino["termo"]] + (destino["cesta"] if carteira.modo == "cesta" else [])
+            if len(termos) > 5:
+                print(f"⚠️ {destino['id']}: cesta com mais de 4 termos, usando só os 4 primeiros")
+                termos = termos[:5]
+                destino = dict(destino, cesta=termos[1:])
+            for janela in lista_janelas:
+                tarefas.append((carteira, destino, termos, janela))
+
+    print(f"🧭 Backfill: {len(tarefas)} janelas ({len(lista_janelas)} por destino), "
+          f"{inicio} a {fim}, {JANELA_DIAS}d com {SOBREPOSICAO_DIAS}d de sobreposição")
+
+    def buscar(cliente, tarefa):
+        _, destino, termos, janela = tarefa
+        consulta = cliente.consulta(termos, timeframe=timeframe(janela))
+        dados = consulta.interesse_no_tempo()
+        regioes = consulta.interesse_por_regiao() if com_origens else pd.DataFrame()
+        if not dados.empty:
+            dados = dados[[t for t in termos if t in dados.columns]]
+        print(f"  {destino['id']} {timeframe(janela)}: {len(dados)} dias")
+        return dados, regioes
+
+    respostas = pool.mapear(buscar, tarefas)
+
+    resultados = {carteira.nome: [] for carteira in carteiras}
+    por_destino = {}
+    for tarefa, resposta in zip(tarefas, respostas):
+        carteira, destino = tarefa[0], tarefa[1]
+        por_destino.setdefault((carteira.nome, destino["id"]), (carteira, destino, []))[2].append(
+            (tarefa[3], resposta)
+        )
+
+    for carteira, destino, janelas_respostas in por_destino.values():
+        janelas_destino = [j for j, _ in janelas_respostas]
+        costurada, fatores = costurar([r[0] for _, r in janelas_respostas], destino["termo"])
+        escala = ", ".join("-" if f is None else f"{f:.2f}" for f in fatores)
+        interesse = interesse_diario(carteira, destino, costurada)
+        fator = 1.0
+        if ancoras is not None:
+            fator = fator_ancora(interesse, ancoras.get((carteira.nome, destino["id"]), {}))
+            if fator is None:
+                print(f"  ⚠️ {destino['id']}: menos de {ANCORA_MIN_DIAS} dias em comum com as coletas "
+                      f"diárias no histórico; fora do backfill (fatores {escala})")
+                continue
+        origens = [origens_da_janela(carteira, destino, r[1]) for _, r in janelas_respostas]
+        linhas = montar_linhas(destino, interesse, fator, janelas_destino, origens, inicio, fim)
+        print(f"  🧵 {destino['id']}: {len(linhas)} dias (fatores {escala}; âncora {fator:.3f})")
+        resultados[carteira.nome].extend(linhas)
+    return resultados
+
+def gravar(carteira, linhas, url, chave):
+    """Envia as linhas pelo esquema da carteira sem sobrescrever dias existentes."""
+    from pulse.importador import ESQUEMAS, Importador
+
+    esquema = ESQUEMAS[carteira.esquema]
+    importador = Importador(esquema, url, chave, resolucao="ignore-duplicates")
+    registros = (
+        dict({c: v for c, v in zip(CAMPOS_LINHA, linha) if c in esquema.colunas}, **esquema.fixos)
+        for linha in linhas
+    )
+    inseridos = importador.importar(registros)
+    print(f"✅ {carteira.nome}: {inseridos} dias novos em {esquema.tabela} "
+          f"({len(linhas) - inseridos} já existiam)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backfill histórico do Google Trends")
+    parser.add_argument("--carteira", action="append", required=True,
+                        help="nome em pulse/carteiras.json (pode repetir)")
+    parser.add_argument("--destino", action="append", help="destino_id (pode repetir; padrão: todos)")
+    parser.add_argument("--inicio", default=str(date.today() - timedelta(days=5 * 365)))
+    parser.add_argument("--fim", default=str(date.today() - timedelta(days=1)))
+    parser.add_argument("--csv", help="grava as linhas também neste CSV")
+    parser.add_argument("--sem-origens", action="store_true", help="não pede o recorte por região")
+    parser.add_argument("--sem-supabase", action="store_true")
+    parser.add_argument("--historico", action="store_true", help="anexa as linhas ao histórico Parquet local")
+    parser.add_argument("--sem-ancora", action="store_true",
+                        help="não ancora nas coletas diárias (escala própria; só para o --csv)")
+    args = parser.parse_args(argv)
+
+    from pulse.cache import CacheTrends
+    from pulse.disjuntor import CircuitoAberto
+    from pulse.sessoes import PoolTrends
+
+    todas = {c.nome: c for c in carregar_carteiras(None)}
+    faltando = [n for n in args.carteira if n not in todas]
+    if faltando:
+        raise ErroPulse(f"Carteira(s) desconhecida(s): {', '.join(faltando)}")
+    carteiras = [todas[n] for n in args.carteira]
+
+    inicio, fim = date.fromisoformat(args.inicio), date.fromisoformat(args.fim)
+    ancoras = None
+    if args.sem_ancora:
+        if not args.csv:
+            raise ErroPulse("--sem-ancora grava só no --csv: informe o arquivo.")
+        # Escala própria não se mistura com as coletas diárias
+        args.historico = False
+        args.sem_supabase = True
+    else:
+        try:
+            ancoras = ancoras_do_historico(carteiras, inicio, fim)
+        except ImportError as e:
+            raise ErroPulse("pyarrow não instalado: sem o histórico não há como ancorar "
+                            "(use --sem-ancora --csv).") from e
+        if not ancoras:
+            raise ErroPulse(f"Nenhuma coleta diária no histórico entre {inicio} e {fim} para ancorar a escala "
+                            f"(python -m pulse.historico semear, ou --fim até um dia já coletado).")
+
+    cache = CacheTrends()
+    pool = PoolTrends(geo=GEO, cache=cache)
+    try:
+        resultados = backfill(
+            carteiras, pool, inicio, fim,
+            destinos=set(args.destino or []), com_origens=not args.sem_origens, ancoras=ancoras,
+        )
+    except CircuitoAberto as e:
+        # As janelas já baixadas ficam no cache: repetir o comando continua daí
+        raise ColetaPendente(f"Backfill interrompido: {e}") from e
+    print(f"⏱️ Sessões Trends: {pool.resumo()}")
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(CAMPOS_LINHA + ["carteira"])
+            for nome, linhas in resultados.items():
+                writer.writerows([celula_csv(v) for v in linha] + [nome] for linha in linhas)
+        print(f"📄 {args.csv} gravado")
+
+    if args.historico:
+        from pulse.historico import anexar
+
+        for nome, linhas in resultados.items():
+            print(f"🗃️ {nome}: {anexar(nome, linhas)} linhas no histórico")
+
+    url = os.environ.get("SUPABASE_URL")
+    chave = os.environ.get("SUPABASE_KEY") or os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+    if args.sem_supabase or not url or not chave:
+        print("Supabase não configurado ou desativado - nada enviado.")
+        return
+    for carteira in carteiras:
+        if resultados[carteira.nome]:
+            gravar(carteira, resultados[carteira.nome], url, chave)
+
+
+if __name__ == "__main__":
+    sys.exit(rodar(main))
@@ -0,0 +1,142 @@
+"""
+Cache local em disco das respostas do Google Trends.
+
+Cada entrada é um arquivo JSON endereçado pelo sha256 da chave
+(termos, timeframe, geo, resolução). Entradas vencidas (TTL) são
+descartadas na leitura (pelo criado_em gravado na entrada) e o diretório é
+podado pelas menos usadas (mtime, tocado a cada leitura) quando
+passa do tamanho máximo. Uma re-execução no mesmo dia é servida daqui,
+sem voltar ao endpoint do Trends.
+"""
+import hashlib
+import json
+import os
+import time
+from io import StringIO
+
+# ==============================
+# CONFIGURAÇÕES
+# ==============================
+
+CACHE_DIR = os.environ.get("PULSE_CACHE_DIR", os.path.join(".pulse", "cache", "trends"))
+# PULSE_CACHE_TTL_HORAS=0 desliga o cache
+CACHE_TTL_HORAS = float(os.environ.get("PULSE_CACHE_TTL_HORAS", "20"))
+CACHE_MAX_MB = float(os.environ.get("PULSE_CACHE_MAX_MB", "50"))
+
+
+class CacheTrends:
+
+    def __init__(self, diretorio=CACHE_DIR, ttl_horas=CACHE_TTL_HORAS, max_mb=CACHE_MAX_MB):
+        self.diretorio = diretorio
+        self.ttl = ttl_horas * 3600
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.acertos = 0
+        self.faltas = 0
+
+    @property
+    def ativo(self):
+        return self.ttl > 0
+
+    @staticmethod
+    def chave(termos, timeframe, geo, resolucao):
+        return {
+            "termos": list(termos),
+            "timeframe": timeframe,
+            "geo": geo,
+            "resolucao": resolucao,
+        }
+
+    def _caminho(self, chave):
+        bruto = json.dumps(chave, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        return os.path.join(self.diretorio, hashlib.sha256(bruto).hexdigest() + ".json")
+
+    def _entrada(self, caminho):
+        """
+        Entrada gravada no caminho, ou None se ausente/vencida. O TTL conta
+        de criado_em: o mtime é o do último uso (poda), não o da gravação.
+        """
+        try:
+            with open(caminho, encoding="utf-8") as f:
+                entrada = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entrada["criado_em"] > self.ttl:
+            self._remover(caminho)
+            return None
+        return entrada
+
+    def contem(self, chave):
+        """Se há entrada válida para a chave (sem contar acerto/falta)."""
+        if not self.ativo:
+            return False
+        return self._entrada(self._caminho(chave)) is not None
+
+    def ler(self, chave):
+        """DataFrame guardado para a chave, ou None se ausente/vencido."""
+        if not self.ativo:
+            return None
+        caminho = self._caminho(chave)
+        entrada = self._entrada(caminho)
+        if entrada is None:
+            self.faltas += 1
+            return None
+
+        import pandas as pd
+
+        df = pd.read_json(StringIO(entrada["dados"]), orient="split")
+        if entrada.get("indice_datas"):
+            df.index = pd.to_datetime(df.index)
+        df.index.name = entrada.get("nome_indice")
+        # Marca o uso para a poda (mais antigos saem primeiro)
+        os.utime(caminho)
+        self.acertos += 1
+        return df
+
+    def gravar(self, chave, df):
+        if not self.ativo:
+            return
+        import pandas as pd
+
+        os.makedirs(self.diretorio, exist_ok=True)
+        entrada = {
+            "chave": chave,
+            "criado_em": time.time(),
+            "indice_datas": isinstance(df.index, pd.DatetimeIndex),
+            "nome_indice": df.index.name,
+            "dados": df.to_json(orient="split", date_format="iso"),
+        }
+        caminho = self._caminho(chave)
+        temporario = caminho + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(entrada, f, ensure_ascii=False)
+        os.replace(temporario, caminho)
+        self._podar()
+
+    def _remover(self, caminho):
+        try:
+            os.remove(caminho)
+        except OSError:
+            pass
+
+    def _podar(self):
+        """Remove as entradas menos usadas até caber em max_bytes."""
+        arquivos = []
+        total = 0
+        with os.scandir(self.diretorio) as it:
+            for item in it:
+                if not item.name.endswith(".json"):
+                    continue
+                try:
+                    st = item.stat()
+                except OSError:
+                    # Removido por outra sessão do pool no meio da poda
+                    continue
+                arquivos.append((st.st_mtime, st.st_size, item.path))
+                total += st.st_size
+        if total <= self.max_bytes:
+            return
+        for _, tamanho, caminho in sorted(arquivos):
+            self._remover(caminho)
+            total -= tamanho
+            if total <= self.max_bytes:
+                break
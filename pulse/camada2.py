@@ -0,0 +1,220 @@
+"""
+Camada 2 (proxy de mercado emissor) pré-calculada, tabela pulse_origem.
+
+O pulseCamada2Compute() dos radares normaliza nomes de estado com regex a
+cada linha e a cada render, tira o viés local (a UF do próprio destino) e
+conta a recorrência das origens nas últimas PULSE_LOOKBACK coletas. Aqui
+isso roda uma vez por coleta: as origens viram siglas de UF (pulse.uf, que
+também aceita os nomes antigos do histórico) e cada destino e dia recebe a
+classificação observada / inferida / insuficiente.
+
+Correções em relação ao JS antigo, portadas também para o
+pulseCamada2Compute() das páginas (o cálculo de quando não há linha
+pré-calculada), para o card mostrar a mesma leitura nos dois caminhos:
+- a UF local é a de carteiras.json ("uf") e as origens viram sigla, então
+  'PA' casa com as origens (antes 'PARA' nunca era igual a 'PA' e o viés
+  local não era removido);
+- a coleta "atual" é a mais recente e a recorrência usa as 6 mais recentes
+  (o JS recebia as linhas em ordem decrescente e olhava as mais antigas);
+- origem ausente ("none") não conta como estado.
+
+    python -m pulse.camada2
+    python -m pulse.camada2 --carteira para --tudo --sem-supabase --csv origem.csv
+"""
+import argparse
+import csv
+import json
+import math
+import os
+from collections import deque
+from datetime import date, timedelta
+
+from pulse.uf import SEM_ORIGEM, sigla
+
+# ==============================
+# CONFIGURAÇÕES
+# ==============================
+
+CAMADA2_CARTEIRAS = [
+    c.strip() for c in os.environ.get("PULSE_CAMADA2_CARTEIRAS", "para,serras-ancora").split(",") if c.strip()
+]
+CAMADA2_DIAS = int(os.environ.get("PULSE_CAMADA2_DIAS", "14"))
+
+# Mesmos critérios do JS
+REDUTOR_LOCAL_HUB = 0.40     # peso da UF local em capitais/hubs
+MIN_ORIGENS = 3              # diversidade mínima
+LIMITE_DOMINANCIA = 70       # se 1 origem >= 70%, sinal fraco
+MIN_RECORRENCIAS = 2         # recorrência mínima
+JANELA = 6                   # últimas N coletas
+
+COLUNAS_ORIGEM = [
+    "carteira",
+    "destino_id",
+    "data_coleta",
+    "modo",
+    "badge",
+    "texto",
+    "ajuste",
+    "origens",
+    "recorrencia",
+]
+
+# ==============================
+# CÁLCULO
+# ==============================
+
+def extrair_top3(linha):
+    """[(uf, pct)] das três origens da linha, maior pct primeiro."""
+    saida = []
+    for i in (1, 2, 3):
+        nome, pct = linha.get(f"origem_{i}"), linha.get(f"origem_{i}_pct")
+        if not nome or nome == SEM_ORIGEM or pct is None:
+            continue
+        pct = float(pct)
+        if not math.isfinite(pct):
+            continue
+        # Nome fora da tabela de UFs (região estrangeira) fica como veio
+        saida.append((sigla(nome) or str(nome).upper(), int(pct) if pct.is_integer() else pct))
+    return sorted(saida, key=lambda x: x[1], reverse=True)
+
+def ajustar_vies_local(destino, top3):
+    """(origens ajustadas, modo): UF local removida, ou ponderada em hubs."""
+    local = sigla(destino.get("uf"))
+    if not local:
+        return list(top3), "no_local_config"
+    if not destino.get("hub"):
+        return [x for x in top3 if x[0] != local], "local_removed"
+    ajustadas = [(uf, math.floor(pct * REDUTOR_LOCAL_HUB + 0.5) if uf == local else pct) for uf, pct in top3]
+    return sorted(ajustadas, key=lambda x: x[1], reverse=True), "local_pondered"
+
+def observada_valida(ajustadas):
+    return len(ajustadas) >= MIN_ORIGENS and ajustadas[0][1] < LIMITE_DOMINANCIA
+
+def recorrencia(destino, janela):
+    """[(uf, n)] nas coletas da janela, mais recorrente primeiro (empate: primeira vista)."""
+    contagem = {}
+    for linha in janela:
+        for uf, _ in ajustar_vies_local(destino, extrair_top3(linha))[0]:
+            contagem[uf] = contagem.get(uf, 0) + 1
+    return sorted(contagem.items(), key=lambda x: x[1], reverse=True)
+
+def classificar(destino, janela):
+    """Leitura da Camada 2 para a coleta mais recente da janela (ordem cronológica)."""
+    ajustadas, ajuste = ajustar_vies_local(destino, extrair_top3(janela[-1]))
+    rec = recorrencia(destino, janela)
+    saida = {
+        "ajuste": ajuste,
+        "origens": [{"uf": uf, "pct": pct} for uf, pct in ajustadas],
+        "recorrencia": [{"uf": uf, "n": n} for uf, n in rec],
+    }
+    if not ajustadas:
+        return dict(saida, modo="insuficiente", badge="Baixo volume",
+                    texto="Origem não observável (sinal insuficiente para leitura de mercado emissor).")
+
+    topo = rec[0] if rec else None
+    recorrente = topo is not None and topo[1] >= MIN_RECORRENCIAS
+    if observada_valida(ajustadas):
+        if recorrente:
+            badge = f"Origem recorrente: {topo[0]} ({topo[1]}/{len(janela)})"
+        else:
+            badge = "Origem observada (Top 3)"
+        partes = [f"Origem (Top 3 ajustado): {ajustadas[0][0]} {ajustadas[0][1]}%"]
+        partes += [f"{uf} {pct}%" for uf, pct in ajustadas[1:3]]
+        if recorrente:
+            partes.append(f"• Recorrência externa: {topo[0]} em {topo[1]} períodos recentes")
+        if ajuste == "local_pondered":
+            partes.append("• Local ponderado (capital/hub)")
+        if ajuste == "local_removed":
+            partes.append("• Local removido (viés endógeno)")
+        return dict(saida, modo="observada", badge=badge, texto=" | ".join(partes))
+
+    if recorrente:
+        return dict(saida, modo="inferida",
+                    badge=f"⚠️ Origem inferida: {topo[0]} ({topo[1]}/{len(janela)})",
+                    texto=f"Baixa diversidade de origem detectada. Mercado mais recorrente "
+                          f"nas últimas leituras: {topo[0]}.")
+    return dict(saida, modo="insuficiente", badge="⚠️ Baixa diversidade",
+                texto="Sinal de origem não confiável (dominância alta de mercado único). "
+                      "Aguarde mais leituras.")
+
+def calcular(carteira, linhas):
+    """
+    linhas: dicts com data_coleta, destino_id e origens, de uma carteira.
+    Uma janela deslizante por destino; devolve uma leitura por destino e dia.
+    """
+    destinos = {d["id"]: d for d in carteira.destinos}
+    janelas = {}
+    saida = []
+    for linha in sorted(linhas, key=lambda l: (str(l["data_coleta"]), l["destino_id"])):
+        destino_id = linha["destino_id"]
+        janela = janelas.setdefault(destino_id, deque(maxlen=JANELA))
+        janela.append(linha)
+        leitura = classificar(destinos.get(destino_id, {}), list(janela))
+        saida.append(dict(carteira=carteira.nome, destino_id=destino_id,
+                          data_coleta=str(linha["data_coleta"])[:10], **leitura))
+    return saida
+
+# ==============================
+# EXECUÇÃO
+# ==============================
+
+def esquema_origem():
+    from pulse.importador import Esquema
+
+    return Esquema(
+        "pulse_origem", "carteira,destino_id,data_coleta",
+        {coluna: None for coluna in COLUNAS_ORIGEM}, None, incremental=False,
+    )
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pré-calcula a Camada 2 (origem ajustada) dos radares")
+    parser.add_argument("--carteira", action="append", help="padrão: PULSE_CAMADA2_CARTEIRAS")
+    parser.add_argument("--tudo", action="store_true", help="envia todo o histórico")
+    parser.add_argument("--csv", help="grava as leituras também neste CSV")
+    parser.add_argument("--sem-supabase", action="store_true")
+    args = parser.parse_args(argv)
+
+    from pulse.carteiras import CAMPOS_LINHA, carregar_carteiras
+    from pulse.historico import ler
+
+    desde = None if args.tudo else str(date.today() - timedelta(days=CAMADA2_DIAS))
+    url = os.environ.get("SUPABASE_URL")
+    chave = os.environ.get("SUPABASE_KEY") or os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+    enviar = not args.sem_supabase and url and chave
+    if not enviar:
+        print("Supabase não configurado ou desativado - nada enviado.")
+
+    todas = {c.nome: c for c in carregar_carteiras(None)}
+    saida = []
+    for nome in args.carteira or CAMADA2_CARTEIRAS:
+        carteira = todas[nome]
+        # A janela precisa das JANELA - 1 coletas anteriores ao primeiro dia enviado
+        inicio = None if desde is None else date.fromisoformat(desde) - timedelta(days=4 * JANELA)
+        linhas = ler([nome], CAMPOS_LINHA, desde=inicio).to_pylist()
+        leituras = [l for l in calcular(carteira, linhas) if desde is None or l["data_coleta"] >= desde]
+        modos = {}
+        for leitura in leituras:
+            modos[leitura["modo"]] = modos.get(leitura["modo"], 0) + 1
+        print(f"🧭 {nome}: {len(leituras)} leituras " + ", ".join(f"{m} {n}" for m, n in sorted(modos.items())))
+        saida.extend(leituras)
+        if enviar and leituras:
+            from pulse.importador import Importador
+
+            confirmados = Importador(esquema_origem(), url, chave).importar(leituras)
+            print(f"✅ {nome}: {confirmados} linhas confirmadas em pulse_origem")
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=COLUNAS_ORIGEM)
+            writer.writeheader()
+            for leitura in saida:
+                writer.writerow(dict(
+                    leitura,
+                    origens=json.dumps(leitura["origens"], ensure_ascii=False),
+                    recorrencia=json.dumps(leitura["recorrencia"], ensure_ascii=False),
+                ))
+        print(f"📄 {args.csv} gravado")
+
+
+if __name__ == "__main__":
+    main()
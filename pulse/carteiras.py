@@ -0,0 +1,167 @@
+"""
+Registro das carteiras de destinos (pulse/carteiras.json).
+
+Cada carteira diz quais destinos coletar, como (bruto ou cesta de
+intenção), para qual CSV e, opcionalmente, para qual tabela do Supabase.
+A ordem das carteiras no arquivo é a prioridade delas no plano de coleta.
+Para incluir um destino ou uma carteira nova basta editar o JSON.
+"""
+import csv
+import json
+import os
+from itertools import zip_longest
+
+import requests
+
+from pulse import telemetria
+from pulse.erros import ErroPulse
+from pulse.uf import formatar_vetor
+
+# ==============================
+# CONFIGURAÇÕES
+# ==============================
+
+CARTEIRAS_ARQUIVO = os.environ.get(
+    "PULSE_CARTEIRAS_ARQUIVO", os.path.join(os.path.dirname(os.path.abspath(__file__)), "carteiras.json")
+)
+# PULSE_COLETORES=todos junta as carteiras de todos os coletores num único plano
+COLETORES = os.environ.get("PULSE_COLETORES", "").strip().lower()
+
+SUPABASE_URL = os.environ.get("SUPABASE_URL", "")
+SUPABASE_KEY = os.environ.get("SUPABASE_SERVICE_ROLE_KEY", "")
+
+# Ordem dos campos numa linha coletada
+CAMPOS_LINHA = [
+    "data_coleta",
+    "destino_id",
+    "interesse",
+    "origem_1",
+    "origem_1_pct",
+    "origem_2",
+    "origem_2_pct",
+    "origem_3",
+    "origem_3_pct",
+    # Recorte inteiro por UF (pulse/uf.py ORDEM_UF); lista de 27 inteiros ou None
+    "origens_vetor",
+]
+
+# ==============================
+# CARTEIRAS
+# ==============================
+
+def id_padrao(termo):
+    return termo.lower().replace(" ", "_")
+
+
+class Carteira:
+
+    def __init__(self, config, prioridade):
+        self.nome = config["nome"]
+        self.coletor = config["coletor"]
+        self.modo = config.get("modo", "bruto")
+        self.descricao = config.get("descricao", "")
+        self.csv = config["csv"]
+        # Esquema de pulse/importador.py usado pelo import e pelo backfill
+        self.esquema = config.get("esquema")
+        self.colunas = config.get("colunas", CAMPOS_LINHA)
+        self.tabela = config.get("tabela")
+        # Carteira cujos destinos são os concorrentes destes (IPCR, pulse/ipcr.py)
+        self.concorrencia = config.get("concorrencia")
+        self.prioridade = prioridade
+        self.destinos = []
+        for destino in config["destinos"]:
+            self.destinos.append({
+                "termo": destino["termo"],
+                "id": destino.get("id") or id_padrao(destino["termo"]),
+                "cesta": list(destino.get("cesta", [])),
+                "concorrentes": list(destino.get("concorrentes", [])),
+                # UF do próprio destino (viés local das origens) e se é capital/hub
+                "uf": destino.get("uf") or config.get("uf"),
+                "hub": bool(destino.get("hub")),
+            })
+        if self.modo not in ("bruto", "cesta"):
+            raise ValueError(f"Carteira {self.nome}: modo desconhecido '{self.modo}'")
+
+    def __repr__(self):
+        return f"Carteira({self.nome}, {len(self.destinos)} destinos)"
+
+
+def carregar_carteiras(coletor=None, caminho=CARTEIRAS_ARQUIVO):
+    """
+    Carteiras do registro, na ordem do arquivo. Com coletor, só as dele
+    (a menos que PULSE_COLETORES=todos ou uma lista separada por vírgula).
+    """
+    with open(caminho, encoding="utf-8") as f:
+        config = json.load(f)
+    carteiras = [Carteira(c, i) for i, c in enumerate(config["carteiras"])]
+
+    if COLETORES == "todos":
+        return carteiras
+    coletores = {c.strip() for c in COLETORES.split(",") if c.strip()}
+    if coletor:
+        coletores.add(coletor)
+    if not coletores:
+        return carteiras
+    return [c for c in carteiras if c.coletor in coletores]
+
+# ==============================
+# SAÍDAS
+# ==============================
+
+def celula_csv(valor):
+    """Valor de uma linha coletada como célula de CSV (origens_vetor vira "0;12;...")."""
+    if isinstance(valor, (list, tuple)):
+        return formatar_vetor(valor)
+    return "" if valor is None else valor
+
+def gravar_csv(carteira, linhas):
+    indices = [CAMPOS_LINHA.index(coluna) for coluna in carteira.colunas]
+    with open(carteira.csv, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(carteira.colunas)
+        for linha in linhas:
+            # Linhas retomadas de um diário antigo não têm origens_vetor
+            writer.writerow([celula_csv(linha[i] if i < len(linha) else None) for i in indices])
+
+def inserir_supabase(carteira, linhas):
+    """Upsert das linhas na tabela da carteira (se ela tiver uma)."""
+    if not carteira.tabela:
+        return
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        print("Variaveis Supabase nao definidas - pulando insercao.")
+        return
+
+    headers = {
+        "apikey": SUPABASE_KEY,
+        "Authorization": f"Bearer {SUPABASE_KEY}",
+        "Content-Type": "application/json",
+        # Upsert: uma execucao retomada pode reenviar linhas ja inseridas
+        "Prefer": "resolution=merge-duplicates,return=minimal"
+    }
+
+    tipo = carteira.tabela.get("tipo")
+    payload = []
+    for linha in linhas:
+        # Linhas retomadas de um diário antigo não têm origens_vetor: o PostgREST
+        # recusa um lote cujos objetos não tenham todos as mesmas chaves
+        registro = {campo: valor for campo, valor in zip_longest(CAMPOS_LINHA, linha)}
+        if tipo:
+            registro["tipo"] = tipo
+        payload.append(registro)
+
+    on_conflict = carteira.tabela.get("on_conflict") or (
+        "destino_id,data_coleta,tipo" if tipo else "destino_id,data_coleta"
+    )
+    r = requests.post(
+        f"{SUPABASE_URL}/rest/v1/{carteira.tabela['nome']}",
+        params={"on_conflict": on_conflict},
+        headers=headers,
+        json=payload,
+        timeout=30,
+        hooks={"response": telemetria.gancho("supabase")}
+    )
+
+    if r.status_code in (200, 201):
+        print(f"  {len(payload)} registros ({carteira.nome}) inseridos no Supabase.")
+    else:
+        raise ErroPulse(f"Erro Supabase {r.status_code} ({carteira.nome}): {r.text}")
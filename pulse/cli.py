@@ -0,0 +1,159 @@
+"""
+Linha de comando única do Pulse.
+
+    pulse coletar amazonia            # ou serras, hotel, ou uma carteira (para, serras-ancora...)
+    pulse importar serras serras-concorrentes
+    pulse backfill --carteira para --inicio 2024-01-01
+    pulse coletar serras + importar serras serras-concorrentes + indices
+
+Etapas separadas por "+" rodam no mesmo processo, em ordem, e a execução
+para na primeira que levantar ErroPulse (pulse/erros.py): é aqui, e não
+na biblioteca, que o erro vira código de saída (75 = coleta adiada pelo
+disjuntor). Cada subcomando importa o que usa só na hora de rodar:
+`pulse --help` não carrega pandas, pytrends nem requests.
+
+O ponto de entrada é `python -m pulse` (o repositório não é um pacote
+instalável; "pulse" acima é esse comando).
+"""
+import argparse
+import sys
+
+from pulse import telemetria
+from pulse.erros import ErroPulse, rodar
+
+SEPARADOR_ETAPAS = "+"
+COLETOR_HOTEL = "hotel"
+
+# Subcomandos que repassam os argumentos ao main(argv) do módulo
+MODULOS = {
+    "backfill": "Backfill histórico do Google Trends (pulse/backfill.py)",
+    "indices": "Pré-calcula os índices dos dashboards (pulse/indices.py)",
+    "ipcr": "Pré-calcula o IPCR dos radares (pulse/ipcr.py)",
+    "camada2": "Pré-calcula a Camada 2 dos radares (pulse/camada2.py)",
+    "snapshots": "Snapshots estáticos dos painéis (pulse/snapshots.py)",
+    "historico": "Histórico Parquet local: resumo ou semear (pulse/historico.py)",
+}
+
+# ==============================
+# ETAPAS
+# ==============================
+
+def coletar(args):
+    for alvo in args.alvos:
+        if alvo == COLETOR_HOTEL:
+            from pulse.hotel import coletar_hotel
+
+            coletar_hotel()
+            continue
+
+        from pulse.carteiras import carregar_carteiras
+        from pulse.coleta import coletar as coletar_trends
+
+        carteiras = carregar_carteiras()
+        if any(c.coletor == alvo for c in carteiras):
+            coletar_trends(alvo, data=args.data)
+            continue
+        carteira = next((c for c in carteiras if c.nome == alvo), None)
+        if carteira is None:
+            coletores = sorted({c.coletor for c in carteiras} | {COLETOR_HOTEL})
+            raise ErroPulse(f"Alvo desconhecido: {alvo} (coletores: {', '.join(coletores)}; "
+                            f"carteiras: {', '.join(c.nome for c in carteiras)})", codigo=2)
+        coletar_trends(carteira.coletor, nomes=[carteira.nome], data=args.data)
+
+def importar(args):
+    from pulse.carteiras import carregar_carteiras
+    from pulse.importador import ESQUEMAS, importar_csv, opcoes_importacao
+
+    # Carteira -> esquema pelo CSV que ela grava (para -> amazonia...)
+    por_csv = {esquema.csv_padrao: nome for nome, esquema in ESQUEMAS.items()}
+    por_carteira = {c.nome: por_csv[c.csv] for c in carregar_carteiras() if c.csv in por_csv}
+
+    for alvo in args.alvos:
+        nome = alvo if alvo in ESQUEMAS else por_carteira.get(alvo)
+        if nome is None:
+            raise ErroPulse(f"Esquema desconhecido: {alvo} ({', '.join(ESQUEMAS)})", codigo=2)
+        print(f"📥 Importando {nome}")
+        importar_csv(nome, **opcoes_importacao(nome))
+
+def modulo(args):
+    from importlib import import_module
+
+    import_module(f"pulse.{args.comando}").main(args.argumentos)
+
+# ==============================
+# ARGUMENTOS
+# ==============================
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        prog="pulse",
+        description="Coleta, importação e cálculos do Pulse. Encadeie etapas com ' + '.",
+    )
+    sub = parser.add_subparsers(dest="comando", required=True, metavar="comando")
+
+    p = sub.add_parser("coletar", aliases=["collect"], help="coleta do Google Trends ou do Hotel Pulse")
+    p.add_argument("alvos", nargs="+", metavar="alvo",
+                   help=f"coletor (amazonia, serras, {COLETOR_HOTEL}) ou carteira de pulse/carteiras.json")
+    p.add_argument("--data", help="data da coleta YYYY-MM-DD (padrão: hoje no Brasil)")
+    p.set_defaults(executar=coletar)
+
+    p = sub.add_parser("importar", aliases=["import"], help="importa o CSV de uma carteira no Supabase")
+    p.add_argument("alvos", nargs="+", metavar="alvo",
+                   help="esquema de pulse/importador.py (amazonia, concorrentes, serras, "
+                        "serras-concorrentes) ou carteira")
+    p.set_defaults(executar=importar)
+
+    for nome, ajuda in MODULOS.items():
+        p = sub.add_parser(nome, help=ajuda, add_help=False)
+        p.add_argument("argumentos", nargs=argparse.REMAINDER)
+        p.set_defaults(executar=modulo, comando=nome)
+
+    return parser
+
+def interpretar(parser, etapa):
+    # Os argumentos dos módulos (inclusive --opções e --help) vão intactos ao main deles
+    if etapa[0] in MODULOS:
+        return argparse.Namespace(comando=etapa[0], argumentos=etapa[1:], executar=modulo)
+    return parser.parse_args(etapa)
+
+def etapas(argv):
+    """argv dividido nas etapas separadas por "+"."""
+    atual = []
+    for arg in argv:
+        if arg == SEPARADOR_ETAPAS:
+            if atual:
+                yield atual
+            atual = []
+        else:
+            atual.append(arg)
+    if atual:
+        yield atual
+
+# ==============================
+# EXECUÇÃO
+# ==============================
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser = criar_parser()
+    # Valida todas as etapas antes de rodar a primeira
+    lista = [interpretar(parser, etapa) for etapa in etapas(argv)] or [parser.parse_args([])]
+
+    # Telemetria por requisição (PULSE_TELEMETRIA) e cProfile opcional (PULSE_PERFIL)
+    telemetria.iniciar("pulse")
+    for args in lista:
+        try:
+            codigo = rodar(args.executar, args)
+        except SystemExit as e:
+            # argparse dos módulos (--help, argumento inválido)
+            if e.code in (None, 0):
+                continue
+            raise
+        if codigo:
+            if len(lista) > 1:
+                print(f"⛔ Etapa '{args.comando}' saiu com código {codigo}; as seguintes não rodam.")
+            return codigo
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Coleta diária do Google Trends de um coletor (carteiras de pulse/carteiras.json).
+
+Monta o plano de payloads das carteiras, executa no pool de sessões
+(diário, cache, limitador e disjuntor) e grava cada carteira no CSV, no
+histórico Parquet e, se ela tiver tabela, no Supabase. É o que rodam
+coleta_automatica_trends.py, coleta_pulse_serras.py e `pulse coletar`.
+
+    python -m pulse coletar amazonia
+"""
+from datetime import datetime, timedelta, timezone
+
+from pulse.cache import CacheTrends
+from pulse.carteiras import carregar_carteiras, gravar_csv, inserir_supabase
+from pulse.erros import ColetaPendente, ErroPulse
+from pulse.historico import anexar_seguro
+from pulse.limitador import TRENDS_RPM
+from pulse.planejador import MODO_CESTA, PlanoColeta, executar
+from pulse.sessoes import PoolTrends
+
+# ==============================
+# CONFIGURAÇÕES GERAIS
+# ==============================
+
+MAX_RETRIES = 5
+TIMEFRAME = 'now 7-d'
+GEO = 'BR'
+
+# ==============================
+# FUNÇÃO DE DATA (BRASIL)
+# ==============================
+
+def data_brasil():
+    """
+    Retorna a data atual do Brasil (UTC-3) no formato YYYY-MM-DD
+    Avaliada em TEMPO DE EXECUÇÃO, nunca congelada.
+    """
+    return (datetime.now(timezone.utc) - timedelta(hours=3)).strftime('%Y-%m-%d')
+
+# ==============================
+# EXECUÇÃO
+# ==============================
+
+def coletar(coletor, nomes=None, data=None, cache=None, pool=None):
+    """
+    Coleta as carteiras do coletor (ou só as de nomes) e devolve nome da
+    carteira -> linhas. Levanta ColetaPendente se o disjuntor abrir e
+    ErroPulse se uma carteira ficar vazia.
+    """
+    carteiras = carregar_carteiras(coletor)
+    if nomes:
+        carteiras = [c for c in carteiras if c.nome in nomes]
+    if not carteiras:
+        raise ErroPulse(f"Nenhuma carteira para o coletor '{coletor}' em pulse/carteiras.json.")
+
+    cache = cache if cache is not None else CacheTrends()
+    # Sessões/proxies: PULSE_TRENDS_SESSOES / PULSE_TRENDS_PROXIES
+    # Ritmo por saída: PULSE_TRENDS_RPM / PULSE_TRENDS_RAJADA
+    pool = pool or PoolTrends(timeframe=TIMEFRAME, geo=GEO, max_retries=MAX_RETRIES, cache=cache)
+
+    for carteira in carteiras:
+        print(f"📋 {carteira.nome}: {len(carteira.destinos)} destinos ({carteira.modo})")
+    if any(carteira.modo == "cesta" for carteira in carteiras):
+        print(f"🧺 Modo da cesta: {MODO_CESTA}")
+
+    plano = PlanoColeta(carteiras, data or data_brasil())
+    requisicoes, minutos = plano.estimativa(
+        cache, TIMEFRAME, GEO, rpm=TRENDS_RPM, saidas=len(pool.limitadores)
+    )
+    print(f"🧭 Plano: {plano.resumo()}")
+    print(f"🧭 Estimativa: ~{requisicoes} requisições, ~{minutos:.0f} min")
+
+    # Payloads deduplicados entre as carteiras, distribuídos entre as sessões do pool
+    resultados = executar(plano, pool)
+
+    if plano.pendentes:
+        # Bloqueio do Google: nada de CSV parcial; a próxima execução do dia retoma pelo diário
+        adiados = sum(len(ids) for ids in plano.pendentes.values())
+        print(f"⏱️ Sessões Trends: {pool.resumo()}")
+        raise ColetaPendente(f"{adiados} destinos pendentes gravados no diário ({', '.join(plano.pendentes)}).")
+
+    for carteira in carteiras:
+        linhas = resultados[carteira.nome]
+
+        if len(linhas) == 0:
+            raise ErroPulse(f"Nenhum dado coletado para {carteira.descricao or carteira.nome}.")
+
+        gravar_csv(carteira, linhas)
+        # Histórico local particionado (historico/carteira=.../mes=...)
+        anexar_seguro(carteira.nome, linhas)
+        print(f"✅ CSV {carteira.csv} gerado com sucesso ({len(linhas)} registros).")
+        inserir_supabase(carteira, linhas)
+
+    print(f"🗄️ Cache Trends: {cache.acertos} acertos, {cache.faltas} faltas")
+    print(f"⏱️ Sessões Trends: {pool.resumo()}")
+    return resultados
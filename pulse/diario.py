@@ -0,0 +1,88 @@
+"""
+Diário de coleta (checkpoint/retomada).
+
+Cada destino concluído vira uma linha JSON anexada a um arquivo por
+carteira e por dia. Se a execução morrer no meio (timeout do workflow,
+bloqueio do Google), a próxima execução do mesmo dia relê o diário, pula
+os destinos já coletados e continua de onde parou.
+
+Quando o disjuntor (pulse/disjuntor.py) interrompe a coleta, os destinos
+que faltaram ficam listados em <carteira>-<data>.pendentes.json, com o
+motivo; o arquivo some quando uma execução do dia completa a carteira.
+"""
+import json
+import os
+import threading
+import time
+
+# ==============================
+# CONFIGURAÇÕES
+# ==============================
+
+DIARIO_DIR = os.environ.get("PULSE_DIARIO_DIR", os.path.join(".pulse", "diario"))
+# RETOMAR=0 ignora o diário existente e coleta tudo de novo
+RETOMAR = os.environ.get("RETOMAR", "1") == "1"
+
+
+class DiarioColeta:
+
+    def __init__(self, carteira, data, diretorio=DIARIO_DIR, retomar=RETOMAR):
+        self.carteira = carteira
+        self.data = data
+        self.caminho = os.path.join(diretorio, f"{carteira}-{data}.jsonl")
+        self.retomar = retomar
+        # Coletas concorrentes (PoolTrends) registram no mesmo arquivo
+        self._lock = threading.Lock()
+        self.caminho_pendentes = os.path.join(diretorio, f"{carteira}-{data}.pendentes.json")
+        os.makedirs(diretorio, exist_ok=True)
+        if not retomar:
+            for caminho in (self.caminho, self.caminho_pendentes):
+                if os.path.exists(caminho):
+                    os.remove(caminho)
+
+    def concluidos(self):
+        """destino_id -> linha já coletada nesta data."""
+        feitos = {}
+        if not os.path.exists(self.caminho):
+            return feitos
+        with open(self.caminho, encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    entrada = json.loads(linha)
+                except ValueError:
+                    # Última linha truncada por uma execução interrompida
+                    continue
+                feitos[entrada["destino_id"]] = entrada["linha"]
+        return feitos
+
+    def registrar(self, destino_id, linha):
+        entrada = json.dumps({"destino_id": destino_id, "linha": linha}, ensure_ascii=False)
+        with self._lock, open(self.caminho, "a", encoding="utf-8") as f:
+            f.write(entrada + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def pendentes(self):
+        """destino_ids que uma execução anterior deixou pendentes ([] se nenhum)."""
+        try:
+            with open(self.caminho_pendentes, encoding="utf-8") as f:
+                return json.load(f)["destinos"]
+        except (OSError, ValueError, KeyError):
+            return []
+
+    def marcar_pendentes(self, destinos, motivo):
+        conteudo = {
+            "carteira": self.carteira,
+            "data": self.data,
+            "motivo": motivo,
+            "registrado_em": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "destinos": list(destinos),
+        }
+        temporario = self.caminho_pendentes + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(conteudo, f, ensure_ascii=False, indent=2)
+        os.replace(temporario, self.caminho_pendentes)
+
+    def limpar_pendentes(self):
+        if os.path.exists(self.caminho_pendentes):
+            os.remove(self.caminho_pendentes)
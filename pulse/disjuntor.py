@@ -0,0 +1,81 @@
+"""
+Disjuntor das coletas do Google Trends.
+
+Quando o Google bloqueia o IP do runner, toda consulta restante passaria
+pelas MAX_RETRIES tentativas com backoff e terminaria em linhas zeradas,
+até o timeout do workflow. O disjuntor é um só por execução, dividido por
+todas as sessões do pool: uma sequência de 429 sem nenhum sucesso no meio
+(PULSE_DISJUNTOR_429 seguidos, ou PULSE_DISJUNTOR_SEG segundos de
+bloqueio) abre o circuito, e a partir daí nenhuma requisição sai — as
+consultas levantam CircuitoAberto em vez de devolver dados vazios.
+
+Os destinos que ficaram sem coleta vão para o diário como pendentes
+(pulse/diario.py) e o coletor levanta ColetaPendente (saída SAIDA_PENDENTE
+na linha de comando); a próxima execução do dia retoma só o que faltou.
+"""
+import os
+import threading
+import time
+
+from pulse.erros import SAIDA_PENDENTE  # noqa: F401 (reexportado)
+
+# ==============================
+# CONFIGURAÇÕES
+# ==============================
+
+# Abaixo de MAX_RETRIES: o circuito abre antes de uma consulta esgotar as
+# tentativas e virar linha zerada
+DISJUNTOR_429 = int(os.environ.get("PULSE_DISJUNTOR_429", "4"))
+DISJUNTOR_SEG = float(os.environ.get("PULSE_DISJUNTOR_SEG", "300"))
+
+
+class CircuitoAberto(Exception):
+    pass
+
+
+class Disjuntor:
+
+    def __init__(self, limite=DISJUNTOR_429, segundos=DISJUNTOR_SEG):
+        self.limite = max(1, limite)
+        self.segundos = segundos
+        self._lock = threading.Lock()
+        self._seguidos = 0
+        self._desde = None
+        self.aberto_em = None
+        self.motivo = None
+
+    @property
+    def aberto(self):
+        return self.aberto_em is not None
+
+    def verificar(self):
+        """Levanta CircuitoAberto se o circuito já abriu (chamar antes de cada requisição)."""
+        if self.aberto_em is not None:
+            raise CircuitoAberto(self.motivo)
+
+    def sucesso(self):
+        with self._lock:
+            self._seguidos = 0
+            self._desde = None
+
+    def bloqueio(self):
+        """429 observado; abre o circuito (e levanta) se o bloqueio se sustentou."""
+        with self._lock:
+            agora = time.monotonic()
+            self._seguidos += 1
+            if self._desde is None:
+                self._desde = agora
+            duracao = agora - self._desde
+            if self.aberto_em is None and (
+                self._seguidos >= self.limite or (self._seguidos > 1 and duracao >= self.segundos)
+            ):
+                self.aberto_em = time.strftime("%Y-%m-%dT%H:%M:%S")
+                self.motivo = (f"Google Trends bloqueou a saída: {self._seguidos} respostas 429 "
+                               f"seguidas em {duracao:.0f}s")
+                print(f"🔌 Disjuntor aberto — {self.motivo}. Nenhuma requisição a mais nesta execução.")
+        self.verificar()
+
+    def resumo(self):
+        if self.aberto_em is None:
+            return "fechado"
+        return f"aberto desde {self.aberto_em} ({self.motivo})"
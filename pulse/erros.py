@@ -0,0 +1,43 @@
+"""
+Erros das etapas do Pulse.
+
+As funções da biblioteca (coletar, importar_csv, backfill, indices...)
+levantam ErroPulse em vez de encerrar o processo: quem as importa decide o
+que fazer. Só a linha de comando (pulse/cli.py) e os scripts da raiz
+convertem o erro em código de saída, por rodar().
+"""
+# EX_TEMPFAIL: coleta incompleta, reexecutar mais tarde
+SAIDA_PENDENTE = 75
+
+
+class ErroPulse(Exception):
+    """Etapa que não pode seguir; codigo = código de saída na linha de comando."""
+
+    codigo = 1
+
+    def __init__(self, mensagem, codigo=None):
+        super().__init__(mensagem)
+        if codigo is not None:
+            self.codigo = codigo
+
+
+class ColetaPendente(ErroPulse):
+    """Disjuntor aberto: destinos pendentes no diário, a próxima execução retoma."""
+
+    codigo = SAIDA_PENDENTE
+
+
+def rodar(funcao, *args, **kwargs):
+    """
+    Roda uma etapa como script: devolve 0, ou o código do ErroPulse depois
+    de mostrar a mensagem. Para sys.exit(rodar(...)).
+    """
+    try:
+        funcao(*args, **kwargs)
+    except ColetaPendente as e:
+        print(f"⏸️ {e}")
+        return e.codigo
+    except ErroPulse as e:
+        print(f"❌ {e}")
+        return e.codigo
+    return 0
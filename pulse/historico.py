@@ -0,0 +1,309 @@
+"""
+Histórico local em Parquet, particionado por carteira e mês.
+
+Os CSVs de coleta são sobrescritos a cada execução e o histórico só existe
+no Supabase e no git log dos CSVs. Aqui cada coleta grava as linhas do dia
+num arquivo novo em historico/carteira=<nome>/mes=<AAAA-MM>/parte-*.parquet,
+sem reler nem regravar a partição; na leitura, a mesma chave (destino e dia)
+fica com a linha da parte mais nova, então reexecuções substituem a linha.
+Quando uma partição passa de PULSE_HISTORICO_MAX_PARTES arquivos ela é
+compactada num só. As leituras usam memory map, poda de colunas e de
+partições, então varrer anos de dados não passa pela rede.
+
+O diretório não vai para o git: nos workflows ele fica no cache do Actions
+e, se o cache expirar, é semeado de novo a partir do git log dos CSVs.
+
+    python -m pulse.historico semear    # reconstrói a partir do git log dos CSVs
+    python -m pulse.historico compactar
+    python -m pulse.historico resumo
+
+pyarrow é opcional para os coletores: sem ele o histórico é só pulado.
+"""
+import csv
+import io
+import os
+import subprocess
+import sys
+import time
+import uuid
+from datetime import date
+
+from pulse.carteiras import CAMPOS_LINHA
+from pulse.uf import ler_vetor
+
+# ==============================
+# CONFIGURAÇÕES
+# ==============================
+
+HISTORICO_DIR = os.environ.get("PULSE_HISTORICO_DIR", "historico")
+# Arquivos por partição antes de compactar (uma coleta por dia cabe num mês)
+MAX_PARTES = int(os.environ.get("PULSE_HISTORICO_MAX_PARTES", "64"))
+
+CAMPOS_INTEIROS = {"interesse", "origem_1_pct", "origem_2_pct", "origem_3_pct"}
+# Listas de int16 (27 UFs); partições antigas não têm a coluna e leem nulo
+CAMPOS_VETOR = {"origens_vetor"}
+# Colunas que vêm do caminho das partições
+CAMPOS_PARTICAO = ("carteira", "mes")
+# Chave de uma linha; entre partes, vence a de maior gravado_em
+CHAVE = ("carteira", "destino_id", "data_coleta")
+# Nanossegundos da gravação da parte (nulo nas partições compactadas)
+CAMPO_GRAVACAO = "gravado_em"
+
+# ==============================
+# ESQUEMA
+# ==============================
+
+def _pyarrow():
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    return pa, pq
+
+def esquema_arrow():
+    pa, _ = _pyarrow()
+    campos = []
+    for campo in CAMPOS_LINHA:
+        if campo == "data_coleta":
+            campos.append(pa.field(campo, pa.date32()))
+        elif campo in CAMPOS_INTEIROS:
+            campos.append(pa.field(campo, pa.int16()))
+        elif campo in CAMPOS_VETOR:
+            campos.append(pa.field(campo, pa.list_(pa.int16())))
+        else:
+            campos.append(pa.field(campo, pa.string()))
+    campos.append(pa.field(CAMPO_GRAVACAO, pa.int64()))
+    return pa.schema(campos)
+
+def _valor(campo, valor):
+    if valor in (None, ""):
+        return None
+    if campo == "data_coleta":
+        return valor if isinstance(valor, date) else date.fromisoformat(str(valor))
+    if campo in CAMPOS_INTEIROS:
+        return int(valor)
+    if campo in CAMPOS_VETOR:
+        return ler_vetor(valor)
+    return str(valor)
+
+def _dir_particao(carteira, mes, raiz):
+    return os.path.join(raiz, f"carteira={carteira}", f"mes={mes}")
+
+def _partes(diretorio):
+    if not os.path.isdir(diretorio):
+        return []
+    return sorted(
+        os.path.join(diretorio, nome) for nome in os.listdir(diretorio)
+        if nome.endswith(".parquet")
+    )
+
+def _gravar(tabela, caminho):
+    _, pq = _pyarrow()
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    # Prefixo '.': a leitura do diretório ignora o temporário
+    temporario = os.path.join(os.path.dirname(caminho), "." + os.path.basename(caminho) + ".tmp")
+    pq.write_table(tabela, temporario, compression="zstd")
+    os.replace(temporario, caminho)
+
+# ==============================
+# ESCRITA
+# ==============================
+
+def anexar(carteira, linhas, raiz=HISTORICO_DIR):
+    """
+    Anexa linhas (formato CAMPOS_LINHA, possivelmente incompletas no fim) às
+    partições mensais da carteira, uma parte nova por mês tocado. A mesma
+    chave (destino_id, data_coleta) fica com a versão mais nova na leitura.
+    Devolve quantas linhas foram gravadas.
+    """
+    pa, _ = _pyarrow()
+    esquema = esquema_arrow()
+    gravado_em = time.time_ns()
+
+    por_mes = {}
+    for linha in linhas:
+        registro = {campo: _valor(campo, v) for campo, v in zip(CAMPOS_LINHA, linha)}
+        registro = {campo: registro.get(campo) for campo in CAMPOS_LINHA}
+        registro[CAMPO_GRAVACAO] = gravado_em
+        por_mes.setdefault(f"{registro['data_coleta']:%Y-%m}", []).append(registro)
+
+    for mes, novos in por_mes.items():
+        diretorio = _dir_particao(carteira, mes, raiz)
+        ordenados = sorted(novos, key=lambda r: (r["data_coleta"], r["destino_id"]))
+        tabela = pa.Table.from_pylist(ordenados, schema=esquema)
+        # O nome ordena pela gravação; o sufixo evita colisão entre processos
+        _gravar(tabela, os.path.join(diretorio, f"parte-{gravado_em:020d}-{uuid.uuid4().hex[:8]}.parquet"))
+        if len(_partes(diretorio)) > MAX_PARTES:
+            compactar_particao(diretorio)
+    return sum(len(v) for v in por_mes.values())
+
+def compactar_particao(diretorio):
+    """Junta as partes de uma partição num arquivo só, já sem duplicatas."""
+    pa, pq = _pyarrow()
+    partes = _partes(diretorio)
+    if len(partes) <= 1:
+        return len(partes)
+    esquema = esquema_arrow()
+    tabelas = [pq.read_table(p, memory_map=True, schema=esquema) for p in partes]
+    # Sem 'carteira' (vem do caminho): a chave dentro da partição é destino e dia
+    tabela = _mais_recentes(pa.concat_tables(tabelas), ("destino_id", "data_coleta"))
+    tabela = tabela.sort_by([("data_coleta", "ascending"), ("destino_id", "ascending")])
+    tabela = tabela.set_column(
+        tabela.schema.get_field_index(CAMPO_GRAVACAO), CAMPO_GRAVACAO,
+        pa.nulls(tabela.num_rows, pa.int64()),
+    )
+    # Grava antes de apagar: uma falha no meio deixa só linhas repetidas,
+    # que a leitura já descarta
+    _gravar(tabela, os.path.join(diretorio, "dados.parquet"))
+    for parte in partes:
+        if os.path.basename(parte) != "dados.parquet":
+            os.remove(parte)
+    return len(partes)
+
+def compactar(raiz=HISTORICO_DIR):
+    """compactar_particao() em todas as partições; devolve quantas mudaram."""
+    total = 0
+    for pasta, _, arquivos in os.walk(raiz):
+        if sum(nome.endswith(".parquet") for nome in arquivos) > 1:
+            compactar_particao(pasta)
+            total += 1
+    return total
+
+def anexar_seguro(carteira, linhas, raiz=HISTORICO_DIR):
+    """anexar() para os coletores: falha no histórico nunca derruba a coleta."""
+    try:
+        return anexar(carteira, linhas, raiz)
+    except ImportError:
+        print("Historico: pyarrow nao instalado - pulando.")
+    except Exception as e:
+        print(f"Historico: erro ao anexar {carteira}: {e}")
+    return 0
+
+# ==============================
+# LEITURA
+# ==============================
+
+def ler(carteiras=None, colunas=None, desde=None, ate=None, destinos=None, raiz=HISTORICO_DIR):
+    """
+    pyarrow.Table com o histórico. Só as partições (carteira, mês) e colunas
+    pedidas são lidas; os arquivos são abertos com memory map. A coluna
+    'carteira' vem da partição.
+    """
+    pa, pq = _pyarrow()
+    if not os.path.isdir(raiz):
+        return pa.table({})
+
+    filtros = []
+    if carteiras:
+        filtros.append(("carteira", "in", list(carteiras)))
+    if desde:
+        desde = date.fromisoformat(str(desde))
+        filtros += [("mes", ">=", f"{desde:%Y-%m}"), ("data_coleta", ">=", desde)]
+    if ate:
+        ate = date.fromisoformat(str(ate))
+        filtros += [("mes", "<=", f"{ate:%Y-%m}"), ("data_coleta", "<=", ate)]
+    if destinos:
+        filtros.append(("destino_id", "in", list(destinos)))
+
+    pedidas = list(dict.fromkeys(list(colunas))) if colunas else None
+    colunas = None
+    if pedidas:
+        colunas = list(dict.fromkeys(pedidas + list(CHAVE) + [CAMPO_GRAVACAO]))
+    # Esquema explícito: sem ele o pyarrow usa o da primeira partição e não
+    # acha colunas criadas depois (origens_vetor)
+    esquema = esquema_arrow()
+    for campo in CAMPOS_PARTICAO:
+        esquema = esquema.append(pa.field(campo, pa.string()))
+    tabela = pq.read_table(
+        raiz,
+        columns=colunas,
+        filters=filtros or None,
+        memory_map=True,
+        partitioning="hive",
+        schema=esquema,
+    )
+    tabela = _mais_recentes(tabela, CHAVE)
+    if pedidas:
+        return tabela.select(pedidas)
+    return tabela.drop_columns([CAMPO_GRAVACAO])
+
+def _mais_recentes(tabela, chave):
+    """
+    Uma linha por chave: a de maior gravado_em (nulo = compactada, mais
+    antiga). As linhas que ficam mantêm a ordem de leitura.
+    """
+    pa, _ = _pyarrow()
+    import pyarrow.compute as pc
+
+    if tabela.num_rows == 0:
+        return tabela
+    # Ordenação estável: no empate, a linha lida depois vence
+    ordem = pc.array_sort_indices(pc.fill_null(tabela[CAMPO_GRAVACAO], 0))
+    ordenada = tabela.select(list(chave)).take(ordem)
+    ordenada = ordenada.append_column("_ordem", pa.array(range(tabela.num_rows), pa.int64()))
+    ultimas = ordenada.group_by(list(chave), use_threads=False).aggregate([("_ordem", "max")])
+    if ultimas.num_rows == tabela.num_rows:
+        return tabela
+    manter = pc.take(ordem, ultimas["_ordem_max"])
+    return tabela.take(pc.take(manter, pc.array_sort_indices(manter)))
+
+def ler_pandas(*args, **kwargs):
+    return ler(*args, **kwargs).to_pandas()
+
+# ==============================
+# SEMENTE (git log dos CSVs)
+# ==============================
+
+def _git(*args):
+    return subprocess.run(["git", *args], check=True, capture_output=True, text=True).stdout
+
+def semear(raiz=HISTORICO_DIR):
+    """Reconstrói o histórico a partir de todas as versões commitadas dos CSVs."""
+    from pulse.carteiras import carregar_carteiras
+
+    total = 0
+    for carteira in carregar_carteiras(None):
+        commits = _git("log", "--format=%H", "--", carteira.csv).split()
+        linhas = {}
+        # Do mais antigo para o mais novo: a última versão de um dia vence
+        for commit in reversed(commits):
+            try:
+                conteudo = _git("show", f"{commit}:{carteira.csv}")
+            except subprocess.CalledProcessError:
+                continue
+            for row in csv.DictReader(io.StringIO(conteudo)):
+                try:
+                    linha = [row.get(campo) for campo in CAMPOS_LINHA]
+                    date.fromisoformat(linha[0])
+                except (TypeError, ValueError):
+                    continue
+                linhas[(linha[1], linha[0])] = linha
+        if linhas:
+            total += anexar(carteira.nome, list(linhas.values()), raiz)
+        print(f"  {carteira.nome}: {len(commits)} versoes de {carteira.csv}, {len(linhas)} linhas")
+    return total
+
+def resumo(raiz=HISTORICO_DIR):
+    tabela = ler(colunas=["carteira", "data_coleta", "destino_id"], raiz=raiz)
+    if tabela.num_rows == 0:
+        return "historico vazio"
+    df = tabela.to_pandas()
+    partes = []
+    for carteira, grupo in df.groupby("carteira", observed=True):
+        partes.append(
+            f"{carteira}: {len(grupo)} linhas, {grupo['destino_id'].nunique()} destinos, "
+            f"{grupo['data_coleta'].min()} a {grupo['data_coleta'].max()}"
+        )
+    return "\n".join(partes)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    comando = argv[0] if argv else "resumo"
+    if comando == "semear":
+        print(f"Semeando {HISTORICO_DIR} a partir do git log...")
+        print(f"{semear()} linhas gravadas")
+    elif comando == "compactar":
+        print(f"{compactar()} particoes compactadas")
+    print(resumo())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Horizonte de tarifas: quais pares (hotel, data de estadia) coletar hoje.
+
+Cada par custa um crédito da SerpAPI. O agendador monta os pares do
+horizonte configurado (D+N e próximos fins de semana), espalha as datas
+distantes ao longo dos dias (cadência, só quando há limite de créditos) e
+ordena o que vence hoje por prioridade até caber no orçamento diário. O
+saldo mensal da conta vira uma cota diária até a renovação do plano. Na
+execução, nenhum par novo começa depois do orçamento de tempo.
+"""
+import calendar
+import hashlib
+import math
+import os
+import threading
+import time
+from datetime import date, timedelta
+
+# ==============================
+# CONFIGURAÇÕES
+# ==============================
+
+# Antecedências em dias, ex.: "0,1,7,14,30,60,90" (vazio = só hoje, D+0)
+HOTEL_HORIZONTE = os.environ.get("HOTEL_HORIZONTE", "")
+# Quantos próximos fins de semana (check-in na sexta) entram no horizonte
+HOTEL_FINS_DE_SEMANA = int(os.environ.get("HOTEL_FINS_DE_SEMANA", "0"))
+# Créditos SerpAPI por execução e tempo máximo (segundos); 0 = sem limite
+HOTEL_CREDITOS_DIA = int(os.environ.get("HOTEL_CREDITOS_DIA", "0"))
+HOTEL_ORCAMENTO_SEG = float(os.environ.get("HOTEL_ORCAMENTO_SEG", "0"))
+# Cadência "até:passo": antecedências até 7 dias todo dia, até 14 a cada 2...
+# e acima da última faixa o último passo. "0:1" = todo dia.
+HOTEL_CADENCIA = os.environ.get("HOTEL_CADENCIA", "7:1,14:2,30:3,90:7")
+# Dia do mês em que o plano SerpAPI renova o saldo de buscas
+HOTEL_RENOVACAO_DIA = int(os.environ.get("HOTEL_RENOVACAO_DIA", "1"))
+
+SEXTA = 4
+
+# ==============================
+# PARES
+# ==============================
+
+def antecedencias(horizonte=HOTEL_HORIZONTE):
+    dias = {int(d) for d in horizonte.split(",") if d.strip()}
+    return sorted(dias) or [0]
+
+def faixas_cadencia(texto=HOTEL_CADENCIA):
+    """[(até, passo), ...] em ordem crescente de antecedência."""
+    faixas = []
+    for item in texto.split(","):
+        if item.strip():
+            ate, passo = item.split(":")
+            faixas.append((int(ate), max(int(passo), 1)))
+    return sorted(faixas) or [(0, 1)]
+
+def cadencia(dias, faixas=None):
+    """De quantos em quantos dias uma antecedência é recoletada."""
+    faixas = faixas or faixas_cadencia()
+    for ate, passo in faixas:
+        if dias <= ate:
+            return passo
+    return faixas[-1][1]
+
+def _deslocamento(hotel_id, dias):
+    # Espalha os hotéis entre os dias do ciclo para não concentrar créditos
+    return int(hashlib.sha256(f"{hotel_id}|{dias}".encode("utf-8")).hexdigest()[:8], 16)
+
+def vence_hoje(hotel_id, dias, hoje, faixas=None):
+    passo = cadencia(dias, faixas)
+    return (hoje.toordinal() + _deslocamento(hotel_id, dias)) % passo == 0
+
+
+class Par:
+    """Uma busca na SerpAPI: hotel + noite de estadia."""
+
+    def __init__(self, hotel, check_in, hoje, fim_de_semana=False):
+        self.hotel = hotel
+        self.check_in = check_in
+        self.check_out = check_in + timedelta(days=1)
+        self.antecedencia = (check_in - hoje).days
+        self.fim_de_semana = fim_de_semana
+
+    @property
+    def prioridade(self):
+        # Datas próximas primeiro; fim de semana vale como a antecedência dele
+        return self.antecedencia
+
+    def __repr__(self):
+        return f"Par({self.hotel['hotel_id']}, D+{self.antecedencia})"
+
+
+def montar_pares(hoteis, hoje=None, horizonte=HOTEL_HORIZONTE, fins_de_semana=HOTEL_FINS_DE_SEMANA,
+                 cadenciado=True):
+    """
+    Pares que vencem hoje, já em ordem de prioridade e sem datas repetidas.
+    cadenciado=False (sem limite de créditos) coleta todo o horizonte.
+    """
+    hoje = hoje or date.today()
+    faixas = faixas_cadencia()
+    datas = {}
+    for dias in antecedencias(horizonte):
+        datas[hoje + timedelta(days=dias)] = False
+    sexta = hoje + timedelta(days=(SEXTA - hoje.weekday()) % 7)
+    for n in range(fins_de_semana):
+        datas.setdefault(sexta + timedelta(weeks=n), True)
+
+    pares = []
+    for ordem_hotel, hotel in enumerate(hoteis):
+        for check_in, fim_de_semana in datas.items():
+            dias = (check_in - hoje).days
+            # D+0 sempre: alimenta hotel_pulse_tarifas
+            if dias == 0 or not cadenciado or vence_hoje(hotel["hotel_id"], dias, hoje, faixas):
+                pares.append((ordem_hotel, Par(hotel, check_in, hoje, fim_de_semana)))
+    pares.sort(key=lambda item: (item[1].prioridade, item[0]))
+    return [par for _, par in pares]
+
+# ==============================
+# ORÇAMENTO
+# ==============================
+
+def dias_ate_renovacao(hoje, dia=HOTEL_RENOVACAO_DIA):
+    """Dias de hoje (inclusive) até a próxima renovação do plano."""
+    ano, mes = hoje.year, hoje.month
+    if hoje.day >= min(dia, calendar.monthrange(ano, mes)[1]):
+        ano, mes = (ano + 1, 1) if mes == 12 else (ano, mes + 1)
+    renovacao = date(ano, mes, min(dia, calendar.monthrange(ano, mes)[1]))
+    return (renovacao - hoje).days
+
+def cota_diaria(restantes, hoje, dia=HOTEL_RENOVACAO_DIA):
+    """Parte do saldo da conta que cabe a hoje, dividido até a renovação."""
+    return math.ceil(max(restantes, 0) / dias_ate_renovacao(hoje, dia))
+
+
+class Orcamento:
+    """Créditos e prazo da execução; thread-safe."""
+
+    def __init__(self, creditos=HOTEL_CREDITOS_DIA, segundos=HOTEL_ORCAMENTO_SEG):
+        # None = sem limite de créditos
+        self.creditos = creditos or None
+        self.prazo = time.monotonic() + segundos if segundos else None
+        self.gastos = 0
+        self.adiados = 0
+        self._lock = threading.Lock()
+
+    def selecionar(self, pares):
+        """Os primeiros pares que cabem nos créditos; o resto fica para outro dia."""
+        if self.creditos is None:
+            return list(pares)
+        selecionados = list(pares)[:self.creditos]
+        self.adiados += len(pares) - len(selecionados)
+        return selecionados
+
+    def liberar(self):
+        """Reserva um crédito se ainda houver crédito e tempo; False = não buscar."""
+        with self._lock:
+            sem_credito = self.creditos is not None and self.gastos >= self.creditos
+            if sem_credito or (self.prazo is not None and time.monotonic() > self.prazo):
+                self.adiados += 1
+                return False
+            self.gastos += 1
+            return True
+
+    def resumo(self):
+        limite = "sem limite" if self.creditos is None else self.creditos
+        return f"{self.gastos} creditos usados (limite {limite}), {self.adiados} pares adiados"
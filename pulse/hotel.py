@@ -0,0 +1,229 @@
+"""
+Hotel Pulse: tarifas da SerpAPI (Google Hotels) para hotel_pulse_tarifas e
+hotel_pulse_curva.
+
+Importar o módulo não lê credenciais nem abre sessões: SERPAPI_KEY,
+SUPABASE_URL e SUPABASE_KEY são lidas por ColetorHotel, na hora da coleta.
+
+    python -m pulse coletar hotel
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from pulse import telemetria
+from pulse.erros import ErroPulse
+from pulse.horizonte import Orcamento, cota_diaria, montar_pares
+from pulse.rede import criar_sessao
+from pulse.tokens_hotel import CacheTokens
+
+# ==============================
+# CONFIGURAÇÕES
+# ==============================
+
+# Stand-in local para benchmark (bench/serpapi_local.py)
+SERPAPI_URL = os.environ.get('SERPAPI_URL', 'https://serpapi.com').rstrip('/')
+
+# Consultas simultâneas à SerpAPI (uma conexão keep-alive por thread)
+HOTEL_WORKERS = int(os.environ.get('HOTEL_WORKERS', '8'))
+
+HOTEIS = [
+    {'hotel_id': 'intercity_campinas',   'query': 'Hotel Intercity Campinas Aquidaba'},
+    {'hotel_id': 'hotel_contemporaneo',  'query': 'Hotel Contemporaneo Campinas'},
+    {'hotel_id': 'golden_park_campinas', 'query': 'Golden Park Campinas'},
+    {'hotel_id': 'monreale_express',     'query': 'Monreale Express Campinas'},
+    {'hotel_id': 'slaviero_campinas',    'query': 'Slaviero Campinas'},
+]
+
+# Resposta de "nada encontrado": a busca foi feita, só não achou a propriedade
+SEM_RESULTADOS = "hasn't returned any results"
+
+class ErroSerpAPI(Exception):
+    """A consulta falhou (rede, timeout, HTTP, erro da API): não diz nada sobre o token."""
+
+def extrair_propriedade(data):
+    """Hotel da resposta: a lista da busca por texto ou os detalhes de uma propriedade."""
+    props = data.get('properties', [])
+    if props:
+        return props[0]
+    if data.get('property_token') or data.get('rate_per_night'):
+        return data
+    return None
+
+# ==============================
+# COLETOR
+# ==============================
+
+class ColetorHotel:
+
+    def __init__(self, hoje=None, hoteis=HOTEIS, workers=HOTEL_WORKERS):
+        faltando = [v for v in ('SERPAPI_KEY', 'SUPABASE_URL', 'SUPABASE_KEY') if not os.environ.get(v)]
+        if faltando:
+            raise ErroPulse(f"Variáveis não definidas: {', '.join(faltando)}")
+        self.serpapi_key = os.environ['SERPAPI_KEY']
+        self.supabase_url = os.environ['SUPABASE_URL']
+        self.supabase_key = os.environ['SUPABASE_KEY']
+        self.hoje = hoje or date.today()
+        self.check_in = str(self.hoje)
+        self.hoteis = hoteis
+        self.workers = workers
+        # Sessões com pool de conexões, timeout e retentativas. Cada busca
+        # custa um crédito: na SerpAPI só se repete conexão recusada e 429,
+        # e o coletor não repete nada (uma falha = no máximo um crédito)
+        self.serpapi = criar_sessao(conexoes=workers, metodos=('GET',), servico='serpapi', cobrada=True)
+        # O upsert é idempotente, então o POST também pode ser repetido
+        self.supabase = criar_sessao(conexoes=1, servico='supabase')
+        # property_token já resolvidos (HOTEL_TOKENS_ARQUIVO, persistido entre execuções)
+        self.tokens = CacheTokens()
+        self.orcamento = None
+
+    def creditos_restantes(self):
+        """
+        Buscas restantes na conta SerpAPI até a renovação do plano (a consulta
+        da conta não gasta crédito). É o saldo do mês: use cota_diaria().
+        """
+        try:
+            r = self.serpapi.get(f'{SERPAPI_URL}/account.json', params={'api_key': self.serpapi_key})
+            return int(r.json()['total_searches_left'])
+        except Exception:
+            return None
+
+    def buscar_serpapi(self, par, token=None):
+        """
+        Propriedade da resposta, ou None se a busca não trouxe nenhuma.
+        Levanta ErroSerpAPI se a consulta em si falhou.
+        """
+        hotel = par.hotel
+        params = {
+            'engine': 'google_hotels',
+            'q': hotel['query'],
+            'gl': 'br',
+            'hl': 'pt',
+            'currency': 'BRL',
+            'check_in_date': str(par.check_in),
+            'check_out_date': str(par.check_out),
+            'adults': 1,
+            'api_key': self.serpapi_key
+        }
+        if token:
+            # Detalhes da propriedade: resposta menor e sempre o mesmo hotel
+            params['property_token'] = token
+        try:
+            r = self.serpapi.get(f'{SERPAPI_URL}/search', params=params)
+            data = r.json()
+        except Exception as e:
+            raise ErroSerpAPI(e)
+        erro = data.get('error')
+        if erro and SEM_RESULTADOS in erro:
+            return None
+        if erro or r.status_code != 200:
+            raise ErroSerpAPI(f"{r.status_code}: {erro or r.text[:200]}")
+        return extrair_propriedade(data)
+
+    def coletar_tarifa(self, par):
+        with telemetria.contexto(f"{par.hotel['hotel_id']} D+{par.antecedencia}"):
+            return self._coletar_tarifa(par)
+
+    def _coletar_tarifa(self, par):
+        hotel = par.hotel
+        if not self.orcamento.liberar():
+            return None
+
+        token = self.tokens.token(hotel)
+        try:
+            p = self.buscar_serpapi(par, token) if token else None
+            if p is None:
+                if token:
+                    # A busca pelo token não achou a propriedade: o token não vale
+                    # mais e volta-se à busca por texto
+                    self.tokens.invalidar(hotel)
+                    if not self.orcamento.liberar():
+                        return None
+                p = self.buscar_serpapi(par)
+                if p is None:
+                    print(f"[AVISO] Nenhum resultado para {hotel['hotel_id']} D+{par.antecedencia}")
+                    return None
+                self.tokens.gravar(hotel, p.get('property_token', ''), p.get('name', ''))
+        except ErroSerpAPI as e:
+            # Falha da consulta (rede, timeout, erro da API): o token continua
+            # valendo e não se gasta um segundo crédito na busca por texto
+            print(f"[ERRO] {hotel['hotel_id']} D+{par.antecedencia}: {e}")
+            return None
+
+        tarifa = p.get('rate_per_night', {}).get('extracted_lowest')
+        token  = p.get('property_token', '') or token or ''
+        fonte  = p.get('prices', [{}])[0].get('source', 'Google Hotels') if p.get('prices') else 'Google Hotels'
+        return {
+            'hotel_id':      hotel['hotel_id'],
+            'data_coleta':   self.check_in,
+            'tarifa_minima': tarifa,
+            'fonte':         fonte,
+            'property_token': token,
+            'data_estadia':  str(par.check_in),
+            'antecedencia_dias': par.antecedencia,
+            'fim_de_semana': par.fim_de_semana,
+        }
+
+    def salvar_supabase(self, tabela, registros, on_conflict):
+        """Um único upsert em lote; reexecutar no mesmo dia atualiza em vez de duplicar."""
+        headers = {
+            'apikey': self.supabase_key,
+            'Authorization': f'Bearer {self.supabase_key}',
+            'Content-Type': 'application/json',
+            'Prefer': 'resolution=merge-duplicates,return=minimal'
+        }
+        r = self.supabase.post(
+            f'{self.supabase_url}/rest/v1/{tabela}',
+            params={'on_conflict': on_conflict},
+            json=registros,
+            headers=headers
+        )
+        print(f"[supabase] {tabela} status={r.status_code} registros={len(registros)}")
+        if r.status_code not in (200, 201, 204):
+            raise ErroPulse(f"[supabase] {tabela} status={r.status_code}: {r.text}")
+
+    def coletar(self):
+        """Coleta os pares que vencem hoje e grava tarifas e curva; devolve a curva."""
+        # Pares (hotel, data de estadia) que vencem hoje, por prioridade
+        # HOTEL_HORIZONTE / HOTEL_FINS_DE_SEMANA / HOTEL_CREDITOS_DIA / HOTEL_ORCAMENTO_SEG
+        self.orcamento = Orcamento()
+        restantes = self.creditos_restantes()
+        if restantes is not None:
+            # O saldo é do mês: cada execução usa a sua parte até a renovação
+            # (HOTEL_RENOVACAO_DIA), limitada por HOTEL_CREDITOS_DIA
+            cota = cota_diaria(restantes, self.hoje)
+            if self.orcamento.creditos is None or cota < self.orcamento.creditos:
+                self.orcamento.creditos = cota
+        # Sem limite de créditos não há por que espaçar as datas distantes
+        pares = montar_pares(self.hoteis, self.hoje, cadenciado=self.orcamento.creditos is not None)
+        selecionados = self.orcamento.selecionar(pares)
+        print(f"[horizonte] {len(pares)} pares vencem hoje, {len(selecionados)} cabem no orcamento")
+
+        # executor.map mantém a ordem de prioridade ao distribuir os pares
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            resultados = list(executor.map(self.coletar_tarifa, selecionados))
+
+        curva = [reg for reg in resultados if reg]
+        # hotel_pulse_tarifas continua recebendo só a tarifa de hoje (D+0)
+        registros = [
+            {k: reg[k] for k in ('hotel_id', 'data_coleta', 'tarifa_minima', 'fonte', 'property_token')}
+            for reg in curva if reg['antecedencia_dias'] == 0
+        ]
+        for reg in curva:
+            print(f"[{reg['hotel_id']}] D+{reg['antecedencia_dias']} ({reg['data_estadia']}) tarifa={reg['tarifa_minima']}")
+        print(f"[horizonte] {self.orcamento.resumo()}")
+        print(f"[tokens] {self.tokens.resumo()}")
+        self.tokens.salvar()
+
+        if registros:
+            self.salvar_supabase('hotel_pulse_tarifas', registros, 'hotel_id,data_coleta')
+        else:
+            print("[AVISO] Nenhuma tarifa coletada.")
+
+        # Curva de tarifas futuras (só quando há horizonte além de hoje)
+        if any(reg['antecedencia_dias'] > 0 for reg in curva):
+            self.salvar_supabase('hotel_pulse_curva', curva, 'hotel_id,data_coleta,data_estadia')
+        return curva
+
+def coletar_hotel(hoje=None):
+    return ColetorHotel(hoje).coletar()
@@ -0,0 +1,387 @@
+"""
+Importador CSV -> Supabase compartilhado pelos import_csv_*.py.
+
+Cada tabela tem um Esquema (colunas, conversões, chave do upsert, campos
+fixos). O CSV é lido em streaming, convertido linha a linha e enviado em
+lotes de tamanho fixo, com vários lotes em voo ao mesmo tempo. Um lote que
+falha é reenviado (o upsert é idempotente); se o PostgREST recusar pelo
+tamanho (413), o lote é dividido ao meio. A memória fica limitada a
+lote x em voo linhas, qualquer que seja o tamanho do arquivo — exceto nos
+esquemas estritos ou com data exigida, em que o CSV (pequeno) é validado
+inteiro antes do primeiro lote, para não deixar importação parcial.
+"""
+import csv
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime
+from itertools import islice
+
+from pulse import telemetria
+from pulse.erros import ErroPulse
+from pulse.manifesto import RECONCILIAR, Manifesto, chave_tabela, sha256_arquivo
+from pulse.rede import criar_sessao
+from pulse.uf import ler_vetor
+
+# ==============================
+# CONFIGURAÇÕES
+# ==============================
+
+IMPORT_LOTE = int(os.environ.get("PULSE_IMPORT_LOTE", "1000"))
+IMPORT_EM_VOO = int(os.environ.get("PULSE_IMPORT_EM_VOO", "4"))
+IMPORT_TENTATIVAS = int(os.environ.get("PULSE_IMPORT_TENTATIVAS", "4"))
+
+# ==============================
+# ESQUEMAS
+# ==============================
+
+def inteiro(valor):
+    return int(valor)
+
+def texto(valor):
+    return valor
+
+def data_iso(valor):
+    valor = valor.strip()
+    datetime.strptime(valor, "%Y-%m-%d")
+    return valor
+
+def id_destino(valor):
+    return valor.strip().lower()
+
+COLUNAS_TRENDS = {
+    "data_coleta":  data_iso,
+    "destino_id":   texto,
+    "interesse":    inteiro,
+    "origem_1":     texto,
+    "origem_1_pct": inteiro,
+    "origem_2":     texto,
+    "origem_2_pct": inteiro,
+    "origem_3":     texto,
+    "origem_3_pct": inteiro,
+    "origens_vetor": ler_vetor,
+}
+# CSVs anteriores ao vetor de origens não têm a coluna
+OPCIONAIS_TRENDS = ("origens_vetor",)
+
+
+class Esquema:
+    """
+    Como uma tabela recebe linhas do CSV.
+
+    incremental: ignora datas <= última data da tabela (filtrada por fixos)
+    estrito:     linha inválida aborta a importação em vez de ser ignorada
+    validar:     função(registro) -> mensagem de erro ou None
+    opcionais:   colunas que podem faltar no CSV (ficam fora do registro)
+    """
+
+    def __init__(self, tabela, on_conflict, colunas, csv_padrao, fixos=None,
+                 incremental=True, estrito=False, validar=None, opcionais=()):
+        self.tabela = tabela
+        self.on_conflict = on_conflict
+        self.colunas = colunas
+        self.csv_padrao = csv_padrao
+        self.fixos = fixos or {}
+        self.incremental = incremental
+        self.estrito = estrito
+        self.validar = validar
+        self.opcionais = set(opcionais)
+
+    def converter(self, row):
+        registro = {coluna: conversor(row[coluna]) for coluna, conversor in self.colunas.items()
+                    if coluna in row}
+        registro.update(self.fixos)
+        if self.validar:
+            erro = self.validar(registro)
+            if erro:
+                raise ValueError(erro)
+        return registro
+
+
+CONCORRENTES_VALIDOS = {
+    "manaus",
+    "sao_luis",
+    "lencois_maranhenses",
+    "jalapao",
+    "bonito",
+    "presidente_figueiredo",
+    "parintins",
+    "atins",
+}
+
+def validar_concorrente(registro):
+    if registro["destino_id"] not in CONCORRENTES_VALIDOS:
+        return f"invalid destino_id '{registro['destino_id']}'"
+    if not (0 <= registro["interesse"] <= 100):
+        return "interesse must be 0-100"
+    return None
+
+ESQUEMAS = {
+    "amazonia": Esquema(
+        "pulse_amazonia", "destino_id,data_coleta", COLUNAS_TRENDS, "coleta-trends-para.csv",
+        opcionais=OPCIONAIS_TRENDS,
+    ),
+    "concorrentes": Esquema(
+        "concorrentes_nacionais", "destino_id,data_coleta",
+        {"data_coleta": data_iso, "destino_id": id_destino, "interesse": inteiro},
+        "coleta-concorrentes-nacionais.csv",
+        incremental=False, estrito=True, validar=validar_concorrente,
+    ),
+    "serras": Esquema(
+        "pulse_serras", "destino_id,data_coleta,tipo", COLUNAS_TRENDS, "coleta-serras-ancora.csv",
+        fixos={"tipo": "ancora"}, opcionais=OPCIONAIS_TRENDS,
+    ),
+    "serras-concorrentes": Esquema(
+        "pulse_serras", "destino_id,data_coleta,tipo", COLUNAS_TRENDS, "coleta-serras-concorrentes.csv",
+        fixos={"tipo": "concorrente"}, opcionais=OPCIONAIS_TRENDS,
+    ),
+}
+
+# ==============================
+# LEITURA EM STREAMING
+# ==============================
+
+class Leitura:
+    """Gera registros do CSV e conta o que foi lido, ignorado e inválido."""
+
+    def __init__(self, caminho, esquema, desde=None, forcar_data=None, exigir_data=None):
+        self.caminho = caminho
+        self.esquema = esquema
+        self.desde = desde
+        self.forcar_data = forcar_data
+        self.exigir_data = exigir_data
+        self.lidas = 0
+        self.ignoradas = 0
+        self.invalidas = 0
+        self.datas = set()
+
+    @property
+    def tudo_ou_nada(self):
+        """Uma linha ruim aborta a importação: o arquivo é validado antes do primeiro lote."""
+        return self.esquema.estrito or self.exigir_data is not None
+
+    def __iter__(self):
+        with open(self.caminho, newline="", encoding="utf-8") as arquivo:
+            leitor = csv.DictReader(arquivo)
+            faltando = set(self.esquema.colunas) - self.esquema.opcionais - set(leitor.fieldnames or [])
+            if faltando:
+                raise ValueError(f"Colunas ausentes no CSV: {', '.join(sorted(faltando))}")
+
+            for linha_num, row in enumerate(leitor, start=2):
+                try:
+                    registro = self.esquema.converter(row)
+                except Exception as e:
+                    if self.esquema.estrito:
+                        raise ValueError(f"Linha {linha_num}: {e}")
+                    self.invalidas += 1
+                    print(f"⚠️ Linha inválida ignorada: {row} — {e}")
+                    continue
+
+                data_csv = registro["data_coleta"]
+                if self.desde and data_csv <= self.desde:
+                    self.ignoradas += 1
+                    continue
+                if self.exigir_data and data_csv != self.exigir_data:
+                    raise ValueError(
+                        f"Linha {linha_num}: data {data_csv} diferente de {self.exigir_data}"
+                    )
+                if self.forcar_data:
+                    registro["data_coleta"] = self.forcar_data
+
+                self.datas.add(registro["data_coleta"])
+                self.lidas += 1
+                yield registro
+
+def em_lotes(registros, tamanho):
+    it = iter(registros)
+    while True:
+        lote = list(islice(it, tamanho))
+        if not lote:
+            return
+        yield lote
+
+# ==============================
+# ENVIO
+# ==============================
+
+class ErroImportacao(ErroPulse):
+    pass
+
+
+class Importador:
+
+    def __init__(self, esquema, url, chave, lote=IMPORT_LOTE, em_voo=IMPORT_EM_VOO,
+                 tentativas=IMPORT_TENTATIVAS, resolucao="merge-duplicates"):
+        self.esquema = esquema
+        # ignore-duplicates: só insere linhas novas, sem sobrescrever as existentes
+        self.resolucao = resolucao
+        self.url = f"{url.rstrip('/')}/rest/v1/{esquema.tabela}"
+        self.lote = max(1, lote)
+        self.em_voo = max(1, em_voo)
+        self.tentativas = tentativas
+        self.headers = {
+            "apikey": chave,
+            "Authorization": f"Bearer {chave}",
+            "Content-Type": "application/json",
+        }
+        # Upsert idempotente: o POST pode ser repetido com segurança
+        self.sessao = criar_sessao(conexoes=self.em_voo, tentativas=2, servico="supabase")
+        self.lotes = 0
+        self.reenvios = 0
+
+    def ultima_data(self):
+        """Última data_coleta da tabela (restrita aos campos fixos do esquema)."""
+        params = {"select": "data_coleta", "order": "data_coleta.desc", "limit": "1"}
+        for campo, valor in self.esquema.fixos.items():
+            params[campo] = f"eq.{valor}"
+        r = self.sessao.get(self.url, params=params, headers=self.headers)
+        r.raise_for_status()
+        dados = r.json()
+        return dados[0]["data_coleta"] if dados else None
+
+    def enviar(self, registros):
+        """Upsert de um lote; devolve quantas linhas o banco confirmou."""
+        headers = dict(self.headers)
+        headers["Prefer"] = f"resolution={self.resolucao},return=representation"
+        # Só a chave volta na resposta: confirma sem trafegar o lote de novo
+        params = {
+            "on_conflict": self.esquema.on_conflict,
+            "select": self.esquema.on_conflict.split(",")[0],
+        }
+        erro = None
+        for tentativa in range(self.tentativas):
+            try:
+                r = self.sessao.post(self.url, params=params, headers=headers, json=registros)
+            except Exception as e:
+                erro = e
+            else:
+                if r.status_code == 413 and len(registros) > 1:
+                    meio = len(registros) // 2
+                    return self.enviar(registros[:meio]) + self.enviar(registros[meio:])
+                if r.status_code in (200, 201):
+                    return len(r.json())
+                erro = ErroImportacao(f"{r.status_code}: {r.text[:300]}")
+                if r.status_code < 500 and r.status_code != 429:
+                    # Erro do próprio lote (esquema, constraint): repetir não adianta
+                    break
+            self.reenvios += 1
+            telemetria.dormir(min(30, 2 ** tentativa), "backoff")
+        raise ErroImportacao(f"Lote de {len(registros)} linhas falhou: {erro}")
+
+    def importar(self, registros):
+        """Envia os registros em lotes, até em_voo ao mesmo tempo. Devolve confirmados."""
+        confirmados = 0
+        with ThreadPoolExecutor(max_workers=self.em_voo) as executor:
+            pendentes = set()
+            for lote in em_lotes(registros, self.lote):
+                if len(pendentes) >= self.em_voo:
+                    feitos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                    confirmados += sum(f.result() for f in feitos)
+                pendentes.add(executor.submit(self.enviar, lote))
+                self.lotes += 1
+            for futuro in pendentes:
+                confirmados += futuro.result()
+        return confirmados
+
+# ==============================
+# EXECUÇÃO
+# ==============================
+
+def opcoes_importacao(nome_esquema):
+    """
+    Opções de importar_csv por esquema. Concorrentes, por segurança, exige a
+    data de HOJE (REQUIRE_TODAY=0 libera) e não força data (FORCE_TODAY=1 força).
+    """
+    if nome_esquema != "concorrentes":
+        return {}
+    return {
+        "exigir_hoje": os.environ.get("REQUIRE_TODAY", "1") == "1",
+        "forcar_hoje": os.environ.get("FORCE_TODAY", "0") == "1",
+        "vazio_ok": True,
+    }
+
+def importar_csv(nome_esquema, exigir_hoje=False, forcar_hoje=False, vazio_ok=False):
+    """
+    Fluxo comum dos import_csv_*.py. Levanta ErroPulse se nada for gravado
+    (regra de ouro: verde = gravou), exceto com vazio_ok.
+    """
+    esquema = ESQUEMAS[nome_esquema]
+
+    url = os.environ.get("SUPABASE_URL")
+    chave = os.environ.get("SUPABASE_KEY")
+    if not url or not chave:
+        raise ErroPulse("Variáveis SUPABASE_URL ou SUPABASE_KEY não encontradas.")
+
+    caminho = os.environ.get("CSV_PATH", esquema.csv_padrao)
+    if not os.path.exists(caminho):
+        raise ErroPulse(f"CSV não encontrado: {caminho}")
+    print(f"📄 CSV detectado: {caminho} -> {esquema.tabela}")
+
+    # CSV idêntico ao último importado: nada a ler nem a enviar
+    manifesto = Manifesto()
+    tabela = chave_tabela(esquema.tabela, esquema.fixos)
+    sha256 = sha256_arquivo(caminho)
+    if manifesto.inalterado(tabela, sha256) and not RECONCILIAR:
+        anterior = manifesto.importacoes[tabela]
+        print(f"⏭️ CSV inalterado desde {anterior['importado_em']} "
+              f"({anterior['confirmados']} registros confirmados) — nada a importar.")
+        return anterior["confirmados"]
+
+    importador = Importador(esquema, url, chave)
+
+    desde = None
+    if esquema.incremental:
+        if RECONCILIAR or not manifesto.conhece(tabela):
+            # Uma chamada traz as marcas de todas as tabelas
+            divergencias = manifesto.reconciliar(importador.sessao, url, importador.headers)
+            if divergencias is None:
+                print("⚠️ View de marcas ausente no banco; consultando a tabela.")
+                desde = importador.ultima_data()
+            else:
+                for chave_div, local, remoto in divergencias:
+                    print(f"⚠️ {chave_div}: manifesto em {local}, servidor em {remoto or 'nenhuma'} — reimportando.")
+                desde = manifesto.marca(tabela)
+        else:
+            desde = manifesto.marca(tabela)
+        print(f"📅 Última data no banco: {desde if desde else 'nenhuma'}")
+
+    hoje = date.today().strftime("%Y-%m-%d")
+    leitura = Leitura(
+        caminho, esquema, desde=desde,
+        exigir_data=hoje if exigir_hoje else None,
+        forcar_data=hoje if forcar_hoje else None,
+    )
+
+    inicio = time.monotonic()
+    try:
+        # Estrito / data exigida: lê e valida o CSV inteiro antes de enviar,
+        # senão uma linha ruim no meio deixaria os lotes anteriores gravados
+        registros = list(leitura) if leitura.tudo_ou_nada else leitura
+        confirmados = importador.importar(registros)
+    except ValueError as e:
+        raise ErroImportacao(str(e)) from e
+    duracao = time.monotonic() - inicio
+
+    print(f"📊 Linhas novas: {leitura.lidas} | Ignoradas: {leitura.ignoradas} | Inválidas: {leitura.invalidas}")
+    if leitura.datas:
+        print(f"📅 Datas importadas: {min(leitura.datas)} a {max(leitura.datas)}")
+    print(f"📦 {importador.lotes} lotes de até {importador.lote} linhas, "
+          f"{importador.em_voo} em voo, {importador.reenvios} reenvios, {duracao:.1f}s")
+
+    if leitura.lidas == 0:
+        if vazio_ok:
+            print("Nenhum registro novo para processar.")
+            return 0
+        raise ErroImportacao(
+            "ERRO CRÍTICO: Nenhum registro novo para inserir.\n"
+            "➡️ Workflow abortado para evitar falso positivo (verde sem ingestão)."
+        )
+
+    if confirmados == 0:
+        raise ErroImportacao("ERRO CRÍTICO: Supabase não retornou registros inseridos.")
+
+    manifesto.registrar(
+        tabela, caminho, sha256, min(leitura.datas), max(leitura.datas), leitura.lidas, confirmados
+    )
+    print(f"✅ {confirmados} registros confirmados em {esquema.tabela}")
+    return confirmados
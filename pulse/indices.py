@@ -0,0 +1,359 @@
+"""
+Índices dos dashboards pré-calculados (tabela pulse_indices).
+
+radar-amazonia.html e radar-serras.html calculam nowcasting,
+confiabilidade, IPD, momentum, oportunidade, risco e IPCR final no
+navegador, com um filter() por destino sobre o que a página carregou: as
+coletas do período do seletor (data_coleta >= hoje - 7/14/30/90 dias).
+Aqui os mesmos índices saem de uma passada vetorizada sobre o histórico
+Parquet, uma vez por período: cada linha (destino, dia, período) recebe os
+valores que o card mostraria se esse dia fosse o último carregado com
+esse período, e guarda o início da janela (desde = dia - período). As
+páginas buscam a linha pelo último dia carregado e pelo período do
+seletor (não pela data do navegador, que pode já ser o dia seguinte ao
+da última coleta); em "Personalizado", ou sem linha, calculam no
+navegador.
+
+As fórmulas replicam as do JS, inclusive os arredondamentos:
+Math.round arredonda .5 para cima e toFixed(1) (variação e share) usa o
+valor binário exato, meio para longe do zero.
+
+    python -m pulse.indices                      # últimos PULSE_INDICES_DIAS dias
+    python -m pulse.indices --carteira para --tudo --sem-supabase --csv indices.csv
+"""
+import argparse
+import csv
+import os
+import sys
+from datetime import date, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+import pandas as pd
+
+from pulse.erros import ErroPulse, rodar
+
+# ==============================
+# CONFIGURAÇÕES
+# ==============================
+
+# Carteiras com dashboard (radar-amazonia: para; radar-serras: serras-ancora)
+INDICES_CARTEIRAS = [
+    c.strip() for c in os.environ.get("PULSE_INDICES_CARTEIRAS", "para,serras-ancora").split(",") if c.strip()
+]
+# Dias reenviados a cada execução (o backfill pode reescrever dias antigos)
+INDICES_DIAS = int(os.environ.get("PULSE_INDICES_DIAS", "14"))
+
+# Períodos do seletor dos radares (value das <option>)
+INDICES_PERIODOS = (7, 14, 30, 90)
+
+# Janelas dos cálculos no JS (slice(0, 10) e slice(0, 5))
+JANELA_NOWCASTING = 10
+JANELA_CURTA = 5
+
+COLUNAS_INDICES = [
+    "carteira",
+    "destino_id",
+    "data_coleta",
+    "periodo",
+    "desde",
+    "interesse",
+    "share",
+    "variacao",
+    "nowcasting",
+    "nowcasting_direcao",
+    "confiabilidade",
+    "confiabilidade_nivel",
+    "confiabilidade_classe",
+    "ipd",
+    "momentum",
+    "oportunidade",
+    "risco",
+    "ipcr_final",
+]
+
+# ==============================
+# ARREDONDAMENTOS DO JS
+# ==============================
+
+def js_round(valores):
+    """Math.round: meio para cima (-2.5 -> -2)."""
+    return np.floor(np.asarray(valores, dtype=float) + 0.5)
+
+def js_to_fixed_1(valor):
+    """Number(x.toFixed(1)); NaN continua NaN."""
+    if not np.isfinite(valor):
+        return float("nan")
+    return float(Decimal(float(valor)).quantize(Decimal("0.1"), rounding=ROUND_HALF_UP))
+
+def _to_fixed_1(valores):
+    return np.array([js_to_fixed_1(v) for v in valores], dtype=float)
+
+def _hhi(o1, o2, o3):
+    """(soma, HHI) das três origens na ordem do reduce() do JS."""
+    soma = o1 + o2 + o3
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p1, p2, p3 = o1 / soma, o2 / soma, o3 / soma
+        hhi = ((0 + p1 * p1) + p2 * p2) + p3 * p3
+    return soma, hhi
+
+# ==============================
+# CÁLCULO
+# ==============================
+
+def calcular(df, periodo):
+    """
+    DataFrame com data_coleta, destino_id, interesse e origem_N_pct de UMA
+    carteira -> DataFrame com COLUNAS_INDICES (sem 'carteira'), uma linha
+    por destino e dia, com o histórico recortado como a página carregaria
+    com esse período: só as coletas com data_coleta >= dia - periodo.
+    """
+    df = df.sort_values(["destino_id", "data_coleta"]).reset_index(drop=True)
+    interesse = df["interesse"].astype(float).to_numpy()
+    grupos = df.groupby("destino_id", sort=False)["interesse"]
+    datas = pd.to_datetime(df["data_coleta"])
+    desde = datas - pd.Timedelta(days=periodo)
+
+    # historico[k] do JS = k-ésima coleta anterior do destino (0 = o próprio dia),
+    # desde que esteja dentro do período carregado
+    datas_grupo = datas.groupby(df["destino_id"], sort=False)
+    dentro = np.vstack([(datas_grupo.shift(k) >= desde).to_numpy() for k in range(JANELA_NOWCASTING)])
+    lags = np.vstack([grupos.shift(k).astype(float).to_numpy() for k in range(JANELA_NOWCASTING)])
+    lags = np.where(dentro, lags, np.nan)
+    # Coletas no período até o dia (satura em JANELA_NOWCASTING, o máximo que o cálculo usa)
+    contagem = dentro.sum(axis=0)
+    n10 = np.minimum(contagem, JANELA_NOWCASTING)
+    n5 = np.minimum(contagem, JANELA_CURTA)
+    h0, h1, h2 = lags[0], lags[1], lags[2]
+
+    # Variação vs. coleta anterior: toFixed(1), 0 com anterior zerado, null sem anterior
+    with np.errstate(invalid="ignore", divide="ignore"):
+        bruta = (h0 - h1) / h1 * 100
+    variacao = np.where(contagem > 1, np.where(h1 != 0, _to_fixed_1(bruta), 0.0), np.nan)
+
+    # Share do dia: toFixed(1) de interesse / soma do dia
+    soma_dia = df.groupby("data_coleta")["interesse"].transform("sum").astype(float).to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        share = _to_fixed_1(interesse / soma_dia * 100)
+
+    # Origens do próprio dia (|| 0)
+    origens = [df[f"origem_{i}_pct"].astype(float).fillna(0).to_numpy() for i in (1, 2, 3)]
+    soma_origens, hhi = _hhi(*origens)
+
+    # ---- Nowcasting: EMA (alpha 0.3) das últimas 10 coletas, da mais antiga para a mais nova
+    alpha = 0.3
+    linhas = np.arange(len(df))
+    ema = lags[n10 - 1, linhas]
+    for j in range(JANELA_NOWCASTING - 2, -1, -1):
+        ema = np.where(j < n10 - 1, alpha * lags[j] + (1 - alpha) * ema, ema)
+    tendencia = ((h0 - h1) + (h1 - h2)) / 2
+    nowcasting = np.maximum(0, np.minimum(100, js_round(ema + (tendencia * 0.5))))
+    direcao = np.where(tendencia > 1, "↗️", np.where(tendencia < -1, "↘️", "➡️"))
+    tem3 = contagem >= 3
+    nowcasting = np.where(tem3, nowcasting, np.nan)
+    direcao = np.where(tem3, direcao, None)
+
+    # ---- Média, variância e velocidade das últimas 5 coletas (historico[0..4])
+    soma5 = np.zeros(len(df))
+    for k in range(JANELA_CURTA):
+        soma5 = soma5 + np.where(k < n5, np.nan_to_num(lags[k]), 0)
+    media5 = soma5 / n5
+    quadrados = np.zeros(len(df))
+    passos = np.zeros(len(df))
+    positivas = np.zeros(len(df))
+    negativas = np.zeros(len(df))
+    for k in range(JANELA_CURTA):
+        desvio = np.nan_to_num(lags[k]) - media5
+        quadrados = quadrados + np.where(k < n5, desvio * desvio, 0)
+        if k < JANELA_CURTA - 1:
+            dentro = k < n5 - 1
+            diff = np.nan_to_num(lags[k]) - np.nan_to_num(lags[k + 1])
+            passos = passos + np.where(dentro, np.abs(diff), 0)
+            positivas = positivas + (dentro & (diff > 0))
+            negativas = negativas + (dentro & (diff < 0))
+    desvio_padrao = np.sqrt(quadrados / n5)
+
+    # ---- Confiabilidade
+    with np.errstate(invalid="ignore", divide="ignore"):
+        consistencia = np.where(n5 >= 4, np.maximum(positivas, negativas) / (n5 - 1) * 100, 0)
+    estabilidade = np.maximum(0, 100 - (desvio_padrao * 2))
+    diversificacao = np.where(soma_origens > 0, np.maximum(0, (1 - hhi) * 100), 50)
+    confiabilidade = js_round((consistencia * 0.4) + (estabilidade * 0.3) + (diversificacao * 0.3))
+    confiabilidade = np.where(tem3, confiabilidade, np.nan)
+    nivel = np.select(
+        [~tem3, confiabilidade >= 70, confiabilidade >= 40],
+        ["Dados Insuficientes", "🟢 Alta", "🟡 Média"], "🔴 Baixa",
+    )
+    classe = np.select([~tem3, confiabilidade >= 70, confiabilidade >= 40], ["baixa", "alta", "media"], "baixa")
+
+    # ---- IPD
+    variacao_norm = np.minimum(np.abs(np.nan_to_num(variacao)), 100)
+    aceleracao = np.where(tem3, np.abs((h0 - h1) - (h1 - h2)), 0)
+    concentracao = np.where(soma_origens > 0, hhi * 100, 0)
+    ipd = js_round((0.4 * variacao_norm) + (0.3 * np.minimum(aceleracao * 2, 100)) + (0.3 * concentracao))
+
+    # ---- Momentum
+    subindo = (h0 > h1) & (h1 > h2)
+    caindo = (h0 < h1) & (h1 < h2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        velocidade = passos / (n5 - 1)
+    constancia = 100 - np.minimum(desvio_padrao, 100)
+    momentum = np.select(
+        [~tem3, subindo & (velocidade > 5) & (constancia > 60), caindo],
+        ["Dados Insuficientes", "🚀 Forte", "📉 Perdendo"], "⚡ Moderado",
+    )
+
+    # ---- Oportunidade: variação / média do dia ponderada pelo interesse
+    # Number(null) = 0 no JS: destinos sem variação entram com 0
+    variacao_zero = np.nan_to_num(variacao)
+    peso = np.where(interesse > 0, interesse, 0)
+    dias = df["data_coleta"]
+    soma_pesos = pd.Series(peso).groupby(dias).transform("sum").to_numpy()
+    soma_ponderada = pd.Series(variacao_zero * peso).groupby(dias).transform("sum").to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        media_ponderada = soma_ponderada / soma_pesos
+        oportunidade = np.where(
+            (soma_pesos > 0) & (media_ponderada != 0), variacao_zero / media_ponderada, np.nan
+        )
+
+    # ---- Risco (concentração das origens)
+    risco = np.select(
+        [soma_origens == 0, hhi > 0.5, hhi > 0.35], ["N/A", "🔴 Alto", "🟡 Médio"], "🟢 Baixo"
+    )
+
+    # ---- IPCR final: variação 40% | IPD 30% | share 20% | momentum 10%
+    score_variacao = js_round(((np.clip(variacao_zero, -50, 50) + 50) / 100) * 100)
+    score_ipd = np.clip(ipd, 0, 100)
+    share_valido = np.where(np.isfinite(share) & (share > 0), share, 0)
+    max_share = pd.Series(share_valido).groupby(dias).transform("max").to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        score_share = np.where(
+            np.isfinite(share) & (max_share > 0), np.clip(js_round((share / max_share) * 100), 0, 100), 50
+        )
+    score_momentum = np.select(
+        [momentum == "🚀 Forte", momentum == "⚡ Moderado", momentum == "📉 Perdendo"], [80, 60, 30], 50
+    )
+    ipcr_final = np.clip(
+        js_round((score_variacao * 0.40) + (score_ipd * 0.30) + (score_share * 0.20) + (score_momentum * 0.10)),
+        0, 100,
+    )
+
+    return pd.DataFrame({
+        "destino_id": df["destino_id"],
+        "data_coleta": df["data_coleta"],
+        "periodo": periodo,
+        "desde": desde,
+        "interesse": df["interesse"].astype(int),
+        "share": share,
+        "variacao": variacao,
+        "nowcasting": nowcasting,
+        "nowcasting_direcao": direcao,
+        "confiabilidade": confiabilidade,
+        "confiabilidade_nivel": nivel,
+        "confiabilidade_classe": classe,
+        "ipd": ipd,
+        "momentum": momentum,
+        "oportunidade": oportunidade,
+        "risco": risco,
+        "ipcr_final": ipcr_final,
+    })
+
+# ==============================
+# ENTRADA E SAÍDA
+# ==============================
+
+def carregar(carteira, ate=None):
+    """Histórico Parquet da carteira (pulse.historico)."""
+    from pulse.historico import ler_pandas
+
+    colunas = ["data_coleta", "destino_id", "interesse", "origem_1_pct", "origem_2_pct", "origem_3_pct"]
+    df = ler_pandas(carteiras=[carteira], colunas=colunas, ate=ate)
+    if df.empty:
+        return df
+    return df.dropna(subset=["interesse"])
+
+def registros(indices, carteira):
+    """Linhas prontas para o JSON do PostgREST (NaN -> null)."""
+    inteiros = {"periodo", "interesse", "nowcasting", "confiabilidade", "ipd", "ipcr_final"}
+    for linha in indices.itertuples(index=False):
+        registro = {"carteira": carteira}
+        for coluna, valor in zip(indices.columns, linha):
+            if valor is None or (isinstance(valor, float) and not np.isfinite(valor)):
+                registro[coluna] = None
+            elif coluna in ("data_coleta", "desde"):
+                registro[coluna] = str(valor)[:10]
+            elif coluna in inteiros:
+                registro[coluna] = int(valor)
+            elif isinstance(valor, (float, np.floating)):
+                registro[coluna] = float(valor)
+            else:
+                registro[coluna] = str(valor)
+        yield registro
+
+def esquema_indices():
+    from pulse.importador import Esquema
+
+    return Esquema(
+        "pulse_indices", "carteira,destino_id,data_coleta,periodo",
+        {coluna: None for coluna in COLUNAS_INDICES}, None, incremental=False,
+    )
+
+def gravar(linhas, url, chave):
+    from pulse.importador import Importador
+
+    importador = Importador(esquema_indices(), url, chave)
+    return importador.importar(linhas)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pré-calcula os índices dos dashboards")
+    parser.add_argument("--carteira", action="append", help="padrão: PULSE_INDICES_CARTEIRAS")
+    parser.add_argument("--desde", help="primeiro dia enviado (padrão: últimos PULSE_INDICES_DIAS dias)")
+    parser.add_argument("--tudo", action="store_true", help="envia todo o histórico")
+    parser.add_argument("--csv", help="grava os índices também neste CSV")
+    parser.add_argument("--sem-supabase", action="store_true")
+    args = parser.parse_args(argv)
+
+    desde = None
+    if not args.tudo:
+        desde = args.desde or str(date.today() - timedelta(days=INDICES_DIAS))
+
+    url = os.environ.get("SUPABASE_URL")
+    chave = os.environ.get("SUPABASE_KEY") or os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+    enviar = not args.sem_supabase and url and chave
+    if not enviar:
+        print("Supabase não configurado ou desativado - nada enviado.")
+
+    saida = []
+    for carteira in args.carteira or INDICES_CARTEIRAS:
+        try:
+            df = carregar(carteira)
+        except ImportError as e:
+            raise ErroPulse("pyarrow não instalado - sem histórico para calcular os índices.") from e
+        if df.empty:
+            print(f"⚠️ {carteira}: histórico vazio")
+            continue
+        # Cada período recorta o histórico como a página; o envio recorta só os dias
+        linhas = []
+        for periodo in INDICES_PERIODOS:
+            indices = calcular(df, periodo)
+            if desde:
+                indices = indices[pd.to_datetime(indices["data_coleta"]) >= pd.Timestamp(desde)]
+            linhas.extend(registros(indices, carteira))
+        print(f"📈 {carteira}: {len(df)} coletas, {len(linhas)} linhas de índices"
+              f" (períodos {'/'.join(map(str, INDICES_PERIODOS))})"
+              + (f" desde {desde}" if desde else ""))
+        saida.extend(linhas)
+        if enviar and linhas:
+            confirmados = gravar(linhas, url, chave)
+            print(f"✅ {carteira}: {confirmados} linhas confirmadas em pulse_indices")
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=COLUNAS_INDICES)
+            writer.writeheader()
+            writer.writerows(saida)
+        print(f"📄 {args.csv} gravado")
+
+
+if __name__ == "__main__":
+    sys.exit(rodar(main))
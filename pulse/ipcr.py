@@ -0,0 +1,316 @@
+"""
+IPCR (Índice de Pressão Comparativa Regional) pré-calculado, tabela pulse_ipcr.
+
+O calcularIPCR() dos radares compara a variação de cada destino com a
+média das variações dos concorrentes mapeados, card a card. Aqui a matriz
+destino x concorrente sai de uma vez por dia e carteira: os concorrentes
+de cada destino vêm de "concorrentes" em pulse/carteiras.json e a carteira
+deles de "concorrencia" (para -> concorrentes-nacionais, serras-ancora ->
+serras-concorrentes).
+
+Como os índices (pulse/indices.py), o IPCR sai uma vez por período do
+seletor (7/14/30/90): a página só enxerga as coletas de data_coleta -
+periodo em diante, então a variação de um destino ou concorrente cuja
+coleta anterior ficou fora do período não existe para ela. Cada linha
+guarda periodo e desde, e as páginas buscam pelo último dia e pelo
+período.
+
+O cálculo é incremental: .pulse/ipcr/<carteira>.json guarda o último dia
+processado e as duas últimas coletas (dia e interesse) de cada destino e
+concorrente, que é tudo o que a variação precisa. Cada execução relê do
+histórico Parquet a partir desse dia, inclusive, e regrava esse dia: uma
+recoleta ou uma importação corrigida do mesmo dia substitui o valor
+anterior em vez de ser pulada. Sem estado (ou com --refazer, depois de um
+backfill) o histórico inteiro é reprocessado.
+
+    python -m pulse.ipcr
+    python -m pulse.ipcr --carteira para --refazer --sem-supabase --csv ipcr.csv
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from datetime import date, timedelta
+
+from pulse.erros import ErroPulse, rodar
+from pulse.indices import INDICES_PERIODOS, js_to_fixed_1
+
+# ==============================
+# CONFIGURAÇÕES
+# ==============================
+
+IPCR_CARTEIRAS = [
+    c.strip() for c in os.environ.get("PULSE_IPCR_CARTEIRAS", "para,serras-ancora").split(",") if c.strip()
+]
+IPCR_DIR = os.environ.get("PULSE_IPCR_DIR", os.path.join(".pulse", "ipcr"))
+# Formato do estado; outro formato (ou nenhum) reprocessa o histórico inteiro
+VERSAO_ESTADO = 2
+
+# Limites do JS: razão acima de 1.2 ou abaixo de 0.8 muda a classe
+RAZAO_ALTA = 1.2
+RAZAO_BAIXA = 0.8
+
+GANHANDO = ("✅ Ganhando Competitividade", "ganhando")
+PERDENDO = ("⚠️ Perdendo Competitividade", "perdendo")
+ESTAVEL = ("➡️ Estável vs Concorrentes", "estavel")
+
+# Texto de "sem dados dos concorrentes" de cada radar
+AGUARDANDO = {
+    "para": "⏸️ Aguardando Dados Nacionais",
+    "serras-ancora": "⏸️ Aguardando Dados de Concorrentes",
+}
+
+COLUNAS_IPCR = [
+    "carteira",
+    "destino_id",
+    "data_coleta",
+    "periodo",
+    "desde",
+    "variacao",
+    "media_concorrentes",
+    "ipcr",
+    "status",
+    "classe",
+    "sem_concorrentes",
+    "concorrentes",
+]
+
+# ==============================
+# CÁLCULO
+# ==============================
+
+def variacao_percentual(ultimas):
+    """[atual, anterior] -> variação crua do JS (0 com anterior zerado)."""
+    atual, anterior = ultimas
+    return (atual - anterior) / anterior * 100 if anterior != 0 else 0
+
+def variacao_card(ultimas):
+    """Variação como o card a mostra: toFixed(1), ou None sem coleta anterior."""
+    if ultimas[1] is None:
+        return None
+    if ultimas[1] == 0:
+        return 0
+    return js_to_fixed_1(variacao_percentual(ultimas))
+
+def calcular_ipcr(variacao, concorrentes, rivais, aguardando):
+    """
+    Mesmo resultado do calcularIPCR() do JS para um destino.
+    rivais: concorrente -> [interesse atual, anterior] até o dia.
+    """
+    saida = {
+        "variacao": variacao, "media_concorrentes": None, "ipcr": None,
+        "sem_concorrentes": False, "concorrentes": [],
+    }
+    if variacao is None:
+        return dict(saida, status="⏸️ Sem Dados de Variação", classe="estavel")
+
+    if not concorrentes:
+        if variacao > 10:
+            status = ("📈 Crescimento Forte", "ganhando")
+        elif variacao < -10:
+            status = ("📉 Queda Acentuada", "perdendo")
+        elif variacao > 0:
+            status = ("✅ Crescimento Moderado", "ganhando")
+        else:
+            status = ("➡️ Estável", "estavel")
+        return dict(saida, status=status[0], classe=status[1], sem_concorrentes=True)
+
+    if not rivais:
+        return dict(saida, status=aguardando, classe="estavel")
+
+    variacoes = []
+    for rival in concorrentes:
+        ultimas = rivais.get(rival)
+        if not ultimas or ultimas[1] is None:
+            continue
+        variacoes.append({"id": rival, "variacao": variacao_percentual(ultimas), "interesse": ultimas[0]})
+    if not variacoes:
+        return dict(saida, status="⏸️ Dados Insuficientes", classe="estavel")
+
+    soma = 0
+    for item in variacoes:
+        soma += item["variacao"]
+    media = soma / len(variacoes)
+
+    razao = None
+    if media == 0:
+        status = GANHANDO if variacao > 0 else PERDENDO if variacao < 0 else ESTAVEL
+    elif variacao > 0 and media < 0:
+        status = GANHANDO
+    elif variacao < 0 and media > 0:
+        status = PERDENDO
+    else:
+        razao = abs(variacao) / abs(media)
+        maior, menor = (GANHANDO, PERDENDO) if variacao > 0 else (PERDENDO, GANHANDO)
+        status = maior if razao > RAZAO_ALTA else menor if razao < RAZAO_BAIXA else ESTAVEL
+
+    return dict(saida, media_concorrentes=media, ipcr=razao, status=status[0], classe=status[1],
+                concorrentes=variacoes)
+
+# ==============================
+# ESTADO INCREMENTAL
+# ==============================
+
+class EstadoIPCR:
+    """Último dia processado e as duas últimas coletas ([dia, interesse]) de destinos e concorrentes."""
+
+    def __init__(self, carteira, raiz=IPCR_DIR, refazer=False):
+        self.caminho = os.path.join(raiz, f"{carteira}.json")
+        dados = {}
+        if not refazer:
+            try:
+                with open(self.caminho, encoding="utf-8") as f:
+                    dados = json.load(f)
+            except (OSError, ValueError):
+                pass
+        if dados.get("versao") != VERSAO_ESTADO:
+            dados = {}
+        self.data = dados.get("data")
+        self.destinos = dados.get("destinos", {})
+        self.rivais = dados.get("rivais", {})
+
+    def registrar(self, ultimas, destino_id, dia, interesse):
+        """Coleta do dia na frente; uma segunda do mesmo dia substitui a primeira."""
+        coletas = [c for c in ultimas.get(destino_id, []) if c[0] != dia]
+        ultimas[destino_id] = ([[dia, interesse]] + coletas)[:2]
+
+    def salvar(self):
+        os.makedirs(os.path.dirname(self.caminho) or ".", exist_ok=True)
+        temporario = self.caminho + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({"versao": VERSAO_ESTADO, "data": self.data,
+                       "destinos": self.destinos, "rivais": self.rivais},
+                      f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(temporario, self.caminho)
+
+
+def _por_dia(tabela):
+    """pyarrow.Table -> {dia ISO: [(destino_id, interesse)]}, dias em ordem."""
+    dias = {}
+    if tabela.num_rows == 0:
+        return dias
+    for dia, destino_id, interesse in zip(
+        tabela.column("data_coleta").to_pylist(),
+        tabela.column("destino_id").to_pylist(),
+        tabela.column("interesse").to_pylist(),
+    ):
+        if interesse is not None:
+            dias.setdefault(str(dia), []).append((destino_id, interesse))
+    return dict(sorted(dias.items()))
+
+def no_periodo(coletas, desde):
+    """[atual, anterior] das coletas a partir de desde (anterior None), ou None sem nenhuma."""
+    dentro = [interesse for dia, interesse in coletas if dia >= desde]
+    if not dentro:
+        return None
+    return [dentro[0], dentro[1] if len(dentro) > 1 else None]
+
+def avancar(carteira, estado, leitura_destinos, leitura_rivais, periodos=INDICES_PERIODOS):
+    """
+    Processa os dias lidos (leituras por dia de _por_dia) e devolve as
+    linhas de pulse_ipcr, uma por destino, dia e período. Os concorrentes do
+    dia entram antes do cálculo, como no radar, que compara com as coletas
+    até o último dia carregado; cada período só vê as coletas de dia -
+    periodo em diante.
+    """
+    concorrentes = {d["id"]: d["concorrentes"] for d in carteira.destinos}
+    aguardando = AGUARDANDO.get(carteira.nome, AGUARDANDO["para"])
+    linhas = []
+    for dia in sorted(set(leitura_destinos) | set(leitura_rivais)):
+        for rival, interesse in leitura_rivais.get(dia, []):
+            estado.registrar(estado.rivais, rival, dia, interesse)
+        for destino_id, interesse in leitura_destinos.get(dia, []):
+            estado.registrar(estado.destinos, destino_id, dia, interesse)
+        for periodo in periodos:
+            desde = (date.fromisoformat(dia) - timedelta(days=periodo)).isoformat()
+            rivais = {}
+            for rival, coletas in estado.rivais.items():
+                ultimas = no_periodo(coletas, desde)
+                if ultimas:
+                    rivais[rival] = ultimas
+            for destino_id, _ in leitura_destinos.get(dia, []):
+                resultado = calcular_ipcr(
+                    variacao_card(no_periodo(estado.destinos[destino_id], desde)),
+                    concorrentes.get(destino_id, []), rivais, aguardando,
+                )
+                linhas.append(dict(carteira=carteira.nome, destino_id=destino_id, data_coleta=dia,
+                                   periodo=periodo, desde=desde, **resultado))
+        estado.data = dia
+    return linhas
+
+# ==============================
+# EXECUÇÃO
+# ==============================
+
+def esquema_ipcr():
+    from pulse.importador import Esquema
+
+    return Esquema(
+        "pulse_ipcr", "carteira,destino_id,data_coleta,periodo",
+        {coluna: None for coluna in COLUNAS_IPCR}, None, incremental=False,
+    )
+
+def gravar(linhas, url, chave):
+    from pulse.importador import Importador
+
+    return Importador(esquema_ipcr(), url, chave).importar(linhas)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pré-calcula o IPCR dos radares")
+    parser.add_argument("--carteira", action="append", help="padrão: PULSE_IPCR_CARTEIRAS")
+    parser.add_argument("--refazer", action="store_true", help="ignora o estado e reprocessa todo o histórico")
+    parser.add_argument("--csv", help="grava as linhas também neste CSV")
+    parser.add_argument("--sem-supabase", action="store_true")
+    args = parser.parse_args(argv)
+
+    from pulse.carteiras import carregar_carteiras
+    from pulse.historico import ler
+
+    url = os.environ.get("SUPABASE_URL")
+    chave = os.environ.get("SUPABASE_KEY") or os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+    enviar = not args.sem_supabase and url and chave
+    if not enviar:
+        print("Supabase não configurado ou desativado - nada enviado (estado não avança).")
+
+    todas = {c.nome: c for c in carregar_carteiras(None)}
+    saida = []
+    for nome in args.carteira or IPCR_CARTEIRAS:
+        carteira = todas.get(nome)
+        if carteira is None or not carteira.concorrencia:
+            raise ErroPulse(f"{nome}: carteira desconhecida ou sem 'concorrencia' em carteiras.json")
+
+        estado = EstadoIPCR(nome, refazer=args.refazer)
+        # O último dia processado é relido e regravado (recoleta, importação corrigida)
+        desde = date.fromisoformat(estado.data) if estado.data else None
+
+        colunas = ["data_coleta", "destino_id", "interesse"]
+        try:
+            destinos = _por_dia(ler([nome], colunas, desde=desde))
+            rivais = _por_dia(ler([carteira.concorrencia], colunas, desde=desde))
+        except ImportError as e:
+            raise ErroPulse("pyarrow não instalado - sem histórico para o IPCR.") from e
+
+        linhas = avancar(carteira, estado, destinos, rivais)
+        print(f"🧮 {nome} vs {carteira.concorrencia}: {len(destinos)} dias"
+              + (f" desde {desde}" if desde else " (histórico inteiro)")
+              + f", {len(linhas)} linhas")
+        saida.extend(linhas)
+
+        if enviar:
+            if linhas:
+                confirmados = gravar(linhas, url, chave)
+                print(f"✅ {nome}: {confirmados} linhas confirmadas em pulse_ipcr")
+            estado.salvar()
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=COLUNAS_IPCR)
+            writer.writeheader()
+            for linha in saida:
+                writer.writerow(dict(linha, concorrentes=json.dumps(linha["concorrentes"], ensure_ascii=False)))
+        print(f"📄 {args.csv} gravado")
+
+
+if __name__ == "__main__":
+    sys.exit(rodar(main))
@@ -0,0 +1,77 @@
+"""
+Limitador de taxa (token bucket) para as chamadas ao Google Trends.
+
+Substitui os sleeps fixos dos coletores: uma requisição só espera quando o
+balde está vazio. A taxa se ajusta por AIMD — sobe um pouco a cada
+resposta bem-sucedida e cai pela metade a cada TooManyRequestsError.
+"""
+import os
+import threading
+import time
+
+from pulse import telemetria
+
+# ==============================
+# CONFIGURAÇÕES
+# ==============================
+
+TRENDS_RPM = float(os.environ.get("PULSE_TRENDS_RPM", "12"))
+TRENDS_RAJADA = float(os.environ.get("PULSE_TRENDS_RAJADA", "3"))
+TRENDS_RPM_MIN = float(os.environ.get("PULSE_TRENDS_RPM_MIN", "1"))
+TRENDS_RPM_MAX = float(os.environ.get("PULSE_TRENDS_RPM_MAX", "30"))
+# AIMD: +INCREMENTO rpm por sucesso, rpm * FATOR a cada 429
+AIMD_INCREMENTO = float(os.environ.get("PULSE_TRENDS_AIMD_INCREMENTO", "0.25"))
+AIMD_FATOR = float(os.environ.get("PULSE_TRENDS_AIMD_FATOR", "0.5"))
+
+
+class LimitadorTaxa:
+
+    def __init__(self, rpm=TRENDS_RPM, rajada=TRENDS_RAJADA, rpm_min=TRENDS_RPM_MIN,
+                 rpm_max=TRENDS_RPM_MAX, incremento=AIMD_INCREMENTO, fator=AIMD_FATOR):
+        self.rpm = rpm
+        self.capacidade = max(1.0, rajada)
+        self.rpm_min = rpm_min
+        self.rpm_max = rpm_max
+        self.incremento = incremento
+        self.fator = fator
+        self.tokens = self.capacidade
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+        # Estatísticas da execução
+        self.requisicoes = 0
+        self.bloqueios = 0
+        self.dormido = 0.0
+
+    def _repor(self):
+        agora = time.monotonic()
+        self.tokens = min(self.capacidade, self.tokens + (agora - self._ultimo) * self.rpm / 60.0)
+        self._ultimo = agora
+
+    def adquirir(self):
+        """Bloqueia só o necessário para haver uma ficha no balde."""
+        while True:
+            with self._lock:
+                self._repor()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    self.requisicoes += 1
+                    return
+                espera = (1 - self.tokens) * 60.0 / self.rpm
+            telemetria.dormir(espera, "ritmo")
+            with self._lock:
+                self.dormido += espera
+
+    def sucesso(self):
+        with self._lock:
+            self.rpm = min(self.rpm_max, self.rpm + self.incremento)
+
+    def bloqueio(self):
+        """429 observado: reduz a taxa e esvazia o balde (sem rajada logo depois)."""
+        with self._lock:
+            self.bloqueios += 1
+            self.rpm = max(self.rpm_min, self.rpm * self.fator)
+            self.tokens = min(self.tokens, 0.0)
+
+    def resumo(self):
+        return (f"{self.requisicoes} requisicoes, {self.bloqueios} bloqueios (429), "
+                f"{self.dormido:.0f}s de espera, taxa final {self.rpm:.1f}/min")
@@ -0,0 +1,135 @@
+"""
+Manifesto local das importações (marca d'água por tabela).
+
+Para cada tabela (e tipo, em pulse_serras) guarda o sha256 do último CSV
+importado, o intervalo de datas que ele cobria e quantas linhas o servidor
+confirmou. Com isso o importador:
+
+- pula um CSV idêntico ao último importado sem ler nem chamar a rede;
+- usa a data máxima do manifesto como corte incremental, no lugar do
+  "order by data_coleta desc limit 1" a cada execução.
+
+Quando o manifesto não conhece a tabela (runner novo, cache expirado) ou
+com PULSE_IMPORT_RECONCILIAR=1, as marcas de TODAS as tabelas vêm numa só
+chamada à view pulse_importacao_marcas (sql/pulse_importacao_marcas.sql).
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+# ==============================
+# CONFIGURAÇÕES
+# ==============================
+
+MANIFESTO_ARQUIVO = os.environ.get(
+    "PULSE_MANIFESTO_ARQUIVO", os.path.join(".pulse", "importacoes", "manifesto.json")
+)
+RECONCILIAR = os.environ.get("PULSE_IMPORT_RECONCILIAR", "0") == "1"
+
+VIEW_MARCAS = "pulse_importacao_marcas"
+
+# ==============================
+# AUXILIARES
+# ==============================
+
+def sha256_arquivo(caminho, bloco=1024 * 1024):
+    h = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for parte in iter(lambda: f.read(bloco), b""):
+            h.update(parte)
+    return h.hexdigest()
+
+def chave_tabela(tabela, fixos=None):
+    """pulse_serras:tipo=ancora, pulse_amazonia, ..."""
+    partes = [tabela] + [f"{campo}={valor}" for campo, valor in sorted((fixos or {}).items())]
+    return ":".join(partes)
+
+# ==============================
+# MANIFESTO
+# ==============================
+
+class Manifesto:
+
+    def __init__(self, caminho=MANIFESTO_ARQUIVO):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        try:
+            with open(caminho, encoding="utf-8") as f:
+                dados = json.load(f)
+        except (OSError, ValueError):
+            dados = {}
+        self.importacoes = dados.get("importacoes", {})
+        self.servidor = dados.get("servidor", {})
+
+    def inalterado(self, chave, sha256):
+        entrada = self.importacoes.get(chave)
+        return entrada is not None and entrada.get("sha256") == sha256
+
+    def marca(self, chave):
+        """Última data_coleta conhecida da tabela, ou None se desconhecida."""
+        datas = [
+            entrada.get("data_max")
+            for entrada in (self.importacoes.get(chave), self.servidor.get(chave))
+            if entrada and entrada.get("data_max")
+        ]
+        return max(datas) if datas else None
+
+    def conhece(self, chave):
+        return chave in self.importacoes or chave in self.servidor
+
+    def registrar(self, chave, arquivo, sha256, data_min, data_max, linhas, confirmados):
+        with self._lock:
+            anterior = self.importacoes.get(chave, {})
+            self.importacoes[chave] = {
+                "arquivo": arquivo,
+                "sha256": sha256,
+                # Um CSV sem linhas novas não recua a marca d'água
+                "data_min": data_min or anterior.get("data_min"),
+                "data_max": max(filter(None, [data_max, anterior.get("data_max")]), default=None),
+                "linhas": linhas,
+                "confirmados": confirmados,
+                "importado_em": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+            self._salvar()
+
+    def reconciliar(self, sessao, url, headers):
+        """
+        Marcas de todas as tabelas numa única chamada à view. Onde a marca
+        local passa da do servidor (importação perdida), o servidor vence e
+        o hash é esquecido para o CSV ser reprocessado. Devolve a lista de
+        divergências, ou None se a view não existir no banco.
+        """
+        r = sessao.get(f"{url.rstrip('/')}/rest/v1/{VIEW_MARCAS}", params={"select": "*"}, headers=headers)
+        if r.status_code == 404:
+            return None
+        r.raise_for_status()
+        with self._lock:
+            self.servidor = {}
+            for linha in r.json():
+                fixos = {"tipo": linha["tipo"]} if linha.get("tipo") else None
+                self.servidor[chave_tabela(linha["tabela"], fixos)] = {
+                    "data_min": linha.get("data_min"),
+                    "data_max": linha.get("data_max"),
+                    "linhas": linha.get("linhas"),
+                    "consultado_em": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                }
+
+            divergencias = []
+            for chave, entrada in self.importacoes.items():
+                remoto = self.servidor.get(chave, {}).get("data_max")
+                if entrada.get("data_max") and (remoto or "") < entrada["data_max"]:
+                    divergencias.append((chave, entrada["data_max"], remoto))
+                    entrada["data_max"] = remoto
+                    entrada["sha256"] = None
+            self._salvar()
+        return divergencias
+
+    def _salvar(self):
+        os.makedirs(os.path.dirname(self.caminho) or ".", exist_ok=True)
+        temporario = self.caminho + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({"importacoes": self.importacoes, "servidor": self.servidor},
+                      f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(temporario, self.caminho)
@@ -0,0 +1,326 @@
+"""
+Planejador de consultas ao Google Trends para várias carteiras.
+
+Junta os destinos pendentes de todas as carteiras num único plano de
+payloads:
+
+- termos repetidos entre carteiras (mesmo payload, ignorando caixa,
+  espaços e ordem) viram uma só consulta;
+- o destino de uma cesta vai no mesmo payload que os termos dela, em
+  grupos de até LIMITE_PAYLOAD termos, reescalados pelo destino;
+- termos brutos de destinos diferentes NÃO são agrupados: no mesmo payload
+  a série de cada um passa a ser relativa ao maior termo e o recorte por
+  região vira participação entre os termos, mudando o significado do
+  interesse e das origens;
+- os payloads saem na ordem de prioridade das carteiras, então se o
+  orçamento de requisições acabar (timeout do workflow), as carteiras
+  mais importantes já estão no diário.
+
+Cada destino é montado e gravado no diário da sua carteira assim que o
+último payload de que depende chega. Se o disjuntor abrir no meio, os
+destinos que faltaram ficam em plano.pendentes e no diário.
+"""
+import os
+import threading
+
+from pulse.diario import DiarioColeta
+from pulse.disjuntor import CircuitoAberto
+from pulse.trends import (
+    compactar_vetor, media_interesse, top3_origens, vetor_origens, vetor_zerado,
+)
+from pulse.uf import padronizar
+
+# ==============================
+# CONFIGURAÇÕES
+# ==============================
+
+# Limite de termos por payload do Google Trends
+LIMITE_PAYLOAD = 5
+
+# MODO_CESTA=lote      -> destino + cesta no mesmo payload (escala compartilhada, padrao)
+# MODO_CESTA=individual -> um payload por termo (modo antigo, ~5x mais requisicoes)
+MODO_CESTA = os.environ.get("MODO_CESTA", "lote").strip().lower()
+
+# Requisições HTTP por payload fora do cache: token + série + regiões
+REQUISICOES_POR_PAYLOAD = 3
+
+# ==============================
+# AUXILIARES
+# ==============================
+
+def normalizar_termo(termo):
+    return " ".join(termo.split()).casefold()
+
+def chave_payload(termos):
+    return tuple(sorted(normalizar_termo(t) for t in termos))
+
+def renomear(df, termos):
+    """Colunas do payload compartilhado com a grafia usada pela carteira."""
+    if df.empty:
+        return df
+    grafia = {normalizar_termo(t): t for t in termos}
+    return df.rename(columns=lambda c: grafia.get(normalizar_termo(str(c)), c))
+
+def grupos_cesta(destino_nome, termos_busca):
+    """Payloads da cesta: o destino (âncora) + até LIMITE_PAYLOAD - 1 termos."""
+    por_payload = LIMITE_PAYLOAD - 1
+    grupos = [termos_busca[i:i + por_payload] for i in range(0, len(termos_busca), por_payload)] or [[]]
+    return [[destino_nome] + grupo for grupo in grupos]
+
+def top3_normalizado(origens):
+    """Top 3 estados de um dict estado -> soma, com o estado #1 = 100."""
+    sorted_origens = sorted(origens.items(), key=lambda x: x[1], reverse=True)[:3]
+    while len(sorted_origens) < 3:
+        sorted_origens.append(("none", 0))
+    # Normalizar: estado #1 = 100, demais proporcionais
+    max_val = sorted_origens[0][1] if sorted_origens[0][1] > 0 else 1
+    o1 = padronizar(sorted_origens[0][0])
+    p1 = 100
+    o2 = padronizar(sorted_origens[1][0])
+    p2 = int(round(sorted_origens[1][1] / max_val * 100)) if sorted_origens[1][1] > 0 else 0
+    o3 = padronizar(sorted_origens[2][0])
+    p3 = int(round(sorted_origens[2][1] / max_val * 100)) if sorted_origens[2][1] > 0 else 0
+    return o1, p1, o2, p2, o3, p3
+
+def top3_vetor(vetor):
+    """top3_normalizado de uma Series de vetor_origens (só UFs com interesse)."""
+    return top3_normalizado(vetor[vetor > 0].to_dict())
+
+# ==============================
+# MONTAGEM DOS RESULTADOS
+# ==============================
+
+def montar_bruto(termo, resposta):
+    """Interesse bruto + top 3 origens brutas + vetor das 27 UFs de um termo."""
+    dados, regioes = resposta
+    vetor = compactar_vetor(vetor_origens(regioes, [termo]))
+    return (media_interesse(dados, termo),) + top3_origens(regioes, termo) + (vetor,)
+
+def montar_cesta_lote(destino_nome, termos_busca, respostas):
+    """
+    Cesta em lote: respostas dos payloads de grupos_cesta(), na mesma ordem.
+    Retorna interesse_final (0.4*bruto + 0.6*intencao), origens qualificadas
+    e o vetor delas.
+    """
+    interesse_bruto = None
+    medias_intencao = []
+    vetor_intencao = vetor_zerado()
+    vetor_bruto = vetor_intencao
+
+    for n, (kw_list, (dados, regioes)) in enumerate(zip(grupos_cesta(destino_nome, termos_busca), respostas)):
+        grupo = kw_list[1:]
+        if not dados.empty:
+            medias = dados[[t for t in kw_list if t in dados.columns]].mean()
+            ancora = float(medias.get(destino_nome, 0))
+            escala = 1.0
+            if interesse_bruto is None:
+                interesse_bruto = ancora
+            elif ancora > 0 and interesse_bruto > 0:
+                # Reescala o grupo para a escala do primeiro payload via ancora
+                escala = interesse_bruto / ancora
+            medias_intencao.extend(int(float(medias.get(t, 0)) * escala) for t in grupo)
+
+        if n == 0:
+            vetor_bruto = vetor_origens(regioes, [destino_nome])
+        vetor_intencao = vetor_intencao + vetor_origens(regioes, grupo)
+
+    interesse_bruto = int(interesse_bruto or 0)
+    # Termos sem linha no Trends contam como zero, como no modo individual
+    medias_intencao += [0] * (len(termos_busca) - len(medias_intencao))
+    interesse_intencao_media = sum(medias_intencao) // len(termos_busca) if termos_busca else 0
+    interesse_final = int(0.4 * interesse_bruto + 0.6 * interesse_intencao_media)
+
+    vetor = vetor_intencao if vetor_intencao.any() else vetor_bruto
+    if vetor.any():
+        return (interesse_final,) + top3_vetor(vetor) + (compactar_vetor(vetor),)
+    return interesse_final, "none", 0, "none", 0, "none", 0, None
+
+def montar_cesta_individual(destino_nome, termos_busca, respostas):
+    """
+    Cesta no modo antigo: respostas de [destino] e de cada termo, um payload
+    por termo. Mesma fórmula, escalas independentes.
+    """
+    interesse_bruto, o1, p1, o2, p2, o3, p3, vetor_bruto = montar_bruto(destino_nome, respostas[0])
+
+    interesse_intencao_total = 0
+    vetor_intencao = vetor_zerado()
+    for termo, (dados, regioes) in zip(termos_busca, respostas[1:]):
+        interesse_intencao_total += media_interesse(dados, termo)
+        vetor_intencao = vetor_intencao + vetor_origens(regioes, [termo])
+
+    interesse_intencao_media = interesse_intencao_total // len(termos_busca) if termos_busca else 0
+    interesse_final = int(0.4 * interesse_bruto + 0.6 * interesse_intencao_media)
+
+    if vetor_intencao.any():
+        return (interesse_final,) + top3_vetor(vetor_intencao) + (compactar_vetor(vetor_intencao),)
+    return interesse_final, o1, p1, o2, p2, o3, p3, vetor_bruto
+
+# ==============================
+# PLANO
+# ==============================
+
+class Payload:
+    """Uma consulta ao Trends e os destinos (de qualquer carteira) que dependem dela."""
+
+    def __init__(self, termos, prioridade, ordem):
+        self.termos = list(termos)
+        self.chave = chave_payload(termos)
+        self.prioridade = prioridade
+        self.ordem = ordem
+        self.demandas = []
+
+
+class Demanda:
+    """Um destino de uma carteira à espera dos seus payloads."""
+
+    def __init__(self, carteira, destino, payloads):
+        self.carteira = carteira
+        self.destino = destino
+        self.payloads = payloads
+        self.faltam = len({p.chave for p in payloads})
+
+
+class PlanoColeta:
+
+    def __init__(self, carteiras, data, modo_cesta=MODO_CESTA):
+        self.carteiras = carteiras
+        self.data = data
+        self.modo_cesta = modo_cesta
+        self.payloads = {}
+        self.demandas = []
+        self.solicitados = 0
+        self.diarios = {}
+        self.feitos = {}
+        # carteira -> destino_ids sem coleta quando o disjuntor abriu
+        self.pendentes = {}
+        self.adiados = 0
+
+        for carteira in carteiras:
+            diario = DiarioColeta(carteira.nome, data)
+            self.diarios[carteira.nome] = diario
+            self.feitos[carteira.nome] = diario.concluidos()
+            self.adiados += len(set(diario.pendentes()) - set(self.feitos[carteira.nome]))
+            for destino in carteira.destinos:
+                if destino["id"] in self.feitos[carteira.nome]:
+                    continue
+                payloads = [self._pedir(termos, carteira.prioridade) for termos in self._consultas(carteira, destino)]
+                demanda = Demanda(carteira, destino, payloads)
+                for payload in {p.chave: p for p in payloads}.values():
+                    payload.demandas.append(demanda)
+                self.demandas.append(demanda)
+
+    def _consultas(self, carteira, destino):
+        if carteira.modo == "bruto":
+            return [[destino["termo"]]]
+        if self.modo_cesta == "individual":
+            return [[destino["termo"]]] + [[t] for t in destino["cesta"]]
+        return grupos_cesta(destino["termo"], destino["cesta"])
+
+    def _pedir(self, termos, prioridade):
+        self.solicitados += 1
+        chave = chave_payload(termos)
+        payload = self.payloads.get(chave)
+        if payload is None:
+            payload = Payload(termos, prioridade, len(self.payloads))
+            self.payloads[chave] = payload
+        else:
+            payload.prioridade = min(payload.prioridade, prioridade)
+        return payload
+
+    def ordenados(self):
+        """Payloads por prioridade da carteira mais importante que depende deles."""
+        return sorted(self.payloads.values(), key=lambda p: (p.prioridade, p.ordem))
+
+    def estimativa(self, cache=None, timeframe=None, geo=None, rpm=12.0, saidas=1):
+        """(requisições HTTP, minutos) para executar o plano no ritmo dado."""
+        pendentes = 0
+        for payload in self.payloads.values():
+            if cache is not None and all(
+                cache.contem(cache.chave(payload.termos, timeframe, geo, resolucao))
+                for resolucao in (None, ["REGION", True])
+            ):
+                continue
+            pendentes += 1
+        requisicoes = pendentes * REQUISICOES_POR_PAYLOAD
+        return requisicoes, requisicoes / max(rpm * saidas, 1e-9)
+
+    def resumo(self):
+        retomados = sum(len(f) for f in self.feitos.values())
+        adiados = f", {self.adiados} adiados por bloqueio" if self.adiados else ""
+        return (
+            f"{len(self.demandas)} destinos pendentes ({retomados} retomados do diario{adiados}), "
+            f"{len(self.payloads)} payloads ({self.solicitados} antes da deduplicacao)"
+        )
+
+# ==============================
+# EXECUÇÃO
+# ==============================
+
+def _montar(plano, demanda, respostas):
+    destino = demanda.destino
+    carteira = demanda.carteira
+    termos = [destino["termo"]] + destino["cesta"]
+    respostas = [tuple(renomear(df, termos) for df in respostas[p.chave]) for p in demanda.payloads]
+    if carteira.modo == "bruto":
+        valores = montar_bruto(destino["termo"], respostas[0])
+    elif plano.modo_cesta == "individual":
+        valores = montar_cesta_individual(destino["termo"], destino["cesta"], respostas)
+    else:
+        valores = montar_cesta_lote(destino["termo"], destino["cesta"], respostas)
+    return [plano.data, destino["id"]] + list(valores)
+
+def executar(plano, pool):
+    """
+    Executa o plano no pool de sessões. Devolve nome da carteira -> linhas,
+    na ordem dos destinos do registro (retomados do diário inclusos). Se o
+    disjuntor abrir, os destinos sem coleta ficam de fora e vão para
+    plano.pendentes e para o diário.
+    """
+    respostas = {}
+    prontas = {}
+    lock = threading.Lock()
+
+    def buscar(cliente, payload):
+        consulta = cliente.consulta(payload.termos)
+        resposta = (consulta.interesse_no_tempo(), consulta.interesse_por_regiao())
+        with lock:
+            respostas[payload.chave] = resposta
+            completas = []
+            for demanda in payload.demandas:
+                demanda.faltam -= 1
+                if demanda.faltam == 0:
+                    completas.append(demanda)
+        for demanda in completas:
+            linha = _montar(plano, demanda, respostas)
+            plano.diarios[demanda.carteira.nome].registrar(demanda.destino["id"], linha)
+            with lock:
+                prontas[(demanda.carteira.nome, demanda.destino["id"])] = linha
+            print(f"  [{demanda.carteira.nome}] {demanda.destino['termo']} -> id: {demanda.destino['id']} "
+                  f"interesse={linha[2]} origem_1={linha[3]}({linha[4]})")
+
+    motivo = None
+    try:
+        pool.mapear(buscar, plano.ordenados())
+    except CircuitoAberto as e:
+        motivo = str(e)
+
+    resultados = {}
+    for carteira in plano.carteiras:
+        feitos = plano.feitos[carteira.nome]
+        diario = plano.diarios[carteira.nome]
+        linhas = []
+        faltaram = []
+        for destino in carteira.destinos:
+            linha = feitos.get(destino["id"]) or prontas.get((carteira.nome, destino["id"]))
+            if linha is not None:
+                linhas.append(linha)
+            else:
+                faltaram.append(destino["id"])
+        resultados[carteira.nome] = linhas
+        if motivo and faltaram:
+            diario.marcar_pendentes(faltaram, motivo)
+            plano.pendentes[carteira.nome] = faltaram
+        else:
+            diario.limpar_pendentes()
+    return resultados
+
@@ -0,0 +1,88 @@
+"""
+Sessões HTTP compartilhadas (SerpAPI, Supabase).
+
+Uma requests.Session com pool de conexões keep-alive do tamanho do número
+de threads, timeout padrão e retentativas com backoff exponencial para
+erros de rede, 429 e 5xx (respeitando Retry-After). Esta é a única camada
+de retentativa: os coletores não repetem a chamada por conta própria. Com
+servico, cada chamada vai para a telemetria (pulse.telemetria),
+retentativas incluídas.
+"""
+import os
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from pulse import telemetria
+
+# ==============================
+# CONFIGURAÇÕES
+# ==============================
+
+# (conexão, leitura) em segundos
+HTTP_TIMEOUT = (
+    float(os.environ.get("PULSE_HTTP_TIMEOUT_CONEXAO", "10")),
+    float(os.environ.get("PULSE_HTTP_TIMEOUT_LEITURA", "60")),
+)
+HTTP_TENTATIVAS = int(os.environ.get("PULSE_HTTP_TENTATIVAS", "4"))
+HTTP_BACKOFF = float(os.environ.get("PULSE_HTTP_BACKOFF", "1"))
+
+STATUS_RETENTAVEIS = (429, 500, 502, 503, 504)
+# Para APIs cobradas por chamada (SerpAPI): só o que não chegou a ser feito,
+# conexão recusada e limite de taxa. Timeout de leitura e 5xx podem já ter
+# gastado o crédito e não são repetidos.
+STATUS_SEM_CUSTO = (429,)
+
+
+class SessaoComTimeout(requests.Session):
+    """Session que aplica um timeout padrão quando a chamada não passa um."""
+
+    def __init__(self, timeout=HTTP_TIMEOUT):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+class AdaptadorMedido(HTTPAdapter):
+    """HTTPAdapter que mede a chamada inteira, com as retentativas do Retry."""
+
+    def __init__(self, servico, **kwargs):
+        self.servico = servico
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        inicio = time.monotonic()
+        resposta = super().send(request, **kwargs)
+        telemetria.registrar_resposta(self.servico, resposta, time.monotonic() - inicio)
+        return resposta
+
+
+def criar_sessao(conexoes=10, tentativas=HTTP_TENTATIVAS, backoff=HTTP_BACKOFF,
+                 timeout=HTTP_TIMEOUT, metodos=("GET", "POST"), servico=None, cobrada=False):
+    """
+    Session para uso concorrente. POST só deve entrar em metodos quando a
+    escrita for idempotente (upsert com on_conflict). servico ("serpapi",
+    "supabase") liga a telemetria das chamadas. cobrada=True restringe as
+    retentativas às que não gastam crédito (STATUS_SEM_CUSTO, sem releitura).
+    """
+    retry = Retry(
+        total=tentativas,
+        read=0 if cobrada else None,
+        other=0 if cobrada else None,
+        backoff_factor=backoff,
+        status_forcelist=STATUS_SEM_CUSTO if cobrada else STATUS_RETENTAVEIS,
+        allowed_methods=frozenset(metodos),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    opcoes = dict(pool_connections=conexoes, pool_maxsize=conexoes, max_retries=retry)
+    adaptador = AdaptadorMedido(servico, **opcoes) if servico else HTTPAdapter(**opcoes)
+    sessao = SessaoComTimeout(timeout)
+    sessao.mount("https://", adaptador)
+    sessao.mount("http://", adaptador)
+    return sessao
@@ -0,0 +1,308 @@
+"""
+Snapshots estáticos dos dashboards em dados/ (JSON gzipado).
+
+Cada visita aos radares fazia select('*') em pulse_amazonia /
+pulse_serras / concorrentes_nacionais, e o hotel-pulse em
+hotel_pulse_tarifas. Depois de cada coleta o pipeline grava um arquivo por
+dashboard e período do seletor, só com os campos que as páginas usam:
+
+    dados/radar-amazonia-30d.json.gz
+    dados/radar-serras-7d.json.gz
+    dados/hotel-pulse.json.gz      (o hotel-pulse lê tudo e recorta na página)
+
+O snapshot sai das mesmas tabelas e consultas que as páginas fazem no
+Supabase (período, limit, pulse_indices / pulse_ipcr / pulse_origem do
+último dia, pulse_indices e pulse_ipcr também do período do arquivo), então
+o arquivo e o caminho de fallback mostram a mesma coisa. As linhas vão em formato de colunas ("campos" + listas), mais
+recentes primeiro. Um período sem nenhuma linha (coleta parada) é gravado
+vazio, como a página veria, e o passo sai com erro. Um snapshot que só
+mudaria o gerado_em não é regravado (nada a commitar).
+
+Cada painel tem ainda um manifesto, dados/versao-<painel>.json, com o
+sha256 de cada arquivo e a data da coleta mais recente. É por ele que o
+service worker (sw.js) decide se o snapshot no cache ainda vale, e não
+pelo relógio: enquanto o pipeline não gravar arquivos novos, o do cache
+continua servido; assim que gravar, o próximo acesso baixa o novo. Um
+painel por arquivo para os workflows (cada um com o seu painel) não
+disputarem o mesmo arquivo no commit.
+
+    python -m pulse.snapshots                       # radares
+    python -m pulse.snapshots hotel-pulse
+
+SUPABASE_URL e SUPABASE_KEY (ou SUPABASE_SERVICE_ROLE_KEY) são obrigatórias.
+"""
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+from pulse.carteiras import CAMPOS_LINHA
+from pulse.erros import ErroPulse, rodar
+
+# ==============================
+# CONFIGURAÇÕES
+# ==============================
+
+SNAPSHOTS_DIR = os.environ.get("PULSE_SNAPSHOTS_DIR", "dados")
+
+# Períodos dos seletores dos radares ("custom" continua indo ao Supabase).
+# Tabelas, filtros e destinos por dia (o limit dinâmico) como nas páginas.
+PAINEIS = {
+    "radar-amazonia": {
+        "carteira": "para",
+        "dados": ("pulse_amazonia", {}, 15),
+        "concorrentes": ("concorrentes_nacionais", {}, 8),
+        "periodos": (7, 14, 30, 90),
+    },
+    "radar-serras": {
+        "carteira": "serras-ancora",
+        "dados": ("pulse_serras", {"tipo": "eq.ancora"}, 18),
+        "concorrentes": ("pulse_serras", {"tipo": "eq.concorrente"}, 9),
+        "periodos": (7, 14, 30, 90),
+    },
+    "hotel-pulse": {
+        "tabela": "hotel_pulse_tarifas",
+        "campos": ["data_coleta", "hotel_id", "tarifa_minima", "fonte"],
+        "limite": 2000,  # mesmo limit() da consulta da página
+    },
+}
+
+# Tabelas pré-calculadas lidas pelas páginas para o último dia (sem a
+# tabela, os cards calculam no navegador)
+DERIVADOS = {
+    "indices": ("pulse_indices", "*"),
+    "ipcr": ("pulse_ipcr", "*"),
+    "origem": ("pulse_origem", "destino_id,data_coleta,modo,badge,texto"),
+}
+# Calculados por período do seletor (pulse/indices.py, pulse/ipcr.py): filtrados por periodo
+DERIVADOS_POR_PERIODO = {"indices", "ipcr"}
+
+# Campos de concorrentes usados no IPCR das páginas
+CAMPOS_CONCORRENTES = ["data_coleta", "destino_id", "interesse"]
+
+# ==============================
+# ESCRITA
+# ==============================
+
+def colunar(linhas, campos):
+    """Dicts -> {"campos": [...], "linhas": [[...]]} (datas como AAAA-MM-DD)."""
+    saida = []
+    for linha in linhas:
+        valores = []
+        for campo in campos:
+            valor = linha.get(campo)
+            if isinstance(valor, date):
+                valor = valor.isoformat()
+            valores.append(valor)
+        saida.append(valores)
+    return {"campos": list(campos), "linhas": saida}
+
+def _sem_data(conteudo):
+    return {k: v for k, v in conteudo.items() if k != "gerado_em"}
+
+def gravar(painel, periodo, conteudo, raiz=SNAPSHOTS_DIR):
+    """
+    Grava dados/<painel>-<periodo>d.json.gz (ou <painel>.json.gz sem
+    período); devolve (caminho, bytes, mudou). Se só o gerado_em mudaria, o
+    arquivo existente fica como está.
+    """
+    os.makedirs(raiz, exist_ok=True)
+    nome = f"{painel}-{periodo}d" if periodo else painel
+    caminho = os.path.join(raiz, f"{nome}.json.gz")
+    try:
+        with gzip.open(caminho, "rt", encoding="utf-8") as f:
+            if _sem_data(json.load(f)) == _sem_data(json.loads(json.dumps(conteudo))):
+                return caminho, os.path.getsize(caminho), False
+    except (OSError, ValueError):
+        pass
+    texto = json.dumps(conteudo, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+    dados = gzip.compress(texto.encode("utf-8"), compresslevel=9, mtime=0)
+    temporario = caminho + ".tmp"
+    with open(temporario, "wb") as f:
+        f.write(dados)
+    os.replace(temporario, caminho)
+    return caminho, len(dados), True
+
+def gravar_versao(painel, resultados, raiz=SNAPSHOTS_DIR):
+    """
+    dados/versao-<painel>.json: sha256 (16 primeiros) de cada arquivo do
+    painel e a coleta mais recente. Só regravado se algum arquivo mudou.
+    """
+    arquivos = {}
+    coleta = None
+    for caminho, _, _ in resultados:
+        with open(caminho, "rb") as f:
+            bruto = f.read()
+        arquivos[os.path.basename(caminho)] = hashlib.sha256(bruto).hexdigest()[:16]
+        linhas = json.loads(gzip.decompress(bruto))["dados"]["linhas"]
+        if linhas:
+            # data_coleta é o primeiro campo e as linhas vêm mais recentes primeiro
+            coleta = max(coleta or "", str(linhas[0][0])[:10])
+    caminho = os.path.join(raiz, f"versao-{painel}.json")
+    conteudo = {"painel": painel, "coleta": coleta, "arquivos": arquivos,
+                "gerado_em": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    try:
+        with open(caminho, encoding="utf-8") as f:
+            if _sem_data(json.load(f)) == _sem_data(conteudo):
+                return caminho, False
+    except (OSError, ValueError):
+        pass
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(conteudo, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(temporario, caminho)
+    return caminho, True
+
+# ==============================
+# LEITURA (Supabase)
+# ==============================
+
+class Supabase:
+
+    def __init__(self, url, chave):
+        from pulse.rede import criar_sessao
+
+        self.url = url.rstrip("/")
+        self.headers = {"apikey": chave, "Authorization": f"Bearer {chave}"}
+        self.sessao = criar_sessao(conexoes=1, servico="supabase")
+
+    def consultar(self, tabela, params, opcional=False):
+        """Linhas da consulta; com opcional, tabela ausente (404) vira lista vazia."""
+        r = self.sessao.get(f"{self.url}/rest/v1/{tabela}", params=params, headers=self.headers)
+        if opcional and r.status_code == 404:
+            return []
+        r.raise_for_status()
+        return r.json()
+
+class SnapshotVazio(ErroPulse):
+    """Painel sem linhas; resultados = arquivos gravados assim mesmo."""
+
+    def __init__(self, mensagem, resultados=()):
+        super().__init__(mensagem)
+        self.resultados = list(resultados)
+
+# ==============================
+# RADARES
+# ==============================
+
+def limite_pagina(periodo, por_dia):
+    """calcularLimitDinamico das páginas."""
+    return periodo * por_dia + 50
+
+def _periodo(linhas, desde, hoje, limite):
+    """Recorte de um período como a consulta da página: gte/lte, mais recentes primeiro, limit."""
+    return [l for l in linhas if desde <= str(l["data_coleta"])[:10] <= hoje][:limite]
+
+def snapshots_radar(painel, banco, hoje=None, raiz=SNAPSHOTS_DIR):
+    config = PAINEIS[painel]
+    hoje = hoje or date.today()
+    periodos = config["periodos"]
+
+    # Uma leitura por tabela no maior período; os menores são recortes dela
+    desde_maior = (hoje - timedelta(days=max(periodos))).isoformat()
+    lidas = {}
+    for parte in ("dados", "concorrentes"):
+        tabela, filtros, por_dia = config[parte]
+        lidas[parte] = banco.consultar(tabela, dict(
+            filtros, select="*", order="data_coleta.desc",
+            data_coleta=f"gte.{desde_maior}", limit=limite_pagina(max(periodos), por_dia),
+        ))
+
+    gerado_em = time.strftime("%Y-%m-%dT%H:%M:%S")
+    resultados = []
+    vazios = []
+    for periodo in periodos:
+        desde = (hoje - timedelta(days=periodo)).isoformat()
+        dados = _periodo(lidas["dados"], desde, hoje.isoformat(), limite_pagina(periodo, config["dados"][2]))
+        concorrentes = _periodo(lidas["concorrentes"], desde, hoje.isoformat(),
+                                limite_pagina(periodo, config["concorrentes"][2]))
+        extras = {chave: [] for chave in DERIVADOS}
+        if dados:
+            # A página lê os pré-calculados do dia da linha mais recente (dados[0])
+            ultimo = str(dados[0]["data_coleta"])[:10]
+            for chave, (tabela, campos) in DERIVADOS.items():
+                params = {"select": campos, "carteira": f"eq.{config['carteira']}", "data_coleta": f"eq.{ultimo}"}
+                if chave in DERIVADOS_POR_PERIODO:
+                    # Só os valores calculados com o período deste snapshot
+                    params["periodo"] = f"eq.{periodo}"
+                extras[chave] = banco.consultar(tabela, params, opcional=True)
+        else:
+            vazios.append(periodo)
+        conteudo = {
+            "painel": painel,
+            "periodo": periodo,
+            "desde": desde,
+            "fonte": "supabase",
+            "gerado_em": gerado_em,
+            "dados": colunar(dados, CAMPOS_LINHA),
+            "concorrentes": colunar(concorrentes, CAMPOS_CONCORRENTES),
+            **extras,
+        }
+        resultados.append(gravar(painel, periodo, conteudo, raiz))
+
+    if vazios:
+        # Gravado assim mesmo (a página cai no Supabase e vê o mesmo vazio), mas o passo falha
+        ultima = lidas["dados"][0]["data_coleta"] if lidas["dados"] else "nenhuma"
+        raise SnapshotVazio(f"{painel}: nenhuma linha em {config['dados'][0]} nos períodos "
+                            f"{', '.join(f'{p}d' for p in vazios)} (última coleta: {ultima})", resultados)
+    return resultados
+
+# ==============================
+# HOTEL PULSE
+# ==============================
+
+def snapshots_hotel(banco, raiz=SNAPSHOTS_DIR):
+    """Uma leitura de hotel_pulse_tarifas por coleta, no lugar de uma por visita."""
+    config = PAINEIS["hotel-pulse"]
+    linhas = banco.consultar(config["tabela"], {
+        "select": ",".join(config["campos"]),
+        "order": "data_coleta.desc,hotel_id",
+        "limit": config["limite"],
+    })
+    if not linhas:
+        raise SnapshotVazio(f"hotel-pulse: nenhuma linha em {config['tabela']}")
+    conteudo = {
+        "painel": "hotel-pulse",
+        "fonte": "supabase",
+        "gerado_em": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "dados": colunar(linhas, config["campos"]),
+    }
+    return [gravar("hotel-pulse", None, conteudo, raiz)]
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    paineis = argv or ["radar-amazonia", "radar-serras"]
+    for painel in paineis:
+        if painel not in PAINEIS:
+            raise ErroPulse(f"Painel desconhecido: {painel} ({', '.join(PAINEIS)})")
+
+    url = os.environ.get("SUPABASE_URL")
+    chave = os.environ.get("SUPABASE_KEY") or os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+    if not url or not chave:
+        raise ErroPulse("Variáveis SUPABASE_URL ou SUPABASE_KEY não encontradas.")
+    banco = Supabase(url, chave)
+
+    erros = []
+    for painel in paineis:
+        try:
+            if painel == "hotel-pulse":
+                resultados = snapshots_hotel(banco)
+            else:
+                resultados = snapshots_radar(painel, banco)
+        except SnapshotVazio as e:
+            erros.append(e)
+            resultados = e.resultados
+        for caminho, tamanho, _ in resultados:
+            print(f"🗜️ {caminho}: {tamanho / 1024:.1f} KB")
+        if resultados:
+            # O manifesto acompanha o que foi gravado, vazio ou não: é o que a página veria
+            caminho, mudou = gravar_versao(painel, resultados)
+            print(f"🏷️ {caminho}{'' if mudou else ' (sem mudança)'}")
+    if erros:
+        raise ErroPulse("\n".join(f"🚨 ERRO: {erro}" for erro in erros))
+
+if __name__ == "__main__":
+    sys.exit(rodar(main))
@@ -0,0 +1,214 @@
+"""
+Telemetria por requisição (Trends, SerpAPI, Supabase) e perfil opcional.
+
+Cada chamada HTTP vira uma linha JSON em PULSE_TELEMETRIA (padrão
+.pulse/telemetria/<script>.jsonl, uma execução após a outra; "0" desliga
+o arquivo):
+
+    {"ts": ..., "script": "coleta_pulse_serras", "servico": "trends",
+     "endpoint": "/trends/api/widgetdata/multiline", "termo": "gramado,canela",
+     "status": 200, "latencia": 0.84, "tentativas": 0, "n429": 0,
+     "dormido": 5.0, "bytes": 18211}
+
+"dormido" é o que a thread esperou desde a chamada anterior (ritmo do
+limitador e backoff), "tentativas" as retentativas do urllib3 dentro da
+chamada. No fim da execução sai um resumo de onde o tempo foi: rede,
+backoff, ritmo e processamento (CPU do processo, que é o parse e o
+pandas). Com PULSE_PERFIL=arquivo.prof o script inteiro roda sob cProfile,
+threads incluídas (python -m pstats arquivo.prof).
+
+Sessões de pulse.rede registram sozinhas (criar_sessao(servico=...)); o
+pytrends recebe gancho("trends") via requests_args.
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+# ==============================
+# CONFIGURAÇÕES
+# ==============================
+
+TELEMETRIA = os.environ.get("PULSE_TELEMETRIA", "")
+TELEMETRIA_DIR = os.path.join(".pulse", "telemetria")
+PERFIL = os.environ.get("PULSE_PERFIL", "")
+
+# ==============================
+# ESTADO DA EXECUÇÃO
+# ==============================
+
+_lock = threading.Lock()
+_local = threading.local()
+_estado = {
+    "script": os.path.splitext(os.path.basename(sys.argv[0] or "pulse"))[0],
+    "arquivo": None,
+    "inicio": time.monotonic(),
+    "cpu": time.process_time(),
+}
+# Totais da execução, em segundos somados entre as threads
+_totais = {"requisicoes": 0, "rede": 0.0, "backoff": 0.0, "ritmo": 0.0,
+           "tentativas": 0, "n429": 0, "bytes": 0}
+_por_servico = {}
+
+def _arquivo():
+    if _estado["arquivo"] is None:
+        if TELEMETRIA == "0":
+            _estado["arquivo"] = False
+        else:
+            caminho = TELEMETRIA or os.path.join(TELEMETRIA_DIR, f"{_estado['script']}.jsonl")
+            os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+            _estado["arquivo"] = open(caminho, "a", encoding="utf-8")
+    return _estado["arquivo"]
+
+@contextmanager
+def contexto(termo):
+    """Termo (ou hotel, ou tabela) anotado nas requisições feitas dentro do bloco."""
+    anterior = getattr(_local, "termo", None)
+    _local.termo = termo
+    try:
+        yield
+    finally:
+        _local.termo = anterior
+
+def dormir(segundos, motivo):
+    """time.sleep contabilizado: motivo "ritmo" (limitador) ou "backoff"."""
+    if segundos <= 0:
+        return
+    inicio = time.monotonic()
+    time.sleep(segundos)
+    dormido = time.monotonic() - inicio
+    _local.dormido = getattr(_local, "dormido", 0.0) + dormido
+    with _lock:
+        _totais[motivo] = _totais.get(motivo, 0.0) + dormido
+
+def registrar(servico, url, status, latencia, bytes_=0, tentativas=0, n429=0, backoff=0.0):
+    """Uma requisição concluída (chamado pelos ganchos; backoff = retentativas internas)."""
+    dormido = getattr(_local, "dormido", 0.0) + backoff
+    _local.dormido = 0.0
+    registro = {
+        "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "script": _estado["script"],
+        "servico": servico,
+        "endpoint": urlparse(url).path,
+        "termo": getattr(_local, "termo", None),
+        "status": status,
+        "latencia": round(latencia, 3),
+        "tentativas": tentativas,
+        "n429": n429,
+        "dormido": round(dormido, 3),
+        "bytes": bytes_,
+    }
+    with _lock:
+        _totais["requisicoes"] += 1
+        _totais["rede"] += latencia
+        _totais["backoff"] += backoff
+        _totais["tentativas"] += tentativas
+        _totais["n429"] += n429
+        _totais["bytes"] += bytes_
+        servico_totais = _por_servico.setdefault(servico, {"requisicoes": 0, "rede": 0.0, "n429": 0})
+        servico_totais["requisicoes"] += 1
+        servico_totais["rede"] += latencia
+        servico_totais["n429"] += n429
+        arquivo = _arquivo()
+        if arquivo:
+            arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+def _tamanho(resposta):
+    enviado = resposta.request.body if resposta.request is not None else None
+    enviado = len(enviado) if isinstance(enviado, (bytes, str)) else 0
+    try:
+        recebido = len(resposta.content)
+    except Exception:
+        recebido = int(resposta.headers.get("Content-Length") or 0)
+    return enviado + recebido
+
+def gancho(servico):
+    """Hook de resposta do requests (requests_args={"hooks": {"response": [...]}})."""
+    def ao_responder(resposta, *args, **kwargs):
+        registrar(servico, resposta.url, resposta.status_code, resposta.elapsed.total_seconds(),
+                  _tamanho(resposta), n429=int(resposta.status_code == 429))
+        return resposta
+    return ao_responder
+
+def registrar_resposta(servico, resposta, total):
+    """Resposta de uma sessão com Retry: total inclui as retentativas e as esperas delas."""
+    historico = getattr(getattr(resposta.raw, "retries", None), "history", None) or ()
+    latencia = resposta.elapsed.total_seconds()
+    n429 = sum(1 for r in historico if r.status == 429) + int(resposta.status_code == 429)
+    registrar(servico, resposta.url, resposta.status_code, latencia, _tamanho(resposta),
+              tentativas=len(historico), n429=n429, backoff=max(0.0, total - latencia) if historico else 0.0)
+
+# ==============================
+# RESUMO E PERFIL
+# ==============================
+
+def resumo():
+    parede = time.monotonic() - _estado["inicio"]
+    cpu = time.process_time() - _estado["cpu"]
+    with _lock:
+        t = dict(_totais)
+        servicos = {k: dict(v) for k, v in _por_servico.items()}
+    linhas = [
+        f"⏱️ Telemetria {_estado['script']}: {parede:.1f}s de parede, {t['requisicoes']} requisições, "
+        f"{t['bytes'] / 1024:.0f} KB, {t['tentativas']} retentativas, {t['n429']}x 429",
+        f"   rede {t['rede']:.1f}s | backoff {t['backoff']:.1f}s | ritmo {t['ritmo']:.1f}s"
+        f" | processamento (CPU) {cpu:.1f}s  (rede/backoff/ritmo somados entre threads)",
+    ]
+    for servico, v in sorted(servicos.items()):
+        media = v["rede"] / v["requisicoes"] if v["requisicoes"] else 0
+        linhas.append(f"   {servico}: {v['requisicoes']} requisições, {v['rede']:.1f}s de rede "
+                      f"(média {media:.2f}s), {v['n429']}x 429")
+    return "\n".join(linhas)
+
+def _ao_sair(perfis):
+    if perfis:
+        import pstats
+
+        principal = perfis[0]
+        principal.disable()
+        estatisticas = pstats.Stats(principal)
+        for perfil in perfis[1:]:
+            try:
+                estatisticas.add(perfil)
+            except Exception:
+                pass
+        estatisticas.dump_stats(PERFIL)
+        print(f"🔬 Perfil gravado em {PERFIL} ({len(perfis)} threads)")
+    if _totais["requisicoes"]:
+        print(resumo())
+    arquivo = _estado["arquivo"]
+    if arquivo:
+        arquivo.close()
+
+def iniciar(script=None):
+    """
+    Chamado no topo de cada script: nome da execução, resumo no fim e,
+    com PULSE_PERFIL, cProfile na thread principal e nas que vierem depois.
+    """
+    if script:
+        _estado["script"] = script
+    perfis = []
+    if PERFIL:
+        import cProfile
+
+        principal = cProfile.Profile()
+        principal.enable()
+        perfis.append(principal)
+
+        def perfilar_thread(*args):
+            perfil = cProfile.Profile()
+            try:
+                perfil.enable()
+            except ValueError:
+                # Perfilador único por processo (3.12+): a principal já vê tudo
+                sys.setprofile(None)
+                return
+            with _lock:
+                perfis.append(perfil)
+
+        threading.setprofile(perfilar_thread)
+    atexit.register(_ao_sair, perfis)
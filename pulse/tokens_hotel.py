@@ -0,0 +1,81 @@
+"""
+Cache local dos property_token do Google Hotels (SerpAPI).
+
+A busca por texto ('Golden Park Campinas') devolve uma lista de hotéis e
+o coletor confia no primeiro. Guardando o property_token resolvido, as
+próximas execuções consultam a propriedade direto: resposta menor e sempre
+o mesmo hotel. A entrada cai (volta a busca por texto) se a consulta do
+hotel mudar, se passar do TTL ou se a busca pelo token falhar.
+"""
+import json
+import os
+import threading
+import time
+
+# ==============================
+# CONFIGURAÇÕES
+# ==============================
+
+TOKENS_ARQUIVO = os.environ.get(
+    "HOTEL_TOKENS_ARQUIVO", os.path.join(".pulse", "hoteis", "property_tokens.json")
+)
+# Revalida o token pela busca por texto de tempos em tempos; 0 = nunca expira
+TOKENS_TTL_DIAS = float(os.environ.get("HOTEL_TOKENS_TTL_DIAS", "30"))
+
+
+class CacheTokens:
+
+    def __init__(self, caminho=TOKENS_ARQUIVO, ttl_dias=TOKENS_TTL_DIAS):
+        self.caminho = caminho
+        self.ttl = ttl_dias * 86400
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+        self.invalidados = 0
+        try:
+            with open(caminho, encoding="utf-8") as f:
+                self.entradas = json.load(f)
+        except (OSError, ValueError):
+            self.entradas = {}
+
+    def token(self, hotel):
+        """property_token válido para o hotel, ou None (usar busca por texto)."""
+        with self._lock:
+            entrada = self.entradas.get(hotel["hotel_id"])
+            valido = (
+                entrada is not None
+                and entrada.get("query") == hotel["query"]
+                and (not self.ttl or time.time() - entrada["resolvido_em"] <= self.ttl)
+            )
+            if valido:
+                self.acertos += 1
+                return entrada["token"]
+            self.faltas += 1
+            return None
+
+    def gravar(self, hotel, token, nome=""):
+        if not token:
+            return
+        with self._lock:
+            self.entradas[hotel["hotel_id"]] = {
+                "token": token,
+                "query": hotel["query"],
+                "nome": nome,
+                "resolvido_em": time.time(),
+            }
+
+    def invalidar(self, hotel):
+        with self._lock:
+            if self.entradas.pop(hotel["hotel_id"], None) is not None:
+                self.invalidados += 1
+
+    def salvar(self):
+        with self._lock:
+            os.makedirs(os.path.dirname(self.caminho) or ".", exist_ok=True)
+            temporario = self.caminho + ".tmp"
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump(self.entradas, f, ensure_ascii=False, indent=2, sort_keys=True)
+            os.replace(temporario, self.caminho)
+
+    def resumo(self):
+        return f"{self.acertos} acertos, {self.faltas} faltas, {self.invalidados} invalidados"
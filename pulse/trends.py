@@ -0,0 +1,203 @@
+"""
+Acesso ao Google Trends compartilhado pelos coletores.
+
+Um ConsultaTrends corresponde a um payload do Trends: o token é pedido uma
+vez e serve tanto a série temporal quanto o recorte por região. Com um
+CacheTrends no cliente, respostas já vistas nem chegam a pedir o token.
+Com um LimitadorTaxa, toda requisição passa pelo balde de fichas em vez de
+sleeps fixos; com um Disjuntor, um bloqueio sustentado (429 seguidos)
+interrompe as consultas com CircuitoAberto.
+"""
+import random
+
+from pytrends.exceptions import TooManyRequestsError
+
+from pulse import telemetria
+from pulse.disjuntor import CircuitoAberto
+from pulse.uf import ORDEM_UF, padronizar, sigla
+
+# ==============================
+# CONFIGURAÇÕES PADRÃO
+# ==============================
+
+MAX_RETRIES = 5
+BASE_SLEEP = 4
+BACKOFF_FACTOR = 2
+TIMEFRAME = 'now 7-d'
+GEO = 'BR'
+
+# ==============================
+# AUXILIARES
+# ==============================
+
+def sleep_progressivo(tentativa):
+    tempo = BASE_SLEEP * (BACKOFF_FACTOR ** tentativa) + random.uniform(0, 2)
+    print(f"    aguardando {tempo:.0f}s...")
+    telemetria.dormir(tempo, "backoff")
+
+def media_interesse(dados, termo):
+    """Média da série temporal de um termo (0 se não houver dados)."""
+    if dados.empty or termo not in dados.columns:
+        return 0
+    return int(dados[termo].mean())
+
+def top3_origens(regioes, termo):
+    """Top 3 estados de origem de um termo, em siglas de UF: (o1, p1, o2, p2, o3, p3)."""
+    if regioes.empty or termo not in regioes.columns:
+        return ("none", 0, "none", 0, "none", 0)
+    top3 = regioes.sort_values(by=termo, ascending=False).head(3)
+    origens = top3.index.tolist()
+    valores = top3[termo].tolist()
+    while len(origens) < 3:
+        origens.append("none")
+        valores.append(0)
+    return (
+        padronizar(origens[0]), int(valores[0]),
+        padronizar(origens[1]), int(valores[1]),
+        padronizar(origens[2]), int(valores[2])
+    )
+
+def _pandas():
+    # pandas só é carregado quando chega a primeira resposta do Trends
+    import pandas as pd
+    return pd
+
+def vetor_zerado():
+    return _pandas().Series(0, index=ORDEM_UF, dtype="int64")
+
+def vetor_origens(regioes, termos):
+    """
+    Recorte por região somado entre os termos, como Series indexada por
+    ORDEM_UF (zeros onde o Trends não trouxe a UF). Regiões que não são UF
+    ficam de fora.
+    """
+    colunas = [t for t in termos if t in regioes.columns] if not regioes.empty else []
+    if not colunas:
+        return vetor_zerado()
+    soma = regioes[colunas].sum(axis=1)
+    return soma.groupby(soma.index.map(sigla)).sum().reindex(ORDEM_UF, fill_value=0).astype("int64")
+
+def compactar_vetor(vetor):
+    """Series de vetor_origens -> 27 inteiros com a maior UF = 100 (None se tudo zero)."""
+    maximo = vetor.max()
+    if maximo <= 0:
+        return None
+    return (vetor * 100.0 / maximo).round().astype(int).tolist()
+
+# ==============================
+# CLIENTE E CONSULTA
+# ==============================
+
+class ClienteTrends:
+    """Sessão do pytrends + parâmetros comuns a todas as consultas."""
+
+    def __init__(self, pytrends, timeframe=TIMEFRAME, geo=GEO, max_retries=MAX_RETRIES,
+                 cache=None, limitador=None, disjuntor=None):
+        self.pytrends = pytrends
+        self.timeframe = timeframe
+        self.geo = geo
+        self.max_retries = max_retries
+        self.cache = cache
+        self.limitador = limitador
+        self.disjuntor = disjuntor
+        # O TrendReq guarda um único payload por vez
+        self._payload_ativo = None
+
+    def consulta(self, termos, timeframe=None):
+        return ConsultaTrends(self, termos, timeframe)
+
+
+class ConsultaTrends:
+    """
+    Um payload (até 5 termos) do Trends. interesse_no_tempo() e
+    interesse_por_regiao() reaproveitam o mesmo token; o build_payload só é
+    refeito se outra consulta tiver usado o TrendReq nesse meio-tempo.
+    """
+
+    def __init__(self, cliente, termos, timeframe=None):
+        self.cliente = cliente
+        self.termos = list(termos)
+        # Intervalo próprio (backfill), senão o do cliente
+        self.timeframe = timeframe or cliente.timeframe
+        self._tempo = None
+        self._regioes = {}
+
+    def _buscar(self, descricao, chamada):
+        with telemetria.contexto(",".join(self.termos)):
+            return self._tentar(descricao, chamada)
+
+    def _liberar(self):
+        """Espera a ficha do limitador; com o circuito aberto, nenhuma requisição sai."""
+        cliente = self.cliente
+        if cliente.limitador:
+            cliente.limitador.adquirir()
+        if cliente.disjuntor:
+            cliente.disjuntor.verificar()
+
+    def _tentar(self, descricao, chamada):
+        cliente = self.cliente
+        limitador = cliente.limitador
+        disjuntor = cliente.disjuntor
+        for tentativa in range(cliente.max_retries):
+            try:
+                if cliente._payload_ativo is not self:
+                    self._liberar()
+                    cliente.pytrends.build_payload(
+                        self.termos, timeframe=self.timeframe, geo=cliente.geo
+                    )
+                    cliente._payload_ativo = self
+                self._liberar()
+                dados = chamada(cliente.pytrends)
+                if limitador:
+                    limitador.sucesso()
+                if disjuntor:
+                    disjuntor.sucesso()
+                return dados
+            except CircuitoAberto:
+                raise
+            except TooManyRequestsError:
+                if limitador:
+                    limitador.bloqueio()
+                if disjuntor:
+                    # Levanta CircuitoAberto antes do backoff se o bloqueio se sustentou
+                    disjuntor.bloqueio()
+                if not limitador:
+                    sleep_progressivo(tentativa)
+            except Exception as e:
+                print(f"    Erro {descricao} {', '.join(self.termos)}: {e}")
+                if not limitador:
+                    sleep_progressivo(tentativa)
+        return None
+
+    def _buscar_com_cache(self, resolucao, descricao, chamada):
+        cache = self.cliente.cache
+        if cache is None:
+            return self._buscar(descricao, chamada)
+        chave = cache.chave(self.termos, self.timeframe, self.cliente.geo, resolucao)
+        dados = cache.ler(chave)
+        if dados is None:
+            dados = self._buscar(descricao, chamada)
+            if dados is not None:
+                cache.gravar(chave, dados)
+        return dados
+
+    def interesse_no_tempo(self):
+        if self._tempo is None:
+            self._tempo = self._buscar_com_cache(
+                None, "interesse", lambda pytrends: pytrends.interest_over_time()
+            )
+        return self._tempo if self._tempo is not None else _pandas().DataFrame()
+
+    def interesse_por_regiao(self, resolution='REGION', inc_low_vol=True):
+        chave = (resolution, inc_low_vol)
+        if self._regioes.get(chave) is None:
+            self._regioes[chave] = self._buscar_com_cache(
+                list(chave),
+                "origens",
+                lambda pytrends: pytrends.interest_by_region(
+                    resolution=resolution,
+                    inc_low_vol=inc_low_vol
+                )
+            )
+        regioes = self._regioes[chave]
+        return regioes if regioes is not None else _pandas().DataFrame()
@@ -0,0 +1,90 @@
+"""
+Siglas de UF para as origens do Trends.
+
+O recorte por região do Trends (hl=pt-BR) devolve nomes de estado como
+"São Paulo" e "Pará"; até aqui eles iam para os CSVs como "são_paulo" e
+"pará". As coletas passam a gravar a sigla ("SP", "PA"), e as leituras do
+histórico usam sigla() para tratar os dois formatos da mesma forma.
+
+Além do top 3, cada linha leva origens_vetor: o recorte inteiro, um
+inteiro por UF na ordem de ORDEM_UF, com a maior UF = 100.
+"""
+import unicodedata
+
+UFS = {
+    "AC": "Acre",
+    "AL": "Alagoas",
+    "AP": "Amapá",
+    "AM": "Amazonas",
+    "BA": "Bahia",
+    "CE": "Ceará",
+    "DF": "Distrito Federal",
+    "ES": "Espírito Santo",
+    "GO": "Goiás",
+    "MA": "Maranhão",
+    "MT": "Mato Grosso",
+    "MS": "Mato Grosso do Sul",
+    "MG": "Minas Gerais",
+    "PA": "Pará",
+    "PB": "Paraíba",
+    "PR": "Paraná",
+    "PE": "Pernambuco",
+    "PI": "Piauí",
+    "RJ": "Rio de Janeiro",
+    "RN": "Rio Grande do Norte",
+    "RS": "Rio Grande do Sul",
+    "RO": "Rondônia",
+    "RR": "Roraima",
+    "SC": "Santa Catarina",
+    "SP": "São Paulo",
+    "SE": "Sergipe",
+    "TO": "Tocantins",
+}
+
+# Origem ausente nas linhas coletadas
+SEM_ORIGEM = "none"
+
+# Posições de origens_vetor: o interesse de cada UF, nesta ordem
+ORDEM_UF = list(UFS)
+# origens_vetor nos CSVs: "0;12;...;100" (27 inteiros, vazio se não houve recorte)
+SEPARADOR_VETOR = ";"
+
+def normalizar(texto):
+    """Sem acentos, '_' como espaço, espaços simples, maiúsculas."""
+    texto = unicodedata.normalize("NFD", str(texto))
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(texto.replace("_", " ").split()).upper()
+
+_POR_NOME = {normalizar(nome): uf for uf, nome in UFS.items()}
+_POR_NOME.update({uf: uf for uf in UFS})
+# Nomes que o Trends usa fora do pt-BR
+_POR_NOME.update({"FEDERAL DISTRICT": "DF", "STATE OF SAO PAULO": "SP", "STATE OF RIO DE JANEIRO": "RJ"})
+
+def sigla(valor):
+    """'são_paulo', 'São Paulo', 'sp' -> 'SP'; None se não for uma UF."""
+    if not valor:
+        return None
+    return _POR_NOME.get(normalizar(valor))
+
+def padronizar(nome):
+    """Nome de região do Trends -> sigla; fora do Brasil fica o formato antigo."""
+    if not nome or nome == SEM_ORIGEM:
+        return SEM_ORIGEM
+    return sigla(nome) or nome.lower().replace(" ", "_")
+
+def formatar_vetor(vetor):
+    """Lista de 27 inteiros -> texto do CSV ("" para None)."""
+    if vetor is None:
+        return ""
+    return SEPARADOR_VETOR.join(str(int(v)) for v in vetor)
+
+def ler_vetor(valor):
+    """Texto do CSV (ou lista já lida) -> lista de 27 inteiros; None se vazio."""
+    if valor is None or valor == "":
+        return None
+    if isinstance(valor, str):
+        valor = valor.split(SEPARADOR_VETOR)
+    vetor = [int(v) for v in valor]
+    if len(vetor) != len(ORDEM_UF):
+        raise ValueError(f"origens_vetor com {len(vetor)} posições (esperado {len(ORDEM_UF)})")
+    return vetor
@@ -0,0 +1,17 @@
+-- Curva de tarifas futuras: uma linha por hotel, dia da coleta e noite de estadia.
+-- Preenchida por coleta_hotel_pulse.py quando HOTEL_HORIZONTE vai além de hoje.
+
+create table if not exists hotel_pulse_curva (
+  hotel_id          text    not null,
+  data_coleta       date    not null,
+  data_estadia      date    not null,
+  antecedencia_dias integer not null,
+  fim_de_semana     boolean not null default false,
+  tarifa_minima     numeric,
+  fonte             text,
+  property_token    text,
+  primary key (hotel_id, data_coleta, data_estadia)
+);
+
+create index if not exists hotel_pulse_curva_estadia_idx
+  on hotel_pulse_curva (hotel_id, data_estadia);
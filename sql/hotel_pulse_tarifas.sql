@@ -0,0 +1,42 @@
+-- Chave natural de hotel_pulse_tarifas: uma tarifa por hotel por dia.
+-- Necessária para o upsert em lote de coleta_hotel_pulse.py
+-- (on_conflict=hotel_id,data_coleta).
+
+-- Remove duplicatas deixadas por reexecuções antigas, ficando a gravada por
+-- último. A ordem vem de created_at (padrão das tabelas do Supabase), senão
+-- de coletado_em, senão do id; o ctid não serve: é a posição física da
+-- linha, que update e vacuum mudam.
+do $$
+declare
+  coluna text;
+begin
+  select column_name into coluna
+  from information_schema.columns
+  where table_schema = 'public'
+    and table_name = 'hotel_pulse_tarifas'
+    and column_name in ('created_at', 'coletado_em', 'id')
+  order by array_position(array['created_at', 'coletado_em', 'id'], column_name::text)
+  limit 1;
+
+  if coluna is null then
+    raise exception 'hotel_pulse_tarifas sem created_at/coletado_em/id: deduplicar à mão antes do índice';
+  end if;
+
+  execute format($sql$
+    delete from hotel_pulse_tarifas
+    where ctid in (
+      select ctid from (
+        select ctid, row_number() over (
+          partition by hotel_id, data_coleta
+          order by %1$I desc nulls last
+        ) as ordem
+        from hotel_pulse_tarifas
+      ) t
+      where ordem > 1
+    )
+  $sql$, coluna);
+end
+$$;
+
+create unique index if not exists hotel_pulse_tarifas_hotel_data_uidx
+  on hotel_pulse_tarifas (hotel_id, data_coleta);
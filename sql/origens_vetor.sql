@@ -0,0 +1,20 @@
+-- Recorte completo das origens: um smallint por UF, na ordem de pulse/uf.py
+-- ORDEM_UF (AC, AL, AP, AM, BA, CE, DF, ES, GO, MA, MT, MS, MG, PA, PB, PR,
+-- PE, PI, RJ, RN, RS, RO, RR, SC, SP, SE, TO), com a maior UF = 100.
+-- Nulo em linhas anteriores à coluna ou sem recorte por região no Trends.
+-- Aplicar antes do primeiro deploy que grava origens_vetor.
+
+alter table pulse_amazonia
+  add column if not exists origens_vetor smallint[]
+  check (origens_vetor is null or cardinality(origens_vetor) = 27);
+
+alter table pulse_serras
+  add column if not exists origens_vetor smallint[]
+  check (origens_vetor is null or cardinality(origens_vetor) = 27);
+
+-- Ex.: concentração (HHI, 0-10000) das origens por destino e dia
+-- select destino_id, data_coleta,
+--        (select round(sum((v * 100.0 / t) ^ 2))
+--           from unnest(origens_vetor) v,
+--                (select nullif(sum(x), 0) t from unnest(origens_vetor) x) s) as hhi
+--   from pulse_amazonia where origens_vetor is not null;
@@ -0,0 +1,20 @@
+-- Marcas d'água de todas as tabelas importadas numa única consulta.
+-- Usada por pulse/manifesto.py para reconciliar o manifesto local
+-- (GET /rest/v1/pulse_importacao_marcas) em vez de uma consulta por tabela.
+
+create or replace view pulse_importacao_marcas as
+select 'pulse_amazonia'::text as tabela,
+       null::text             as tipo,
+       min(data_coleta)       as data_min,
+       max(data_coleta)       as data_max,
+       count(*)               as linhas
+  from pulse_amazonia
+union all
+select 'concorrentes_nacionais', null, min(data_coleta), max(data_coleta), count(*)
+  from concorrentes_nacionais
+union all
+select 'pulse_serras', tipo, min(data_coleta), max(data_coleta), count(*)
+  from pulse_serras
+ group by tipo;
+
+grant select on pulse_importacao_marcas to service_role;
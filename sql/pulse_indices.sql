@@ -0,0 +1,47 @@
+-- Índices dos dashboards pré-calculados por pulse/indices.py.
+-- Uma linha por carteira, destino, dia e período do seletor (7/14/30/90):
+-- os valores que o card mostraria se esse dia fosse o último carregado com
+-- esse período, calculados só sobre as coletas desde "desde" (dia - período).
+-- Os radares leem só o último dia carregado, do período do seletor.
+
+create table if not exists pulse_indices (
+  carteira              text    not null,
+  destino_id            text    not null,
+  data_coleta           date    not null,
+  periodo               integer not null,
+  desde                 date    not null,
+  interesse             integer not null,
+  share                 double precision,
+  variacao              double precision,
+  nowcasting            integer,
+  nowcasting_direcao    text,
+  confiabilidade        integer,
+  confiabilidade_nivel  text,
+  confiabilidade_classe text,
+  ipd                   integer,
+  momentum              text,
+  oportunidade          double precision,
+  risco                 text,
+  ipcr_final            integer,
+  calculado_em          timestamptz not null default now(),
+  primary key (carteira, destino_id, data_coleta, periodo)
+);
+
+-- Tabelas criadas antes de periodo/desde: as linhas antigas, calculadas sobre
+-- o histórico inteiro, não valem para nenhum período e são descartadas
+alter table pulse_indices add column if not exists periodo integer;
+alter table pulse_indices add column if not exists desde date;
+delete from pulse_indices where periodo is null or desde is null;
+alter table pulse_indices alter column periodo set not null;
+alter table pulse_indices alter column desde set not null;
+alter table pulse_indices drop constraint if exists pulse_indices_pkey;
+alter table pulse_indices add primary key (carteira, destino_id, data_coleta, periodo);
+
+drop index if exists pulse_indices_dia_idx;
+create index if not exists pulse_indices_dia_idx
+  on pulse_indices (carteira, data_coleta, periodo);
+
+-- Os dashboards usam a chave anon
+alter table pulse_indices enable row level security;
+drop policy if exists pulse_indices_leitura on pulse_indices;
+create policy pulse_indices_leitura on pulse_indices for select using (true);
@@ -0,0 +1,41 @@
+-- IPCR pré-calculado por pulse/ipcr.py: uma linha por carteira, destino, dia
+-- e período do seletor (7/14/30/90), calculada só sobre as coletas desde
+-- "desde" (dia - período), como a página as carrega.
+-- 'concorrentes' guarda a linha da matriz destino x concorrente do dia:
+-- [{"id": ..., "variacao": ..., "interesse": ...}] na ordem de carteiras.json.
+
+create table if not exists pulse_ipcr (
+  carteira           text    not null,
+  destino_id         text    not null,
+  data_coleta        date    not null,
+  periodo            integer not null,
+  desde              date    not null,
+  variacao           double precision,
+  media_concorrentes double precision,
+  ipcr               double precision,
+  status             text    not null,
+  classe             text    not null,
+  sem_concorrentes   boolean not null default false,
+  concorrentes       jsonb   not null default '[]'::jsonb,
+  calculado_em       timestamptz not null default now(),
+  primary key (carteira, destino_id, data_coleta, periodo)
+);
+
+-- Tabelas criadas antes de periodo/desde: as linhas antigas, sem período,
+-- são descartadas (pulse.ipcr reprocessa o histórico com o estado novo)
+alter table pulse_ipcr add column if not exists periodo integer;
+alter table pulse_ipcr add column if not exists desde date;
+delete from pulse_ipcr where periodo is null or desde is null;
+alter table pulse_ipcr alter column periodo set not null;
+alter table pulse_ipcr alter column desde set not null;
+alter table pulse_ipcr drop constraint if exists pulse_ipcr_pkey;
+alter table pulse_ipcr add primary key (carteira, destino_id, data_coleta, periodo);
+
+drop index if exists pulse_ipcr_dia_idx;
+create index if not exists pulse_ipcr_dia_idx
+  on pulse_ipcr (carteira, data_coleta, periodo);
+
+-- Os dashboards usam a chave anon
+alter table pulse_ipcr enable row level security;
+drop policy if exists pulse_ipcr_leitura on pulse_ipcr;
+create policy pulse_ipcr_leitura on pulse_ipcr for select using (true);
@@ -0,0 +1,24 @@
+-- Camada 2 (origem ajustada) pré-calculada por pulse/camada2.py.
+-- Uma linha por carteira, destino e dia; 'origens' e 'recorrencia' usam siglas de UF.
+
+create table if not exists pulse_origem (
+  carteira     text  not null,
+  destino_id   text  not null,
+  data_coleta  date  not null,
+  modo         text  not null,  -- observada | inferida | insuficiente
+  badge        text  not null,
+  texto        text  not null,
+  ajuste       text  not null,  -- local_removed | local_pondered | no_local_config
+  origens      jsonb not null default '[]'::jsonb,  -- [{"uf": "SP", "pct": 100}, ...]
+  recorrencia  jsonb not null default '[]'::jsonb,  -- [{"uf": "SP", "n": 5}, ...]
+  calculado_em timestamptz not null default now(),
+  primary key (carteira, destino_id, data_coleta)
+);
+
+create index if not exists pulse_origem_dia_idx
+  on pulse_origem (carteira, data_coleta);
+
+-- Os dashboards usam a chave anon
+alter table pulse_origem enable row level security;
+drop policy if exists pulse_origem_leitura on pulse_origem;
+create policy pulse_origem_leitura on pulse_origem for select using (true);
@@ -1,18 +1,171 @@
-const CACHE_NAME = 'pulse-amazonia-v2';
+// Versão dos arquivos estáticos: mudou css/js/logo/página, sobe aqui
+const VERSAO = 'v4';
+const CACHE_ESTATICO = `pulse-estatico-${VERSAO}`;
+const CACHE_CDN = `pulse-cdn-${VERSAO}`;
+// Snapshots de dados/ (pulse/snapshots.py): não dependem da versão do app
+const CACHE_DADOS = 'pulse-dados';
+const CACHES_ATUAIS = [CACHE_ESTATICO, CACHE_CDN, CACHE_DADOS];
+
+// Caminhos relativos ao sw.js: o site funciona na raiz do domínio ou num
+// subcaminho (ex.: GitHub Pages em /<repo>/)
+const BASE = new URL('./', self.location).pathname;
+const ESTATICOS = [
+  './',
+  'index.html',
+  'sistemas.html',
+  'radar-amazonia.html',
+  'radar-serras.html',
+  'hotel-pulse.html',
+  'manifest.json',
+  'css/style.css',
+  'js/main.js',
+  'radar.js',
+  'abr-logo.png',
+  'img/logo-abr-allinone.png'
+].map(caminho => new URL(caminho, self.location).pathname);
+const PAGINA_OFFLINE = BASE + 'index.html';
+const DADOS = BASE + 'dados/';
+
+// Bibliotecas com versão fixa na URL: podem ficar no cache para sempre
+const CDNS = ['cdn.jsdelivr.net', 'unpkg.com', 'cdnjs.cloudflare.com', 'fonts.gstatic.com'];
+
+// Cada painel tem um manifesto gravado pelo pipeline junto com os snapshots
+// (pulse/snapshots.py): dados/versao-<painel>.json com o hash de cada
+// arquivo. O snapshot no cache vale enquanto o hash dele for o do manifesto.
+const CABECALHO_VERSAO = 'x-pulse-versao';
+// Rede lenta não segura a resposta: o manifesto desiste depois disso
+const TIMEOUT_MANIFESTO_MS = 3000;
+
+// dados/radar-amazonia-30d.json.gz -> radar-amazonia; dados/hotel-pulse.json.gz -> hotel-pulse
+function painelDoArquivo(nome) {
+  return nome.replace(/\.json\.gz$/, '').replace(/-\d+d$/, '');
+}
+
+// Hash atual do arquivo no manifesto; null sem rede, sem manifesto, sem o
+// arquivo nele ou se o manifesto não chegar em TIMEOUT_MANIFESTO_MS
+async function versaoAtual(nome) {
+  const controle = new AbortController();
+  const timer = setTimeout(() => controle.abort(), TIMEOUT_MANIFESTO_MS);
+  try {
+    // ?t= fura o cache do CDN (max-age de dados/*): o manifesto é pequeno
+    const resposta = await fetch(`${DADOS}versao-${painelDoArquivo(nome)}.json?t=${Date.now()}`, {
+      cache: 'no-store',
+      signal: controle.signal
+    });
+    if (!resposta.ok) return null;
+    const manifesto = await resposta.json();
+    return (manifesto.arquivos && manifesto.arquivos[nome]) || null;
+  } catch (erro) {
+    return null;
+  } finally {
+    clearTimeout(timer);
+  }
+}
 
 self.addEventListener('install', event => {
-  self.skipWaiting();
+  event.waitUntil(
+    caches.open(CACHE_ESTATICO)
+      .then(cache => cache.addAll(ESTATICOS.map(url => new Request(url, { cache: 'reload' }))))
+      .then(() => self.skipWaiting())
+  );
 });
 
 self.addEventListener('activate', event => {
   event.waitUntil(
-    caches.keys().then(keys =>
-      Promise.all(keys.map(key => caches.delete(key)))
-    )
+    caches.keys()
+      .then(keys => Promise.all(keys.filter(key => !CACHES_ATUAIS.includes(key)).map(key => caches.delete(key))))
+      .then(() => self.clients.claim())
   );
 });
 
+// Páginas: rede primeiro (deploy novo aparece na hora), cache se estiver offline
+async function paginaRedePrimeiro(request) {
+  const cache = await caches.open(CACHE_ESTATICO);
+  try {
+    const resposta = await fetch(request);
+    if (resposta.ok) cache.put(request, resposta.clone());
+    return resposta;
+  } catch (erro) {
+    return (await cache.match(request, { ignoreSearch: true })) || (await cache.match(PAGINA_OFFLINE));
+  }
+}
+
+// Assets versionados: cache primeiro
+async function cachePrimeiro(nomeCache, request) {
+  const cache = await caches.open(nomeCache);
+  const salva = await cache.match(request);
+  if (salva) return salva;
+  const resposta = await fetch(request);
+  if (resposta.ok || resposta.type === 'opaque') cache.put(request, resposta.clone());
+  return resposta;
+}
+
+// Guarda o snapshot marcado com a versão (hash do manifesto) que foi pedida
+async function guardarDados(cache, request, resposta, versao) {
+  const cabecalhos = new Headers(resposta.headers);
+  cabecalhos.set(CABECALHO_VERSAO, versao);
+  const corpo = await resposta.clone().arrayBuffer();
+  await cache.put(request, new Response(corpo, {
+    status: resposta.status,
+    statusText: resposta.statusText,
+    headers: cabecalhos
+  }));
+}
+
+// Baixa a versão do manifesto com ?v=<hash> (o CDN não devolve o arquivo
+// antigo) e guarda; sem manifesto, o arquivo como está
+async function baixarDados(cache, request, versao) {
+  const url = new URL(request.url);
+  if (versao) url.searchParams.set('v', versao);
+  const resposta = await fetch(url, { cache: versao ? 'no-cache' : 'default' });
+  if (resposta.ok) await guardarDados(cache, request, resposta, versao || '');
+  return resposta;
+}
+
+// Confere o manifesto e, se o snapshot mudou (ou não há manifesto), troca o
+// do cache; a próxima abertura do painel já usa o novo
+async function revalidarDados(cache, request, salva) {
+  const versao = await versaoAtual(new URL(request.url).pathname.split('/').pop());
+  if (versao && salva.headers.get(CABECALHO_VERSAO) === versao) return;
+  try {
+    await baixarDados(cache, request, versao);
+  } catch (erro) {
+    // Sem rede: fica o do cache
+  }
+}
+
+// Snapshots: com cópia no cache ela sai na hora e o manifesto é conferido em
+// segundo plano (event.waitUntil); sem cópia, a versão do manifesto vai à rede.
+async function dadosPorVersao(event) {
+  const request = event.request;
+  const cache = await caches.open(CACHE_DADOS);
+  const salva = await cache.match(request);
+  if (salva) {
+    event.waitUntil(revalidarDados(cache, request, salva));
+    return salva;
+  }
+  const versao = await versaoAtual(new URL(request.url).pathname.split('/').pop());
+  return baixarDados(cache, request, versao);
+}
+
 self.addEventListener('fetch', event => {
-  event.respondWith(fetch(event.request));
-});
+  const request = event.request;
+  if (request.method !== 'GET') return;
+  const url = new URL(request.url);
+
+  if (url.origin === self.location.origin) {
+    if (url.pathname.startsWith(DADOS) && url.pathname.endsWith('.json.gz')) {
+      event.respondWith(dadosPorVersao(event));
+    } else if (request.mode === 'navigate') {
+      event.respondWith(paginaRedePrimeiro(request));
+    } else if (ESTATICOS.includes(url.pathname)) {
+      event.respondWith(cachePrimeiro(CACHE_ESTATICO, request));
+    }
+    return;
+  }
+
+  if (CDNS.includes(url.hostname)) {
+    event.respondWith(cachePrimeiro(CACHE_CDN, request));
+  }
+  // Supabase, Google Fonts CSS e o resto: direto na rede, sem o SW
 });
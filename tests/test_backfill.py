@@ -0,0 +1,88 @@
+"""Backfill: janelas sobrepostas, costura e âncora nas coletas diárias."""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pulse.backfill import costurar, fator_ancora, janelas, montar_linhas
+
+
+def _serie(inicio, valores, **colunas):
+    indice = pd.date_range(inicio, periods=len(valores), freq="D")
+    return pd.DataFrame({"destino": valores, **colunas}, index=indice)
+
+
+def test_janelas_cobrem_o_intervalo_com_sobreposicao():
+    saida = janelas(date(2026, 1, 1), date(2026, 12, 31), tamanho=180, sobreposicao=30)
+    assert saida[0][0] == date(2026, 1, 1)
+    assert saida[-1][1] == date(2026, 12, 31)
+    for (_, fim), (inicio, _) in zip(saida, saida[1:]):
+        assert (fim - inicio).days + 1 == 30
+    assert all((fim - inicio).days + 1 <= 180 for inicio, fim in saida)
+
+
+def test_janelas_limitadas_ao_maximo_diario():
+    saida = janelas(date(2021, 1, 1), date(2026, 1, 1), tamanho=1000, sobreposicao=30)
+    assert max((fim - inicio).days + 1 for inicio, fim in saida) == 269
+
+
+def test_janelas_sobreposicao_invalida():
+    with pytest.raises(ValueError):
+        janelas(date(2026, 1, 1), date(2026, 2, 1), tamanho=10, sobreposicao=10)
+
+
+def test_costurar_reconstroi_a_escala_unica():
+    # Série real 1..40; cada janela vem normalizada 0-100 por conta própria
+    real = np.arange(1, 41, dtype=float)
+    a = _serie("2026-01-01", real[:25] / real[:25].max() * 100)
+    b = _serie("2026-01-16", real[15:] / real[15:].max() * 100)
+    costurada, fatores = costurar([a, b], "destino")
+
+    assert fatores[0] == 1.0
+    assert fatores[1] == pytest.approx(40 / 25)
+    np.testing.assert_allclose(costurada["destino"].to_numpy(), real / real.max() * 100)
+    assert costurada.index.is_unique and costurada.index.is_monotonic_increasing
+
+
+def test_costurar_usa_as_outras_colunas_sem_sinal_na_ancora():
+    a = _serie("2026-01-01", [0, 0, 0, 0], rival=[10, 20, 30, 40])
+    b = _serie("2026-01-03", [0, 0, 5, 5], rival=[60, 80, 100, 100])
+    _, fatores = costurar([a, b], "destino")
+    assert fatores[1] == pytest.approx(70 / 140)
+
+
+def test_costurar_recomeca_quando_a_sobreposicao_nao_tem_sinal():
+    a = _serie("2026-01-01", [50, 100, 0, 0])
+    b = _serie("2026-01-03", [0, 0, 40, 80])
+    costurada, fatores = costurar([a, b], "destino")
+    assert fatores == [1.0, None]
+    # Os dias anteriores à quebra são descartados
+    assert costurada.index.min() == pd.Timestamp("2026-01-03")
+    assert costurada["destino"].max() == 100
+
+
+def test_costurar_vazio():
+    costurada, fatores = costurar([], "destino")
+    assert costurada.empty and fatores == []
+
+
+def test_fator_ancora():
+    interesse = pd.Series([10.0, 20.0, 30.0, 40.0], index=pd.date_range("2026-10-01", periods=4, freq="D"))
+    diarias = {"2026-10-02": 40, "2026-10-03": 60, "2026-10-09": 99}
+    assert fator_ancora(interesse, diarias, minimo=2) == pytest.approx(100 / 50)
+    # Poucos dias em comum ou nenhum sinal: sem âncora
+    assert fator_ancora(interesse, diarias, minimo=3) is None
+    assert fator_ancora(interesse, {"2026-10-02": 0, "2026-10-03": 0}, minimo=2) is None
+
+
+def test_montar_linhas_aplica_o_fator_e_as_origens_da_janela():
+    interesse = pd.Series([10.0, 20.0, 30.0], index=pd.date_range("2026-10-01", periods=3, freq="D"))
+    janelas_destino = [(date(2026, 9, 1), date(2026, 10, 2)), (date(2026, 10, 2), date(2026, 10, 31))]
+    origens = [("SP", 50), ("RJ", 40)]
+    linhas = montar_linhas({"id": "belem"}, interesse, 1.5, janelas_destino, origens,
+                           date(2026, 10, 2), date(2026, 10, 3))
+    assert linhas == [
+        ["2026-10-02", "belem", 30, "RJ", 40],
+        ["2026-10-03", "belem", 45, "RJ", 40],
+    ]
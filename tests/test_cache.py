@@ -0,0 +1,80 @@
+"""CacheTrends: TTL pelo criado_em da entrada, poda pelas menos usadas."""
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from pulse.cache import CacheTrends
+
+
+def _chave(termo):
+    return CacheTrends.chave([termo], "now 7-d", "BR", None)
+
+
+def _df(n=3):
+    indice = pd.date_range("2026-10-01", periods=n, freq="D", name="date")
+    return pd.DataFrame({"belem": range(n)}, index=indice)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CacheTrends(str(tmp_path), ttl_horas=1, max_mb=50)
+
+
+def test_gravar_e_ler_preserva_indice_de_datas(cache):
+    cache.gravar(_chave("belem"), _df())
+    lido = cache.ler(_chave("belem"))
+    pd.testing.assert_frame_equal(lido, _df(), check_freq=False)
+    assert (cache.acertos, cache.faltas) == (1, 0)
+
+
+def test_chave_ausente_conta_falta(cache):
+    assert not cache.contem(_chave("belem"))
+    assert cache.ler(_chave("belem")) is None
+    assert cache.faltas == 1
+
+
+def test_entrada_vencida_mesmo_lida_agora(cache, monkeypatch):
+    cache.gravar(_chave("belem"), _df())
+    caminho = cache._caminho(_chave("belem"))
+    agora = time.time()
+    # Duas horas depois, com o arquivo acabado de ler (mtime = agora): o TTL
+    # conta da gravação, então contem() e ler() concordam que venceu
+    monkeypatch.setattr(time, "time", lambda: agora + 2 * 3600)
+    os.utime(caminho, (agora + 2 * 3600, agora + 2 * 3600))
+    assert not cache.contem(_chave("belem"))
+    assert cache.ler(_chave("belem")) is None
+    assert not os.path.exists(caminho)
+
+
+def test_contem_nao_conta_acerto(cache):
+    cache.gravar(_chave("belem"), _df())
+    assert cache.contem(_chave("belem"))
+    assert (cache.acertos, cache.faltas) == (0, 0)
+
+
+def test_ttl_zero_desliga(tmp_path):
+    cache = CacheTrends(str(tmp_path), ttl_horas=0)
+    cache.gravar(_chave("belem"), _df())
+    assert not cache.ativo
+    assert not os.listdir(tmp_path)
+    assert cache.ler(_chave("belem")) is None
+
+
+def test_poda_remove_a_menos_usada(tmp_path):
+    cache = CacheTrends(str(tmp_path), ttl_horas=1, max_mb=50)
+    cache.gravar(_chave("a"), _df(200))
+    tamanho = os.path.getsize(cache._caminho(_chave("a")))
+    # Cabem duas entradas: a terceira gravação poda uma
+    cache.max_bytes = int(tamanho * 2.5)
+    cache.gravar(_chave("b"), _df(200))
+    antigo = time.time() - 60
+    os.utime(cache._caminho(_chave("a")), (antigo, antigo))
+    os.utime(cache._caminho(_chave("b")), (antigo, antigo))
+    # 'a' é lida (mtime atualizado): a menos usada passa a ser 'b'
+    assert cache.ler(_chave("a")) is not None
+    cache.gravar(_chave("c"), _df(200))
+    assert cache.contem(_chave("a"))
+    assert not cache.contem(_chave("b"))
+    assert cache.contem(_chave("c"))
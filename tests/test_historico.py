@@ -0,0 +1,104 @@
+"""Histórico Parquet: partes por gravação, a mais nova vence na leitura."""
+import os
+from datetime import date
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from pulse import historico  # noqa: E402
+from pulse.carteiras import CAMPOS_LINHA  # noqa: E402
+
+
+def _linha(dia, destino, interesse):
+    linha = [None] * len(CAMPOS_LINHA)
+    linha[CAMPOS_LINHA.index("data_coleta")] = dia
+    linha[CAMPOS_LINHA.index("destino_id")] = destino
+    linha[CAMPOS_LINHA.index("interesse")] = interesse
+    return linha
+
+
+def _interesses(raiz, **kwargs):
+    tabela = historico.ler(colunas=["carteira", "data_coleta", "destino_id", "interesse"], raiz=raiz, **kwargs)
+    return {(r["carteira"], str(r["data_coleta"]), r["destino_id"]): r["interesse"] for r in tabela.to_pylist()}
+
+
+def _arquivos(raiz, carteira, mes):
+    return sorted(os.listdir(os.path.join(raiz, f"carteira={carteira}", f"mes={mes}")))
+
+
+def test_anexar_grava_parte_nova_sem_reescrever(tmp_path):
+    raiz = str(tmp_path)
+    historico.anexar("para", [_linha("2026-10-01", "belem", 10)], raiz)
+    primeiro = _arquivos(raiz, "para", "2026-10")
+    historico.anexar("para", [_linha("2026-10-02", "belem", 12)], raiz)
+    segundo = _arquivos(raiz, "para", "2026-10")
+    assert len(segundo) == 2 and set(primeiro) < set(segundo)
+
+
+def test_reexecucao_substitui_o_dia(tmp_path):
+    raiz = str(tmp_path)
+    historico.anexar("para", [_linha("2026-10-01", "belem", 10), _linha("2026-10-01", "santarem", 5)], raiz)
+    historico.anexar("para", [_linha("2026-10-01", "belem", 30)], raiz)
+    historico.anexar("serras", [_linha("2026-10-01", "belem", 99)], raiz)
+    assert _interesses(raiz) == {
+        ("para", "2026-10-01", "belem"): 30,
+        ("para", "2026-10-01", "santarem"): 5,
+        ("serras", "2026-10-01", "belem"): 99,
+    }
+
+
+def test_ler_com_filtros_e_colunas(tmp_path):
+    raiz = str(tmp_path)
+    historico.anexar("para", [_linha("2026-09-30", "belem", 1), _linha("2026-10-01", "belem", 2)], raiz)
+    historico.anexar("para", [_linha("2026-10-01", "belem", 3)], raiz)
+    tabela = historico.ler(carteiras=["para"], desde="2026-10-01", colunas=["interesse"], raiz=raiz)
+    assert tabela.column_names == ["interesse"]
+    assert tabela.to_pylist() == [{"interesse": 3}]
+    assert historico.CAMPO_GRAVACAO not in historico.ler(raiz=raiz).column_names
+
+
+def test_compactar_mantem_a_leitura(tmp_path):
+    raiz = str(tmp_path)
+    for interesse in (10, 20, 30):
+        historico.anexar("para", [_linha("2026-10-01", "belem", interesse), _linha("2026-10-02", "belem", 1)], raiz)
+    antes = _interesses(raiz)
+    assert historico.compactar(raiz) == 1
+    assert _arquivos(raiz, "para", "2026-10") == ["dados.parquet"]
+    assert _interesses(raiz) == antes == {
+        ("para", "2026-10-01", "belem"): 30,
+        ("para", "2026-10-02", "belem"): 1,
+    }
+    # Parte gravada depois da compactação continua vencendo
+    historico.anexar("para", [_linha("2026-10-01", "belem", 40)], raiz)
+    assert _interesses(raiz)[("para", "2026-10-01", "belem")] == 40
+
+
+def test_compacta_ao_passar_do_limite(tmp_path, monkeypatch):
+    raiz = str(tmp_path)
+    monkeypatch.setattr(historico, "MAX_PARTES", 3)
+    for dia in range(1, 6):
+        historico.anexar("para", [_linha(f"2026-10-0{dia}", "belem", dia)], raiz)
+    assert len(_arquivos(raiz, "para", "2026-10")) <= 3
+    assert len(_interesses(raiz)) == 5
+
+
+def test_particao_antiga_sem_gravado_em(tmp_path):
+    raiz = str(tmp_path)
+    # Formato anterior: um dados.parquet por partição, sem a coluna de gravação
+    esquema = pa.schema([f for f in historico.esquema_arrow() if f.name != historico.CAMPO_GRAVACAO])
+    registro = {campo: None for campo in CAMPOS_LINHA}
+    registro.update(data_coleta=date(2026, 10, 1), destino_id="belem", interesse=10)
+    diretorio = tmp_path / "carteira=para" / "mes=2026-10"
+    diretorio.mkdir(parents=True)
+    pq.write_table(pa.Table.from_pylist([registro], schema=esquema), str(diretorio / "dados.parquet"))
+
+    assert _interesses(raiz) == {("para", "2026-10-01", "belem"): 10}
+    historico.anexar("para", [_linha("2026-10-01", "belem", 20)], raiz)
+    assert _interesses(raiz) == {("para", "2026-10-01", "belem"): 20}
+
+
+def test_sem_historico(tmp_path):
+    assert historico.ler(raiz=str(tmp_path / "nada")).num_rows == 0
+    assert historico.resumo(str(tmp_path / "nada")) == "historico vazio"
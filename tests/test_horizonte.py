@@ -0,0 +1,102 @@
+"""Horizonte de tarifas: cadência, pares do dia e cota de créditos."""
+from datetime import date, timedelta
+
+import pytest
+
+from pulse import horizonte
+from pulse.horizonte import (
+    Orcamento,
+    cadencia,
+    cota_diaria,
+    dias_ate_renovacao,
+    faixas_cadencia,
+    montar_pares,
+    vence_hoje,
+)
+
+HOTEIS = [{"hotel_id": f"hotel_{i}"} for i in range(4)]
+
+
+@pytest.mark.parametrize("dias, passo", [(0, 1), (7, 1), (8, 2), (14, 2), (15, 3), (30, 3), (31, 7), (365, 7)])
+def test_cadencia_padrao(dias, passo):
+    assert cadencia(dias) == passo
+
+
+def test_cadencia_configuravel():
+    faixas = faixas_cadencia("30:1, 60:5")
+    assert faixas == [(30, 1), (60, 5)]
+    assert cadencia(20, faixas) == 1
+    assert cadencia(45, faixas) == 5
+    # Acima da última faixa vale o último passo
+    assert cadencia(200, faixas) == 5
+    assert faixas_cadencia("") == [(0, 1)]
+
+
+def test_vence_hoje_uma_vez_por_ciclo():
+    inicio = date(2026, 10, 1)
+    for hotel in HOTEIS:
+        for dias in (10, 20, 60):
+            passo = cadencia(dias)
+            vencimentos = [vence_hoje(hotel["hotel_id"], dias, inicio + timedelta(d)) for d in range(passo * 4)]
+            assert sum(vencimentos) == 4
+            # Sempre no mesmo dia do ciclo
+            primeiro = vencimentos.index(True)
+            assert all(v == ((d - primeiro) % passo == 0) for d, v in enumerate(vencimentos))
+
+
+def test_montar_pares_ordem_e_d0():
+    hoje = date(2026, 10, 17)
+    pares = montar_pares(HOTEIS, hoje, horizonte="0,1,7,14,30,60,90", fins_de_semana=0)
+    antecedencias = [par.antecedencia for par in pares]
+    assert antecedencias == sorted(antecedencias)
+    # D+0 e as antecedências com passo 1 saem para todos os hotéis
+    for dias in (0, 1, 7):
+        assert sum(par.antecedencia == dias for par in pares) == len(HOTEIS)
+    assert len(pares) < len(HOTEIS) * 7
+
+
+def test_sem_limite_coleta_o_horizonte_todo():
+    hoje = date(2026, 10, 17)
+    pares = montar_pares(HOTEIS, hoje, horizonte="0,1,7,14,30,60,90", fins_de_semana=2, cadenciado=False)
+    datas = {hoje + timedelta(days=d) for d in (0, 1, 7, 14, 30, 60, 90)}
+    sexta = date(2026, 10, 23)
+    datas |= {sexta, sexta + timedelta(weeks=1)}
+    assert len(pares) == len(HOTEIS) * len(datas)
+
+
+@pytest.mark.parametrize("hoje, dia, esperado", [
+    (date(2026, 10, 17), 1, 15),   # até 1/11
+    (date(2026, 10, 31), 1, 1),
+    (date(2026, 11, 1), 1, 30),    # renovou hoje: até 1/12
+    (date(2026, 10, 17), 20, 3),   # ainda renova neste mês
+    (date(2026, 2, 10), 31, 18),   # fevereiro: dia 31 vira 28
+    (date(2026, 12, 31), 1, 1),
+])
+def test_dias_ate_renovacao(hoje, dia, esperado):
+    assert dias_ate_renovacao(hoje, dia) == esperado
+
+
+def test_cota_diaria_divide_o_saldo():
+    assert cota_diaria(150, date(2026, 10, 17), 1) == 10
+    assert cota_diaria(151, date(2026, 10, 17), 1) == 11
+    assert cota_diaria(150, date(2026, 10, 31), 1) == 150
+    assert cota_diaria(-3, date(2026, 10, 17), 1) == 0
+
+
+def test_orcamento_limita_creditos():
+    orcamento = Orcamento(creditos=2, segundos=0)
+    assert [orcamento.liberar() for _ in range(3)] == [True, True, False]
+    assert (orcamento.gastos, orcamento.adiados) == (2, 1)
+
+    sem_limite = Orcamento(creditos=0, segundos=0)
+    assert sem_limite.creditos is None
+    assert sem_limite.selecionar(list(range(5))) == list(range(5))
+
+
+def test_orcamento_prazo(monkeypatch):
+    agora = [100.0]
+    monkeypatch.setattr(horizonte.time, "monotonic", lambda: agora[0])
+    orcamento = Orcamento(creditos=0, segundos=10)
+    assert orcamento.liberar()
+    agora[0] = 111.0
+    assert not orcamento.liberar()
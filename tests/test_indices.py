@@ -0,0 +1,120 @@
+"""Índices dos dashboards: mesmas fórmulas e arredondamentos do JS."""
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pulse.indices import calcular, js_round, js_to_fixed_1, registros
+
+
+def _coletas(linhas):
+    """[(dia, destino, interesse, o1, o2, o3)] -> DataFrame como o do histórico."""
+    df = pd.DataFrame(linhas, columns=["data_coleta", "destino_id", "interesse",
+                                       "origem_1_pct", "origem_2_pct", "origem_3_pct"])
+    df["data_coleta"] = pd.to_datetime(df["data_coleta"]).dt.date
+    return df
+
+
+def _linha(indices, destino, dia):
+    selecao = indices[(indices["destino_id"] == destino) & (indices["data_coleta"].astype(str) == dia)]
+    assert len(selecao) == 1
+    return selecao.iloc[0]
+
+
+def test_js_round_meio_para_cima():
+    assert list(js_round([2.5, -2.5, 0.49, -0.5])) == [3, -2, 0, 0]
+
+
+@pytest.mark.parametrize("valor, esperado", [(0.25, 0.3), (-0.25, -0.3), (1.45, 1.4), (0.05, 0.1), (12.34, 12.3)])
+def test_js_to_fixed_1(valor, esperado):
+    # 1.45 é 1.4499... em binário: toFixed(1) dá 1.4
+    assert js_to_fixed_1(valor) == esperado
+
+
+def test_js_to_fixed_1_nan():
+    assert math.isnan(js_to_fixed_1(float("nan")))
+
+
+def test_serie_em_alta():
+    df = _coletas([
+        ("2026-10-01", "belem", 10, 60, 30, 10),
+        ("2026-10-02", "belem", 20, 60, 30, 10),
+        ("2026-10-03", "belem", 30, 60, 30, 10),
+    ])
+    indices = calcular(df, 7)
+    primeiro = _linha(indices, "belem", "2026-10-01")
+    ultimo = _linha(indices, "belem", "2026-10-03")
+
+    assert math.isnan(primeiro["variacao"])
+    assert primeiro["momentum"] == "Dados Insuficientes"
+    assert primeiro["confiabilidade_nivel"] == "Dados Insuficientes"
+
+    assert ultimo["variacao"] == 50.0
+    # EMA 10 -> 13 -> 18.1, mais metade da tendência (10)
+    assert ultimo["nowcasting"] == 23
+    assert ultimo["nowcasting_direcao"] == "↗️"
+    assert ultimo["momentum"] == "🚀 Forte"
+    # HHI 0.36 + 0.09 + 0.01 = 0.46
+    assert ultimo["risco"] == "🟡 Médio"
+    assert ultimo["share"] == 100.0
+    assert str(ultimo["desde"])[:10] == "2026-09-26"
+
+
+def test_variacao_com_anterior_zerado_e_share_do_dia():
+    df = _coletas([
+        ("2026-10-01", "belem", 0, None, None, None),
+        ("2026-10-01", "santarem", 30, None, None, None),
+        ("2026-10-02", "belem", 10, None, None, None),
+        ("2026-10-02", "santarem", 30, None, None, None),
+    ])
+    indices = calcular(df, 7)
+    belem = _linha(indices, "belem", "2026-10-02")
+    assert belem["variacao"] == 0.0
+    assert belem["share"] == 25.0
+    assert _linha(indices, "santarem", "2026-10-02")["share"] == 75.0
+    assert belem["risco"] == "N/A"
+
+
+def test_periodo_recorta_o_historico():
+    df = _coletas([
+        ("2026-09-01", "belem", 40, None, None, None),
+        ("2026-09-20", "belem", 20, None, None, None),
+        ("2026-10-01", "belem", 10, None, None, None),
+    ])
+    # Em 7 dias a página só carregaria o dia 1/10: sem coleta anterior
+    curto = _linha(calcular(df, 7), "belem", "2026-10-01")
+    assert math.isnan(curto["variacao"])
+    assert math.isnan(curto["nowcasting"])
+    # Em 14 dias entra 20/09; em 30 (desde 01/09, inclusive), as três coletas
+    medio = _linha(calcular(df, 14), "belem", "2026-10-01")
+    assert medio["variacao"] == -50.0
+    assert math.isnan(medio["nowcasting"])
+    longo = _linha(calcular(df, 30), "belem", "2026-10-01")
+    assert longo["momentum"] == "📉 Perdendo"
+    assert not math.isnan(longo["nowcasting"])
+
+
+def test_uma_linha_por_destino_e_dia():
+    dias = pd.date_range("2026-09-01", periods=40, freq="D").strftime("%Y-%m-%d")
+    rng = np.random.default_rng(7)
+    linhas = [(dia, destino, int(rng.integers(0, 100)), 50, 30, 20)
+              for dia in dias for destino in ("belem", "santarem", "maraba")]
+    df = _coletas(linhas)
+    for periodo in (7, 14, 30, 90):
+        indices = calcular(df, periodo)
+        assert len(indices) == len(df)
+        assert (indices["periodo"] == periodo).all()
+        assert indices["ipcr_final"].between(0, 100).all()
+        validos = indices["nowcasting"].dropna()
+        assert validos.between(0, 100).all()
+
+
+def test_registros_json():
+    df = _coletas([("2026-10-01", "belem", 10, None, None, None)])
+    (registro,) = registros(calcular(df, 14), "para")
+    assert registro["carteira"] == "para"
+    assert registro["data_coleta"] == "2026-10-01"
+    assert registro["desde"] == "2026-09-17"
+    assert registro["periodo"] == 14
+    assert registro["variacao"] is None and registro["nowcasting"] is None
@@ -0,0 +1,78 @@
+"""IPCR: cálculo do card, estado incremental e janela por período."""
+from types import SimpleNamespace
+
+from pulse.ipcr import AGUARDANDO, EstadoIPCR, avancar, calcular_ipcr
+
+CARTEIRA = SimpleNamespace(nome="para", destinos=[
+    {"id": "belem", "concorrentes": ["salvador", "recife"]},
+    {"id": "santarem", "concorrentes": []},
+])
+
+
+def _chaves(linhas):
+    return {(l["destino_id"], l["data_coleta"], l["periodo"]): l for l in linhas}
+
+
+def test_calcular_ipcr_status():
+    assert calcular_ipcr(None, ["salvador"], {}, "aguardando")["status"] == "⏸️ Sem Dados de Variação"
+    assert calcular_ipcr(15.0, [], {}, "aguardando")["status"] == "📈 Crescimento Forte"
+    assert calcular_ipcr(5.0, ["salvador"], {}, "aguardando")["status"] == "aguardando"
+
+    # Destino +30%, concorrentes +10% e +20% (média 15): razão 2 -> ganhando
+    rivais = {"salvador": [110, 100], "recife": [120, 100]}
+    resultado = calcular_ipcr(30.0, ["salvador", "recife"], rivais, "aguardando")
+    assert resultado["classe"] == "ganhando"
+    assert resultado["media_concorrentes"] == 15.0
+    assert resultado["ipcr"] == 2.0
+    assert [c["id"] for c in resultado["concorrentes"]] == ["salvador", "recife"]
+
+
+def test_rerun_do_mesmo_dia_igual_ao_recalculo_completo(tmp_path):
+    destinos = {
+        "2026-10-01": [("belem", 10), ("santarem", 20)],
+        "2026-10-02": [("belem", 12), ("santarem", 25)],
+        "2026-10-03": [("belem", 15), ("santarem", 20)],
+    }
+    rivais = {dia: [("salvador", 50 + i), ("recife", 40)] for i, dia in enumerate(destinos)}
+    # 02/10 foi coletado de novo com outro valor depois da primeira execução
+    corrigido = dict(destinos, **{"2026-10-02": [("belem", 14), ("santarem", 25)]})
+
+    completo = avancar(CARTEIRA, EstadoIPCR("para", str(tmp_path / "a")), corrigido, rivais, periodos=(7,))
+
+    estado = EstadoIPCR("para", str(tmp_path / "b"))
+    primeira = {dia: destinos[dia] for dia in ("2026-10-01", "2026-10-02")}
+    avancar(CARTEIRA, estado, primeira, {d: rivais[d] for d in primeira}, periodos=(7,))
+    estado.salvar()
+    # A execução seguinte relê a partir do último dia gravado, inclusive
+    estado = EstadoIPCR("para", str(tmp_path / "b"))
+    assert estado.data == "2026-10-02"
+    resto = {dia: corrigido[dia] for dia in ("2026-10-02", "2026-10-03")}
+    incremental = avancar(CARTEIRA, estado, resto, {d: rivais[d] for d in resto}, periodos=(7,))
+
+    esperado = _chaves(completo)
+    for chave, linha in _chaves(incremental).items():
+        assert linha == esperado[chave]
+    assert _chaves(incremental)[("belem", "2026-10-02", 7)]["variacao"] == 40.0
+
+
+def test_periodo_limita_as_coletas_vistas(tmp_path):
+    destinos = {"2026-09-10": [("belem", 10)], "2026-10-01": [("belem", 20)]}
+    rivais = {"2026-09-10": [("salvador", 50), ("recife", 50)], "2026-10-01": [("salvador", 55)]}
+    linhas = _chaves(avancar(CARTEIRA, EstadoIPCR("para", str(tmp_path)), destinos, rivais, periodos=(7, 30)))
+
+    curto = linhas[("belem", "2026-10-01", 7)]
+    assert curto["desde"] == "2026-09-24"
+    assert curto["variacao"] is None
+    assert curto["status"] == "⏸️ Sem Dados de Variação"
+
+    longo = linhas[("belem", "2026-10-01", 30)]
+    assert longo["variacao"] == 100.0
+    # recife só tem uma coleta no período: fica de fora da média
+    assert [c["id"] for c in longo["concorrentes"]] == ["salvador"]
+    assert longo["classe"] == "ganhando"
+
+
+def test_sem_rivais_no_periodo_aguarda(tmp_path):
+    destinos = {"2026-10-01": [("belem", 10)], "2026-10-02": [("belem", 20)]}
+    linhas = _chaves(avancar(CARTEIRA, EstadoIPCR("para", str(tmp_path)), destinos, {}, periodos=(7,)))
+    assert linhas[("belem", "2026-10-02", 7)]["status"] == AGUARDANDO["para"]
@@ -0,0 +1,107 @@
+"""Manifesto das importações: pular CSV idêntico e marca d'água por tabela."""
+import json
+
+import pytest
+
+from pulse.manifesto import Manifesto, chave_tabela, sha256_arquivo
+
+
+class RespostaFalsa:
+
+    def __init__(self, status_code, dados):
+        self.status_code = status_code
+        self._dados = dados
+
+    def json(self):
+        return self._dados
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+
+class SessaoFalsa:
+
+    def __init__(self, resposta):
+        self.resposta = resposta
+        self.chamadas = []
+
+    def get(self, url, **kwargs):
+        self.chamadas.append(url)
+        return self.resposta
+
+
+@pytest.fixture
+def caminho(tmp_path):
+    return str(tmp_path / "importacoes" / "manifesto.json")
+
+
+def test_chave_tabela():
+    assert chave_tabela("pulse_amazonia") == "pulse_amazonia"
+    assert chave_tabela("pulse_serras", {"tipo": "ancora"}) == "pulse_serras:tipo=ancora"
+
+
+def test_sha256_arquivo(tmp_path):
+    arquivo = tmp_path / "a.csv"
+    arquivo.write_bytes(b"data_coleta,destino_id\n")
+    # Blocos menores que o arquivo dão o mesmo hash
+    assert sha256_arquivo(str(arquivo)) == sha256_arquivo(str(arquivo), bloco=4)
+
+
+def test_csv_identico_e_pulado_na_proxima_execucao(caminho):
+    manifesto = Manifesto(caminho)
+    assert not manifesto.conhece("pulse_amazonia")
+    assert not manifesto.inalterado("pulse_amazonia", "abc")
+    manifesto.registrar("pulse_amazonia", "a.csv", "abc", "2026-10-01", "2026-10-16", 15, 15)
+
+    # Outra execução lê o arquivo gravado
+    seguinte = Manifesto(caminho)
+    assert seguinte.conhece("pulse_amazonia")
+    assert seguinte.inalterado("pulse_amazonia", "abc")
+    assert not seguinte.inalterado("pulse_amazonia", "def")
+    assert seguinte.marca("pulse_amazonia") == "2026-10-16"
+
+
+def test_csv_sem_linhas_novas_nao_recua_a_marca(caminho):
+    manifesto = Manifesto(caminho)
+    manifesto.registrar("pulse_amazonia", "a.csv", "abc", "2026-10-01", "2026-10-16", 15, 15)
+    manifesto.registrar("pulse_amazonia", "a.csv", "def", None, None, 0, 0)
+    entrada = manifesto.importacoes["pulse_amazonia"]
+    assert (entrada["data_min"], entrada["data_max"]) == ("2026-10-01", "2026-10-16")
+    manifesto.registrar("pulse_amazonia", "a.csv", "ghi", "2026-10-10", "2026-10-12", 3, 3)
+    assert manifesto.marca("pulse_amazonia") == "2026-10-16"
+
+
+def test_manifesto_corrompido_comeca_vazio(caminho, tmp_path):
+    (tmp_path / "importacoes").mkdir()
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write("{nao e json")
+    manifesto = Manifesto(caminho)
+    assert manifesto.importacoes == {} and manifesto.servidor == {}
+
+
+def test_reconciliar_servidor_atrasado_reimporta(caminho):
+    manifesto = Manifesto(caminho)
+    manifesto.registrar("pulse_amazonia", "a.csv", "abc", "2026-10-01", "2026-10-16", 15, 15)
+    manifesto.registrar("pulse_serras:tipo=ancora", "s.csv", "xyz", "2026-10-01", "2026-10-16", 9, 9)
+    sessao = SessaoFalsa(RespostaFalsa(200, [
+        # Importação perdida: o servidor só tem até o dia 14
+        {"tabela": "pulse_amazonia", "tipo": None, "data_min": "2026-10-01", "data_max": "2026-10-14", "linhas": 13},
+        {"tabela": "pulse_serras", "tipo": "ancora", "data_min": "2026-10-01", "data_max": "2026-10-16", "linhas": 9},
+    ]))
+    divergencias = manifesto.reconciliar(sessao, "https://exemplo.supabase.co/", {})
+
+    assert sessao.chamadas == ["https://exemplo.supabase.co/rest/v1/pulse_importacao_marcas"]
+    assert divergencias == [("pulse_amazonia", "2026-10-16", "2026-10-14")]
+    # O hash é esquecido: o mesmo CSV não é mais pulado
+    assert not manifesto.inalterado("pulse_amazonia", "abc")
+    assert manifesto.marca("pulse_amazonia") == "2026-10-14"
+    assert manifesto.inalterado("pulse_serras:tipo=ancora", "xyz")
+
+    with open(caminho, encoding="utf-8") as f:
+        assert json.load(f)["servidor"]["pulse_serras:tipo=ancora"]["linhas"] == 9
+
+
+def test_reconciliar_sem_view(caminho):
+    manifesto = Manifesto(caminho)
+    assert manifesto.reconciliar(SessaoFalsa(RespostaFalsa(404, None)), "https://exemplo", {}) is None